@@ -1,22 +1,46 @@
-import os
-import time
-import glob
 import logging
-from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene
-from PyQt5.QtCore import Qt, QPoint, QTimer, QRect, QEvent
+from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsItem
+from PyQt5.QtCore import Qt, QPoint, QTimer, QRect, QRectF, QEvent, pyqtSignal
 from PyQt5.QtGui import QPixmap, QPainter, QColor
 from Components.Canvas.DrawingBrushes import PenType
 from Components.Canvas.DrawingOverlays import DrawOverlaysMixin
 from Components.Canvas.DrawingEventHandlers import DrawEventsMixin
+from Components.Canvas.DrawingHistory import DrawingHistory
+from Components.Canvas.HistorySpill import HistorySpill
 from Components.Canvas.DrawingPresets import applyPreset1, applyPreset2, apply_drawing_preset
 from Components.Settings.Keybinds import Keybinds
+from Components.Overlay.OverlayImageCache import transformation_mode
+from Components.Overlay.Outline import OutlineCache
 
 logging.basicConfig(level=logging.INFO)
 
-appdata_local_path = os.path.join(os.path.expanduser("~"), "AppData", "Local")
-CROSSPIXEL_DIR_PATH = os.path.join(appdata_local_path, "CrossPixel")
+
+class CanvasItem(QGraphicsItem):
+    """The one scene item showing the canvas. It holds the canvas pixmap object itself rather than a copy, so
+    painting on the canvas copies nothing and only the area that was drawn on gets repainted."""
+
+    def __init__(self, pixmap: QPixmap):
+        super().__init__()
+        self.pixmap = pixmap
+
+    def setPixmap(self, pixmap: QPixmap, rect: QRect = None):
+        """Show a pixmap, repainting only the given area of it if it is the same size as the previous one."""
+        if pixmap.size() != self.pixmap.size():
+            self.prepareGeometryChange()
+            rect = None
+        self.pixmap = pixmap
+        self.update() if rect is None else self.update(QRectF(rect))
+
+    def boundingRect(self) -> QRectF:
+        return QRectF(self.pixmap.rect())
+
+    def paint(self, painter, option, widget=None):
+        painter.drawPixmap(0, 0, self.pixmap)
+
 
 class DrawArea(DrawEventsMixin, DrawOverlaysMixin, QGraphicsView):
+    canvasChanged = pyqtSignal(QRect)  # Area of the canvas pixmap that was just drawn on
+
     def __init__(self, scale_factor, parent=None):
         super().__init__(parent)
         self.setupAttributes(scale_factor)
@@ -36,9 +60,12 @@ class DrawArea(DrawEventsMixin, DrawOverlaysMixin, QGraphicsView):
         self.pixmap = QPixmap(100, 100)
         self.pixmap.fill(Qt.transparent)
         self.penType = PenType.DEFAULT
-        self.previousDrawings = []  # Store previous drawings
-        self.redoDrawings = []      # Store redo drawings
+        # Undo/redo history, kept in memory as the tiles each action changed; older steps go to disk
+        spill = HistorySpill()
+        spill.cap_bytes = int(Keybinds().get_keybind("undo_disk_cap_mb")) * 1024 * 1024
+        self.history = DrawingHistory(int(Keybinds().get_keybind("undo_budget_kb")) * 1024, spill)
         self.polylinePoints = []    # Store polyline points
+        self.polylineStroke = None  # The polyline being drawn, simplified as it grows
         self.startPoint = None
         self.showEraserIndicator = False
         self.presetCleared = False
@@ -48,11 +75,13 @@ class DrawArea(DrawEventsMixin, DrawOverlaysMixin, QGraphicsView):
         self.last_draw_time = None
         self.in_undo_redo_action = False
         self.mousePos = QPoint(0, 0)
+        self.outlineCache = OutlineCache()
 
     def setupUI(self):
         """Setup UI components for the drawing area."""
         self.scene = QGraphicsScene(self)
-        self.scene.addPixmap(self.pixmap)
+        self.canvasItem = CanvasItem(self.pixmap)
+        self.scene.addItem(self.canvasItem)
         self.setScene(self.scene)
         self.scale(self.scale_factor, self.scale_factor)
         self.setFixedSize(int(100 * self.scale_factor), int(100 * self.scale_factor))
@@ -93,10 +122,22 @@ class DrawArea(DrawEventsMixin, DrawOverlaysMixin, QGraphicsView):
 
     # Drawing and UI update methods
     def updateDrawing(self):
-        self.scene.clear()
-        self.scene.addPixmap(self.pixmap)
         if self.showCenterCross:
             self.drawCenterCross()
+        self.markDirty()
+
+    def markDirty(self, rect: QRect = None):
+        """Repaint the part of the canvas that changed and tell listeners about it, the whole canvas if no area is given."""
+        canvas_rect = self.pixmap.rect()
+        self.canvasItem.setPixmap(self.pixmap, rect)
+        self.canvasChanged.emit(canvas_rect if rect is None else rect.intersected(canvas_rect))
+
+    def penRect(self, *points) -> QRect:
+        """Return the area a stroke through the given points can touch, including the pen's width."""
+        xs = [point.x() for point in points]
+        ys = [point.y() for point in points]
+        margin = self.penSize // 2 + 2
+        return QRect(QPoint(min(xs), min(ys)), QPoint(max(xs), max(ys))).adjusted(-margin, -margin, margin, margin)
 
     def update_overlays(self):
         self.viewport().update()
@@ -106,13 +147,6 @@ class DrawArea(DrawEventsMixin, DrawOverlaysMixin, QGraphicsView):
         painter = QPainter(self.viewport())
         self.draw_overlays(painter)
 
-    def clearDrawing(self):
-        file_path = self.cache_pixmap_to_disk(self.pixmap)
-        self.previousDrawings.append(file_path)
-        self.pixmap.fill(Qt.transparent)
-        self.updateDrawing()
-        self.presetCleared = True
-
     # Preset methods
     def applyPreset1(self):
         apply_drawing_preset(self, applyPreset1)
@@ -120,6 +154,15 @@ class DrawArea(DrawEventsMixin, DrawOverlaysMixin, QGraphicsView):
     def applyPreset2(self):
         apply_drawing_preset(self, applyPreset2)
 
+    def applyOutline(self):
+        """Draw an outline (and drop shadow) behind everything on the canvas, as set in the outline settings."""
+        self.history.record(self.pixmap)
+        outline = self.outlineCache.outlined(self.pixmap, int(self.keybinds.get_keybind("outline_radius")),
+                                             QColor(self.keybinds.get_keybind("outline_color") or "#000000"),
+                                             bool(self.keybinds.get_keybind("outline_shadow")))
+        self.pixmap = QPixmap.fromImage(outline)
+        self.updateDrawing()
+
     # Utility methods
     def getRelativePos(self, global_pos):
         widget_global_pos = self.mapToGlobal(QPoint(0, 0))
@@ -141,80 +184,36 @@ class DrawArea(DrawEventsMixin, DrawOverlaysMixin, QGraphicsView):
         return QPoint(round(adjusted_x), round(adjusted_y))
 
     def setPixmap(self, pixmap):
-        self.pixmap = pixmap.scaled(self.pixmap.width(), self.pixmap.height(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        if pixmap.size() != self.pixmap.size():
+            # Keep pixel art sharp when it is a whole-number fraction of the canvas
+            mode = transformation_mode(max(pixmap.width(), pixmap.height()), self.pixmap.width())
+            pixmap = pixmap.scaled(self.pixmap.width(), self.pixmap.height(), Qt.KeepAspectRatio, mode)
+        self.pixmap = pixmap
         self.updateDrawing()
 
-    def cache_pixmap_to_disk(self, pixmap: QPixmap) -> str:
-        """Save the given pixmap to disk and return its filename."""
-        timestamp = str(int(time.time() * 1000))  # Using milliseconds for uniqueness
-        file_path = os.path.join(CROSSPIXEL_DIR_PATH, f"{timestamp}.png")
-        pixmap.save(file_path)
-        return file_path
-
-    def load_pixmap_from_disk(self, file_path: str) -> QPixmap:
-        """Load a QPixmap from the given file path."""
-        if os.path.exists(file_path):
-            return QPixmap(file_path)
-        else:
-            # Handle the error appropriately, maybe log it
-            logging.error(f"Error: File {file_path} not found.")
-            return QPixmap()
-
     def undoLastDrawing(self):
         """Undo the last drawing action."""
         print("Attempting to undo last drawing")
 
-        if self.previousDrawings:
-            # Set in_undo_redo_action to True to prevent state save in mousePressEvent
-            self.in_undo_redo_action = True
-
-            # Move the current state to the redo list
-            current_state_path = self.cache_pixmap_to_disk(self.pixmap)
-            self.redoDrawings.append(current_state_path)
-
-            # Load the previous state from previousDrawings
-            file_path_to_load = self.previousDrawings.pop()
-            loaded_pixmap = self.load_pixmap_from_disk(file_path_to_load)
-            
-            # Ensure the loaded pixmap is valid before using it
-            if not loaded_pixmap.isNull():
-                self.pixmap = loaded_pixmap
-                self.updateDrawing()
-
-            # Set in_undo_redo_action back to False after the operation
-            self.in_undo_redo_action = False
+        # Set in_undo_redo_action to True to prevent state save in mousePressEvent
+        self.in_undo_redo_action = True
+        image = self.history.undo(self.pixmap)
+        if image is not None:
+            self.pixmap = QPixmap.fromImage(image)
+            self.updateDrawing()
+        self.in_undo_redo_action = False
 
     def redoLastDrawing(self):
         """Redo the last drawing action."""
         print("Attempting to redo last drawing")
 
-        if self.redoDrawings:
-            # Load and display the pixmap from redoDrawings (don't pop yet)
-            file_path_to_load = self.redoDrawings[-1]
-            loaded_pixmap = self.load_pixmap_from_disk(file_path_to_load)
-            
-            # Ensure the loaded pixmap is valid before using it
-            if not loaded_pixmap.isNull():
-                # Save the current state to previousDrawings
-                current_state_path = self.cache_pixmap_to_disk(self.pixmap)
-                self.previousDrawings.append(current_state_path)
-
-                # Update the pixmap and remove the redone drawing from redoDrawings
-                self.pixmap = loaded_pixmap
-                self.updateDrawing()
-                self.redoDrawings.pop()
+        image = self.history.redo(self.pixmap)
+        if image is not None:
+            self.pixmap = QPixmap.fromImage(image)
+            self.updateDrawing()
 
     def clearDrawing(self):
-        file_path = self.cache_pixmap_to_disk(self.pixmap)
-        self.previousDrawings.append(file_path)
+        self.history.record(self.pixmap)
         self.pixmap.fill(Qt.transparent)
         self.updateDrawing()
         self.presetCleared = True
-
-    def clear_saved_pixmaps(self):
-        """Delete all saved pixmap images."""
-        for filepath in glob.glob(os.path.join(CROSSPIXEL_DIR_PATH, "*.png")):
-            try:
-                os.remove(filepath)
-            except Exception as e:
-                logging.error(f"Error deleting {filepath}: {e}")
\ No newline at end of file
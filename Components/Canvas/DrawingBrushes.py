@@ -1,7 +1,9 @@
 #from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QPushButton
-from PyQt5.QtCore import Qt, QRect
-from PyQt5.QtGui import QPainter, QPen, QPainterPath
+from PyQt5.QtCore import Qt, QRect, QPoint
+from PyQt5.QtGui import QPainter, QPen, QPainterPath, QImage, QColor, QRegion
+from collections import OrderedDict
 from enum import Enum
+import numpy as np
 from math import atan2
 
 class PenType(Enum):
@@ -12,15 +14,82 @@ class PenType(Enum):
     ERASER = 5
     POLYLINE = 6
 
-def drawRoundedPen(painter, point, drawingColor, penSize):
-    painter.setRenderHint(QPainter.Antialiasing, True)
-    painter.setBrush(drawingColor)
-    painter.setPen(Qt.NoPen)
+class StampCache:
+    """Rounded and eraser brush tips rasterized once per (pen type, size, colour), then blitted at every point.
 
-    if penSize == 1:
-        painter.drawRect(QRect(point.x(), point.y(), 1, 1))
-    else:
-        painter.drawEllipse(point, penSize/2, penSize/2)
+    A stamp is a small premultiplied image with the tip drawn at its center, so a point costs one image blend
+    whatever the pen size. Rounded stamps are composited over the canvas; eraser stamps are opaque masks
+    composited with DestinationOut, which clears the covered pixels like the Clear mode ellipse does. That only
+    holds for even eraser sizes, see drawStamps.
+    """
+
+    _MAX_STAMPS = 32
+
+    def __init__(self):
+        self._stamps = OrderedDict()
+
+    def stamp(self, penType, penSize: int, drawingColor) -> (QImage, QPoint):
+        """Return the stamp image and the offset from a point to where the stamp goes."""
+        # The eraser's colour does not matter, all its sizes share one entry each
+        key = (penType, penSize, QColor(drawingColor).rgba() if penType == PenType.ROUNDED else 0)
+        entry = self._stamps.get(key)
+        if entry is None:
+            entry = self._stamps[key] = self._rasterize(penType, penSize, drawingColor)
+            while len(self._stamps) > self._MAX_STAMPS:
+                self._stamps.popitem(last=False)
+        self._stamps.move_to_end(key)
+        return entry
+
+    def _rasterize(self, penType, penSize, drawingColor):
+        margin = penSize // 2 + 2  # Room for the tip and the eraser's outline
+        image = QImage(2 * margin + 1, 2 * margin + 1, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        center = QPoint(margin, margin)
+        with QPainter(image) as painter:
+            if penType == PenType.ROUNDED:
+                painter.setRenderHint(QPainter.Antialiasing, True)
+                painter.setBrush(drawingColor)
+                painter.setPen(Qt.NoPen)
+                if penSize == 1:
+                    painter.drawRect(QRect(center.x(), center.y(), 1, 1))
+                else:
+                    painter.drawEllipse(center, penSize / 2, penSize / 2)
+            else:
+                # The eraser's shape, default pen outline included, drawn opaque to serve as the mask
+                painter.setRenderHint(QPainter.Antialiasing, False)
+                painter.setBrush(Qt.SolidPattern)
+                painter.drawEllipse(center, penSize / 2, penSize / 2)
+        return image, QPoint(-margin, -margin)
+
+    def clear(self):
+        self._stamps.clear()
+
+
+stampCache = StampCache()
+
+def drawStamps(painter, penType, drawingColor, penSize, points):
+    """Blit the rounded or eraser tip at each (x, y) of a coordinate array or list."""
+    if penType == PenType.ERASER and penSize % 2:
+        # An odd eraser lands on half pixels, where the aliased ellipse's edge rounds differently from one position
+        # to the next, so no single stamp matches it everywhere; these sizes draw the ellipse itself
+        _drawEraserEllipses(painter, penSize, points)
+        return
+    image, offset = stampCache.stamp(penType, penSize, drawingColor)
+    painter.setCompositionMode(QPainter.CompositionMode_DestinationOut if penType == PenType.ERASER else QPainter.CompositionMode_SourceOver)
+    dx, dy = offset.x(), offset.y()
+    for x, y in (points.tolist() if hasattr(points, "tolist") else points):
+        painter.drawImage(x + dx, y + dy, image)
+
+def _drawEraserEllipses(painter, penSize, points):
+    painter.setCompositionMode(QPainter.CompositionMode_Clear)
+    painter.setRenderHint(QPainter.Antialiasing, False)
+    painter.setPen(QPen())
+    painter.setBrush(Qt.SolidPattern)
+    for x, y in (points.tolist() if hasattr(points, "tolist") else points):
+        painter.drawEllipse(QPoint(x, y), penSize / 2, penSize / 2)
+
+def drawRoundedPen(painter, point, drawingColor, penSize):
+    drawStamps(painter, PenType.ROUNDED, drawingColor, penSize, [(point.x(), point.y())])
 
 def drawSquarePen(painter, point, drawingColor, penSize):
     painter.setRenderHint(QPainter.Antialiasing, False)
@@ -41,14 +110,10 @@ def drawLineTool(painter, startPoint, currentPoint, drawingColor, penSize):
     painter.drawLine(startPoint, currentPoint)
 
 def drawEraser(painter, point, drawingColor, penSize):
-    eraserSize = penSize
-    painter.setCompositionMode(QPainter.CompositionMode_Clear)
-    painter.setRenderHint(QPainter.Antialiasing, False)
-    painter.setBrush(Qt.SolidPattern)
-    painter.drawEllipse(point, eraserSize / 2, eraserSize / 2)
+    drawStamps(painter, PenType.ERASER, drawingColor, penSize, [(point.x(), point.y())])
 
 from PyQt5.QtGui import QPainterPath, QPen
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QPoint, QPointF
 
 def point_to_line_distance(point, start, end):
     """Compute the perpendicular distance from a point to a line."""
@@ -60,28 +125,49 @@ def point_to_line_distance(point, start, end):
     d = ((end.x() - start.x()) ** 2 + (end.y() - start.y()) ** 2) ** 0.5
     return n / d
 
-def find_furthest_point(points, epsilon):
-    """Find the point in the list that is the furthest from the line formed by the start and end points."""
-    dmax = 0
-    index = 0
-    end = len(points) - 1
-    for i in range(1, end):
-        d = point_to_line_distance(points[i], points[0], points[end])
-        if d > dmax:
-            index = i
-            dmax = d
-    return index, dmax
+def rdp_indices(points: np.ndarray, epsilon, first: int = 0, last: int = None, segments: bool = False) -> list:
+    """Ramer-Douglas-Peucker over points[first:last + 1] of an (n, 2) array, returning the kept indices in order.
+
+    Iterative, with the distances of each span computed at once on a view of the array, so long polylines
+    neither copy their points nor run into the recursion limit. Keeps the same points as the recursive version,
+    which measures distances to the line through a span; with segments, they are measured to the span itself,
+    so a stroke that doubles back on itself keeps its turning point.
+    """
+    last = len(points) - 1 if last is None else last
+    kept = [first]
+    spans = [(first, last)]
+    while spans:
+        start, end = spans.pop()
+        if end - start > 1:
+            inner = points[start + 1:end]
+            line = points[end] - points[start]
+            offset = points[start] - inner
+            length = np.sqrt(line[0] ** 2 + line[1] ** 2)
+            if length and segments:
+                along = np.clip(-(offset @ line) / length ** 2, 0, 1)
+                gap = inner - points[start] - along[:, None] * line
+                distances = np.sqrt(gap[:, 0] ** 2 + gap[:, 1] ** 2)
+            elif length:
+                distances = np.abs(line[0] * offset[:, 1] - offset[:, 0] * line[1]) / length
+            else:
+                distances = np.sqrt(offset[:, 0] ** 2 + offset[:, 1] ** 2)
+            index = int(np.argmax(distances))
+            if distances[index] > epsilon:
+                # The right half is handled after the left one, which keeps the indices in order
+                spans.append((start + 1 + index, end))
+                spans.append((start, start + 1 + index))
+                continue
+        kept.append(end)
+    return kept
 
 def ramer_douglas_peucker(points, epsilon):
     """The Ramer-Douglas-Peucker algorithm for polyline simplification."""
     if not points:  # Safety check to ensure the points list is not empty
         return []
-    index, dmax = find_furthest_point(points, epsilon)
-    if dmax > epsilon:
-        left_recursive = ramer_douglas_peucker(points[:index+1], epsilon)
-        right_recursive = ramer_douglas_peucker(points[index:], epsilon)
-        return left_recursive[:-1] + right_recursive
-    return [points[0], points[-1]]
+    if len(points) == 1:
+        return [points[0], points[0]]
+    coordinates = np.array([(point.x(), point.y()) for point in points], np.float64)
+    return [points[index] for index in rdp_indices(coordinates, epsilon)]
 
 def compute_average_distance(points):
     """Compute the average distance of each point to the line formed by its neighboring points."""
@@ -102,6 +188,151 @@ def adaptive_epsilon(points):
     else:
         return 0.2 
 
+class PolylineSimplifier:
+    """Simplifies a polyline as its points come in, for a cost per point that does not grow with its length.
+
+    The vertices before the last two the tail's simplification keeps are final and go into a stored path; each
+    new point only re-simplifies the tail after them, which is also cut once it reaches MAX_TAIL points. The
+    adaptive epsilon is the same as adaptive_epsilon's, kept as a running sum; a change of band applies from the
+    tail on, the final vertices stay as they are.
+    """
+
+    MAX_TAIL = 256
+
+    def __init__(self):
+        self.points = np.empty((64, 2), np.float64)
+        self.count = 0
+        self.epsilon = adaptive_epsilon([])
+        self._distanceSum = 0.0
+        self.stablePath = QPainterPath()  # Through the final vertices, empty until there are some
+        self._anchor = 0  # Index of the last final vertex
+        self._tail = []  # Indices of the vertices after the anchor
+        self._recent = []  # The last two points
+        self.bounds = None  # (top left, bottom right) of every point
+
+    def add(self, point):
+        if self.count == len(self.points):
+            self.points = np.concatenate([self.points, np.empty_like(self.points)])
+        self.points[self.count] = (point.x(), point.y())
+        self.count += 1
+        if self.bounds is None:
+            self.bounds = (QPoint(point), QPoint(point))
+        else:
+            top_left, bottom_right = self.bounds
+            self.bounds = (QPoint(min(top_left.x(), point.x()), min(top_left.y(), point.y())),
+                           QPoint(max(bottom_right.x(), point.x()), max(bottom_right.y(), point.y())))
+        if len(self._recent) == 2:
+            # The previous last point now has neighbours on both sides
+            self._distanceSum += point_to_line_distance(self._recent[1], self._recent[0], point)
+        self._recent = [self._recent[-1], QPoint(point)] if self._recent else [QPoint(point)]
+        self.epsilon = self._bandEpsilon()
+        self._simplifyTail()
+
+    def path(self) -> QPainterPath:
+        """The simplified polyline so far."""
+        path = QPainterPath(self.stablePath)
+        if self.stablePath.elementCount() == 0:
+            return self.tailPath()
+        for index in self._tail:
+            path.lineTo(QPointF(*self.points[index]))
+        return path
+
+    def tailPath(self) -> QPainterPath:
+        """The simplified polyline from the last final vertex on, a dot for a single point."""
+        if not self.count:
+            return QPainterPath()
+        path = QPainterPath(QPointF(*self.points[self._anchor]))
+        if self.count == 1:
+            path.lineTo(QPointF(*self.points[0]))
+        for index in self._tail:
+            path.lineTo(QPointF(*self.points[index]))
+        return path
+
+    def _bandEpsilon(self):
+        # Same bands as adaptive_epsilon
+        if self.count < 3:
+            return adaptive_epsilon([])
+        average = self._distanceSum / (self.count - 2)
+        return 5.0 if average < 0.5 else 2.0 if average < 1.5 else 0.2
+
+    def _simplifyTail(self):
+        if self.count < 2:
+            self._tail = []
+            return
+        # A tail may end anywhere, even back at its start, so distances are measured to the segments
+        kept = rdp_indices(self.points, self.epsilon, self._anchor, self.count - 1, segments=True)
+        final = kept[1:-2]
+        if self.count - self._anchor > self.MAX_TAIL:
+            # Cut the tail at the current point, a long straight run would otherwise never end it
+            final = kept[1:]
+        if final:
+            if self.stablePath.elementCount() == 0:
+                self.stablePath.moveTo(QPointF(*self.points[self._anchor]))
+            for index in final:
+                self.stablePath.lineTo(QPointF(*self.points[index]))
+            self._anchor = final[-1]
+        self._tail = [index for index in kept if index > self._anchor]
+
+class PolylineStroke:
+    """The polyline pen's stroke in progress: its simplifier, with the final part of the path already rendered.
+
+    The final vertices are stroked once onto a layer in the opaque pen colour. Each draw copies only the tail's
+    bounds of the layer into a scratch image kept for the stroke and adds the tail there. The layer goes onto the
+    canvas at the colour's opacity, so pixels where the stroke crosses itself are still blended once, as when
+    the whole path was drawn in one go.
+    """
+
+    def __init__(self, size, drawingColor, penSize):
+        self.simplifier = PolylineSimplifier()
+        self.color = QColor(drawingColor)
+        self.penSize = penSize
+        self.layer = QImage(size, QImage.Format_ARGB32_Premultiplied)
+        self.layer.fill(Qt.transparent)
+        self.scratch = QImage(size, QImage.Format_ARGB32_Premultiplied)
+        self._rendered = 0  # Elements of the simplifier's final path on the layer
+
+    def add(self, point):
+        self.simplifier.add(point)
+        stable = self.simplifier.stablePath
+        if stable.elementCount() > self._rendered:
+            # The newly final segments, from the last vertex already on the layer
+            start = max(self._rendered - 1, 0)
+            path = QPainterPath(QPointF(stable.elementAt(start).x, stable.elementAt(start).y))
+            for index in range(start + 1, stable.elementCount()):
+                path.lineTo(stable.elementAt(index).x, stable.elementAt(index).y)
+            with QPainter(self.layer) as painter:
+                self._stroke(painter, path)
+            self._rendered = stable.elementCount()
+
+    def draw(self, painter):
+        tail = self.simplifier.tailPath()
+        # Everything the round-capped tail can touch, with a pixel to spare for rounding
+        margin = self.penSize / 2 + 1
+        tailRect = tail.boundingRect().adjusted(-margin, -margin, margin, margin).toAlignedRect() & self.layer.rect()
+        painter.setOpacity(self.color.alphaF())
+        if tailRect.isEmpty():
+            # The tail is off the canvas, and an empty source rect would mean the whole scratch image
+            painter.drawImage(0, 0, self.layer)
+        else:
+            with QPainter(self.scratch) as scratchPainter:
+                scratchPainter.setCompositionMode(QPainter.CompositionMode_Source)
+                scratchPainter.drawImage(tailRect.topLeft(), self.layer, tailRect)
+                scratchPainter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+                self._stroke(scratchPainter, tail)
+            painter.save()
+            painter.setClipRegion(QRegion(self.layer.rect()).subtracted(QRegion(tailRect)))
+            painter.drawImage(0, 0, self.layer)
+            painter.restore()
+            painter.drawImage(tailRect.topLeft(), self.scratch, tailRect)
+        painter.setOpacity(1.0)
+
+    def _stroke(self, painter, path):
+        opaque = QColor(self.color)
+        opaque.setAlpha(255)
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        painter.setPen(QPen(opaque, self.penSize, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
+        painter.drawPath(path)
+
 def drawPolyline(painter, polylinePoints, drawingColor, penSize):
     """Draw a simplified polyline."""
     if not polylinePoints:  # check if the list is empty
@@ -1,8 +1,8 @@
 from PyQt5.QtWidgets import QGraphicsView
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPainter
-from Components.Canvas.DrawingBrushes import (PenType, drawRoundedPen, drawSquarePen, drawDefaultPen, drawLineTool, drawEraser, drawPolyline)
-from Components.Canvas.DrawingUtilities import drawWithPen, interpolatedPoints
+from Components.Canvas.DrawingBrushes import (PenType, drawRoundedPen, drawSquarePen, drawDefaultPen, drawLineTool, drawEraser, PolylineStroke)
+from Components.Canvas.DrawingUtilities import drawWithPen, drawStroke, interpolatedCoordinates
 
 
 class DrawEventsMixin(QGraphicsView):
@@ -53,7 +53,7 @@ class DrawEventsMixin(QGraphicsView):
         with QPainter(self.pixmap) as painter:
             self.draw_with_current_settings(painter)
 
-        self.update_canvas_and_view()
+        self.markDirty(self.penRect(self.lastPoint))
         
         if self.penType in [PenType.LINE, PenType.POLYLINE]:
             self.handle_line_and_polyline()
@@ -62,28 +62,22 @@ class DrawEventsMixin(QGraphicsView):
             self.showEraserIndicator = True
 
     def cache_current_state_if_needed(self):
-        """Cache the current state if not in undo/redo action."""
+        """Record the current state in the undo history if not in undo/redo action."""
         if not self.in_undo_redo_action:
-            file_path = self.cache_pixmap_to_disk(self.pixmap)
-            self.previousDrawings.append(file_path)
-            self.redoDrawings.clear()  # Clear redo states since a new drawing action starts
+            self.history.record(self.pixmap)  # Also clears redo states since a new drawing action starts
 
     def draw_with_current_settings(self, painter):
         """Draw on the canvas using the current settings."""
         drawWithPen(painter, self.penType, self.drawingColor, self.penSize, point=self.lastPoint, startPoint=self.startPoint, polylinePoints=self.polylinePoints)
 
-    def update_canvas_and_view(self):
-        """Update the canvas and the view."""
-        self.scene.clear()
-        self.scene.addPixmap(self.pixmap)
-        self.update()
-
     def handle_line_and_polyline(self):
         """Handle specific logic for line and polyline."""
         self.startPoint = self.lastPoint
         self.tempPixmap = self.pixmap.copy()
         if self.penType == PenType.POLYLINE:
             self.polylinePoints.append(self.lastPoint)
+            self.polylineStroke = PolylineStroke(self.pixmap.size(), self.drawingColor, self.penSize)
+            self.polylineStroke.add(self.lastPoint)
 
     def start_drawing(self, event):
         """Initial setup when starting to draw."""
@@ -95,6 +89,8 @@ class DrawEventsMixin(QGraphicsView):
             self.startPoint = self.lastPoint
             if self.penType == PenType.POLYLINE:
                 self.polylinePoints.append(self.lastPoint)
+                self.polylineStroke = PolylineStroke(self.pixmap.size(), self.drawingColor, self.penSize)
+                self.polylineStroke.add(self.lastPoint)
             self.tempPixmap = self.pixmap.copy()
 
         if self.penType == PenType.ERASER:
@@ -109,7 +105,6 @@ class DrawEventsMixin(QGraphicsView):
             self.draw_continuous_line(currentPoint)
 
         self.lastPoint = currentPoint
-        self.scene.update()
 
     def draw_temp_pixmap(self, currentPoint):
         """Draw on a temporary pixmap for tools like line and polyline."""
@@ -117,19 +112,20 @@ class DrawEventsMixin(QGraphicsView):
         with QPainter(self.pixmap) as painter:
             if self.penType == PenType.LINE:
                 drawLineTool(painter, self.startPoint, currentPoint, self.drawingColor, self.penSize)
+                # The previous preview line is gone as well
+                dirty = self.penRect(self.startPoint, self.lastPoint, currentPoint)
             elif self.penType == PenType.POLYLINE:
                 self.polylinePoints.append(currentPoint)
-                drawPolyline(painter, self.polylinePoints, self.drawingColor, self.penSize)
-        self.scene.clear()
-        self.scene.addPixmap(self.pixmap)
+                self.polylineStroke.add(currentPoint)
+                self.polylineStroke.draw(painter)
+                dirty = self.penRect(*self.polylineStroke.simplifier.bounds)
+        self.markDirty(dirty)
 
     def draw_continuous_line(self, currentPoint):
         """Draw continuous lines for tools like pencil and eraser."""
         with QPainter(self.pixmap) as painter:
-            for point in interpolatedPoints(self.lastPoint, currentPoint):
-                drawWithPen(painter, self.penType, self.drawingColor, self.penSize, point=point, startPoint=self.startPoint, polylinePoints=self.polylinePoints)
-        self.scene.clear()
-        self.scene.addPixmap(self.pixmap)
+            drawStroke(painter, self.penType, self.drawingColor, self.penSize, interpolatedCoordinates(self.lastPoint, currentPoint))
+        self.markDirty(self.penRect(self.lastPoint, currentPoint))
 
     def handle_left_button_release(self, event):
         """Finish the drawing when the left mouse button is released."""
@@ -137,10 +133,10 @@ class DrawEventsMixin(QGraphicsView):
         if self.penType == PenType.LINE and self.startPoint and endPoint:
             with QPainter(self.pixmap) as painter:
                 drawLineTool(painter, self.startPoint, endPoint, self.drawingColor, self.penSize)
-            self.scene.clear()
-            self.scene.addPixmap(self.pixmap)
+            self.markDirty(self.penRect(self.startPoint, endPoint))
         elif self.penType == PenType.POLYLINE:
             self.polylinePoints = []
+            self.polylineStroke = None
 
         if self.penType == PenType.ERASER:
             self.showEraserIndicator = False
@@ -153,6 +149,5 @@ class DrawEventsMixin(QGraphicsView):
         """Update the pixmap with the current drawing."""
         with QPainter(self.pixmap) as painter:
             drawWithPen(painter, self.penType, self.drawingColor, self.penSize, point=self.lastPoint, startPoint=self.startPoint, polylinePoints=self.polylinePoints)
-        self.scene.clear()
-        self.scene.addPixmap(self.pixmap)
         self.update()
+        self.markDirty(self.penRect(self.lastPoint))
@@ -0,0 +1,197 @@
+import zlib
+import pickle
+import hashlib
+import numpy as np
+from PyQt5.QtGui import QImage, QPixmap
+from Components.Overlay.AdaptiveContrast import image_array
+
+TILE_SIZE = 16  # Canvas pixels per tile side; only tiles an action changed are stored
+DEFAULT_BUDGET_BYTES = 4 * 1024 * 1024
+_ENTRY_OVERHEAD = 64  # Rough bookkeeping cost per stored tile, so budgets hold for tiny tiles too
+
+
+def _pixels(pixmap) -> np.ndarray:
+    """Copy a QPixmap or QImage into a (height, width, 4) premultiplied ARGB array."""
+    image = pixmap.toImage() if isinstance(pixmap, QPixmap) else pixmap
+    # Held in a variable, the view must not outlive the converted image
+    image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    return image_array(image).copy()
+
+
+def _image(pixels: np.ndarray) -> QImage:
+    image = QImage(pixels.shape[1], pixels.shape[0], QImage.Format_ARGB32_Premultiplied)
+    image_array(image)[:] = pixels
+    return image
+
+
+class DrawingHistory:
+    """Undo and redo for the canvas, held in memory as the tiles each action changed.
+
+    record() is called before every action with the canvas as it is; the action itself is only compared with that
+    snapshot when the next action starts, or on undo/redo, so drawing never waits on it. An entry keeps the
+    before and after contents of every changed tile, zlib-compressed and shared by content hash, so the many
+    identical tiles (empty ones above all) are stored once. Once the stored tiles exceed the byte budget the oldest
+    entries are handed to the spill, or dropped. Undo and redo are memory copies unless they reach a spilled step.
+    """
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES, spill=None):
+        self.budget_bytes = budget_bytes
+        self.spill = spill  # A HistorySpill taking the steps over budget, they are dropped without one
+        # Oldest first; an entry is (shape before, shape after, [(y, x, before key, after key)]) or the path of a
+        # spilled one, which are always the oldest
+        self.undoEntries = []
+        self.redoEntries = []
+        self.bytesUsed = 0
+        self._blobs = {}  # (height, width, content hash) -> [compressed tile, reference count]
+        self._snapshot = None  # The canvas when the pending action started, None when no action is pending
+
+    def record(self, pixmap):
+        """An action is about to change the canvas."""
+        self._seal(pixmap)
+        self._snapshot = _pixels(pixmap)
+        self._dropEntries(self.redoEntries)
+
+    def undo(self, pixmap) -> QImage:
+        """Return the canvas before the latest action, or None if there is nothing to undo."""
+        self._seal(pixmap)
+        if not self.undoEntries:
+            return None
+        entry = self.undoEntries.pop()
+        if isinstance(entry, str):
+            entry = self._load(entry)
+            if entry is None:
+                return None
+        self.redoEntries.append(entry)
+        return _image(self._apply(_pixels(pixmap), entry[0], entry[2], before=True))
+
+    def redo(self, pixmap) -> QImage:
+        """Return the canvas after the latest undone action, or None if there is nothing to redo."""
+        self._seal(pixmap)
+        if not self.redoEntries:
+            return None
+        entry = self.redoEntries.pop()
+        self.undoEntries.append(entry)
+        return _image(self._apply(_pixels(pixmap), entry[1], entry[2], before=False))
+
+    def clear(self):
+        for entry in self.undoEntries:
+            if isinstance(entry, str):
+                self.spill.remove(entry)
+        self.undoEntries.clear()
+        self.redoEntries.clear()
+        self._blobs.clear()
+        self.bytesUsed = 0
+        self._snapshot = None
+
+    def _seal(self, pixmap):
+        """Store what the pending action changed, if anything."""
+        if self._snapshot is None:
+            return
+        before, self._snapshot = self._snapshot, None
+        after = _pixels(pixmap)
+        if before.shape != after.shape:
+            # The canvas was resized, the whole of both images is kept
+            tiles = [(y, x) for y in range(0, max(before.shape[0], after.shape[0]), TILE_SIZE)
+                     for x in range(0, max(before.shape[1], after.shape[1]), TILE_SIZE)]
+        else:
+            changed = (before != after).any(axis=2)
+            # Pad to whole tiles, then fold every tile into one flag
+            rows, cols = -(-changed.shape[0] // TILE_SIZE), -(-changed.shape[1] // TILE_SIZE)
+            padded = np.zeros((rows * TILE_SIZE, cols * TILE_SIZE), bool)
+            padded[:changed.shape[0], :changed.shape[1]] = changed
+            flags = padded.reshape(rows, TILE_SIZE, cols, TILE_SIZE).any(axis=(1, 3))
+            tiles = [(row * TILE_SIZE, col * TILE_SIZE) for row, col in zip(*np.nonzero(flags))]
+        if not tiles:
+            return
+
+        stored = [(y, x, self._store(before[y:y + TILE_SIZE, x:x + TILE_SIZE]), self._store(after[y:y + TILE_SIZE, x:x + TILE_SIZE]))
+                  for y, x in tiles]
+        self.undoEntries.append((before.shape, after.shape, stored))
+        while self.bytesUsed > self.budget_bytes:
+            # The oldest step still in memory, never the one just stored
+            index = next((i for i, entry in enumerate(self.undoEntries[:-1]) if not isinstance(entry, str)), None)
+            if index is None:
+                break
+            self._evict(index)
+
+    def _evict(self, index):
+        """Move an undo step out of memory, to the spill if there is one and it has room."""
+        entry = self.undoEntries[index]
+        path = None
+        if self.spill is not None:
+            blobs = {key: self._blobs[key][0] for _, _, before_key, after_key in entry[2] for key in (before_key, after_key) if key is not None}
+            path = self.spill.write(pickle.dumps((entry, blobs)))
+        if path is None:
+            # The spilled steps before it could no longer be undone to
+            self._dropEntries(self.undoEntries, index + 1)
+            return
+        self._releaseEntry(entry)
+        self.undoEntries[index] = path
+        while self.spill.overCap() and isinstance(self.undoEntries[0], str):
+            self.spill.remove(self.undoEntries.pop(0))
+
+    def _load(self, path):
+        """Bring a spilled step back into memory."""
+        data = self.spill.read(path)
+        self.spill.remove(path)
+        if data is None:
+            return None
+        entry, blobs = pickle.loads(data)
+        for key, compressed in blobs.items():
+            if key not in self._blobs:
+                self._blobs[key] = [compressed, 0]
+                self.bytesUsed += len(compressed) + _ENTRY_OVERHEAD
+        for _, _, before_key, after_key in entry[2]:
+            for key in (before_key, after_key):
+                if key is not None:
+                    self._blobs[key][1] += 1
+        return entry
+
+    def _store(self, tile: np.ndarray):
+        """Keep a tile (possibly cut off at the canvas edge) and return its key, None for an area outside the canvas."""
+        if tile.size == 0:
+            return None
+        data = tile.tobytes()
+        key = (tile.shape[0], tile.shape[1], hashlib.blake2b(data, digest_size=16).digest())
+        blob = self._blobs.get(key)
+        if blob is None:
+            blob = self._blobs[key] = [zlib.compress(data, 1), 0]
+            self.bytesUsed += len(blob[0]) + _ENTRY_OVERHEAD
+        blob[1] += 1
+        return key
+
+    def _release(self, key):
+        if key is None:
+            return
+        blob = self._blobs[key]
+        blob[1] -= 1
+        if blob[1] == 0:
+            del self._blobs[key]
+            self.bytesUsed -= len(blob[0]) + _ENTRY_OVERHEAD
+
+    def _dropEntries(self, entries, count=None):
+        """Forget the oldest count entries of a stack, all of them by default."""
+        count = len(entries) if count is None else count
+        for entry in entries[:count]:
+            if isinstance(entry, str):
+                self.spill.remove(entry)
+            else:
+                self._releaseEntry(entry)
+        del entries[:count]
+
+    def _releaseEntry(self, entry):
+        for _, _, before_key, after_key in entry[2]:
+            self._release(before_key)
+            self._release(after_key)
+
+    def _apply(self, pixels: np.ndarray, shape, stored, before: bool) -> np.ndarray:
+        """Write the before or after tiles of an entry over the canvas, resizing it to that side's shape first."""
+        if pixels.shape != shape:
+            pixels = np.zeros(shape, np.uint8)
+        for y, x, before_key, after_key in stored:
+            key = before_key if before else after_key
+            if key is None:
+                continue
+            height, width = key[:2]
+            pixels[y:y + height, x:x + width] = np.frombuffer(zlib.decompress(self._blobs[key][0]), np.uint8).reshape(height, width, 4)
+        return pixels
@@ -5,8 +5,7 @@ from PyQt5.QtCore import QPoint
 def apply_drawing_preset(drawArea, preset_func):
     drawArea.clearDrawing()
     preset_func(drawArea.pixmap, drawArea.drawingColor, drawArea.penSize)
-    drawArea.scene.clear()
-    drawArea.scene.addPixmap(drawArea.pixmap)
+    drawArea.markDirty()
 
 def applyPreset1(pixmap, drawingColor, penSize):
     with QPainter(pixmap) as painter:
@@ -0,0 +1,153 @@
+import os
+import glob
+import queue
+import shutil
+import threading
+import psutil
+from PyQt5.QtCore import QCoreApplication
+from Components.Settings.Config import CROSSPIXEL_DIR_PATH
+
+HISTORY_DIR_PATH = os.path.join(CROSSPIXEL_DIR_PATH, "history")
+DEFAULT_DISK_CAP_BYTES = 64 * 1024 * 1024
+QUEUE_SIZE = 32  # Writes waiting for the writer thread; past this, steps are dropped instead of spilled
+CLOSE_TIMEOUT_S = 0.5
+
+
+def _session_name(process: psutil.Process) -> str:
+    # The start time tells a live session from a dead one whose process ID was reused
+    return f"{process.pid}-{int(process.create_time())}"
+
+
+def _is_orphan(name: str) -> bool:
+    try:
+        pid = int(name.split("-")[0])
+        return _session_name(psutil.Process(pid)) != name
+    except (ValueError, psutil.Error):
+        return True
+
+
+class HistorySpill:
+    """Moves undo steps that no longer fit in memory to disk, on a single background thread.
+
+    Each process writes into its own session directory under HISTORY_DIR_PATH. At startup the writer deletes
+    sessions whose process is gone (left behind by a crash) and the per-step PNGs older versions saved. The GUI
+    thread only ever enqueues work: a write that does not fit in the queue is refused, so the caller drops the
+    step as it would without spilling. A step stays readable from memory until it is on disk. The session
+    directory is removed when the application quits.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if not isinstance(cls._instance, cls):
+            cls._instance = super(HistorySpill, cls).__new__(cls)
+            cls._instance._setup()
+        return cls._instance
+
+    def _setup(self):
+        self.sessionPath = os.path.join(HISTORY_DIR_PATH, _session_name(psutil.Process()))
+        self.cap_bytes = DEFAULT_DISK_CAP_BYTES
+        self.bytesOnDisk = 0  # Counted when a write is queued, so the cap holds before the writer catches up
+        self._sizes = {}  # path -> size of every step spilled and not removed yet, guarded by _lock like _pending
+        self._pending = {}  # path -> data not written yet
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._queue = queue.Queue(QUEUE_SIZE)
+        self._queue.put_nowait((self._cleanup, ()))
+        self._thread = threading.Thread(target=self._run, name="HistorySpill", daemon=True)
+        self._thread.start()
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.close)
+
+    def write(self, data: bytes):
+        """Queue a step for writing and return the path it will have, or None if the queue is full."""
+        self._counter += 1
+        path = os.path.join(self.sessionPath, f"{self._counter}.step")
+        with self._lock:
+            self._pending[path] = data
+            self._sizes[path] = len(data)
+        try:
+            self._queue.put_nowait((self._write, (path,)))
+        except queue.Full:
+            with self._lock:
+                del self._pending[path]
+                del self._sizes[path]
+            return None
+        self.bytesOnDisk += len(data)
+        return path
+
+    def read(self, path: str):
+        """Return a spilled step's data, None if it is lost."""
+        with self._lock:
+            data = self._pending.get(path)
+        if data is not None:
+            return data
+        try:
+            with open(path, 'rb') as file:
+                return file.read()
+        except OSError as e:
+            print(f"Error reading undo step: {e}")
+            return None
+
+    def remove(self, path: str):
+        """Forget a spilled step; its file is deleted in the background."""
+        with self._lock:
+            self.bytesOnDisk -= self._sizes.pop(path, 0)
+            self._pending.pop(path, None)
+        try:
+            self._queue.put_nowait((self._remove, (path,)))
+        except queue.Full:
+            pass  # The file goes with the session directory
+
+    def overCap(self) -> bool:
+        return self.bytesOnDisk > self.cap_bytes
+
+    def close(self):
+        """Delete the session directory and stop the writer, waiting for it only briefly."""
+        try:
+            self._queue.put((None, ()), timeout=CLOSE_TIMEOUT_S)
+        except queue.Full:
+            return  # The next start removes the session as an orphan
+        self._thread.join(CLOSE_TIMEOUT_S)
+
+    def _run(self):
+        while True:
+            func, args = self._queue.get()
+            if func is None:
+                shutil.rmtree(self.sessionPath, ignore_errors=True)
+                return
+            try:
+                func(*args)
+            except OSError as e:
+                print(f"History spill: {e}")
+
+    def _write(self, path):
+        with self._lock:
+            data = self._pending.get(path)
+        if data is None:
+            return  # Removed before it was written
+        os.makedirs(self.sessionPath, exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(data)
+        with self._lock:
+            self._pending.pop(path, None)
+            removed = path not in self._sizes
+        if removed:
+            # Removed while it was being written, the queued removal ran first
+            os.remove(path)
+
+    def _remove(self, path):
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _cleanup(self):
+        if os.path.isdir(HISTORY_DIR_PATH):
+            for name in os.listdir(HISTORY_DIR_PATH):
+                if _is_orphan(name):
+                    shutil.rmtree(os.path.join(HISTORY_DIR_PATH, name), ignore_errors=True)
+        for file_path in glob.glob(os.path.join(CROSSPIXEL_DIR_PATH, "*.png")):
+            try:
+                os.remove(file_path)
+            except OSError as e:
+                print(f"Could not delete old undo image {file_path}: {e}")
@@ -7,9 +7,14 @@ from Components.Canvas.DrawingAreaMain import DrawArea, PenType
 class EventHandlersMixin:
     # ----- Drawing Methods -----
     def applyCrosshair(self):
-        drawn_pixmap = self.drawingBoard.pixmap.copy()
-        self.overlay.setOverlayImage(drawn_pixmap)
+        pending_animation = getattr(self, "pendingAnimation", None)
+        if pending_animation and pending_animation[1] == self.drawingBoard.pixmap.cacheKey():
+            self.overlay.setOverlayAnimation(pending_animation[0])
+        else:
+            drawn_pixmap = self.drawingBoard.pixmap.copy()
+            self.overlay.setOverlayImage(drawn_pixmap)
         self.overlay.show()  # Make sure the overlay widget is shown after setting the overlay image
+        self.crosshairApplied.emit()
 
     def changeDrawingColor(self, color: QColor):
         # Use the QColor object as needed
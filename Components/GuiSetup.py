@@ -6,13 +6,22 @@ from Components.OverlayCrosshairToScreen import OverlayCrosshairToScreen
 from Components.Canvas.DrawingAreaMain import DrawArea, PenType
 from Components.Settings.Settings import SettingsDialog
 from Components.Colorpicker import ColorCircle,  ColorCircleDialog
+from Components.Overlay.FrameAtlas import FrameAtlas
+from Components.Overlay.SharedOverlay import OverlayProcessProxy
+from Components.Overlay.LivePreview import LivePreview
 
 class GuiSetupMixin:
     
     def setupAttributes(self):
         """Setup any required attributes for the UI."""
-        self.overlay = OverlayCrosshairToScreen()
+        if getattr(self, "overlay", None) is not None:
+            pass  # Editor rebuilt in tray mode, the overlay outlived the previous one
+        elif self.keybinds.get_keybind("overlay_separate_process"):
+            self.overlay = OverlayProcessProxy()
+        else:
+            self.overlay = OverlayCrosshairToScreen()
         self.buttonLayout = QVBoxLayout()
+        self.pendingAnimation = None  # Uploaded animation and the canvas state it was loaded into
         self.current_keybind = None  # Add this line to store current keybind
         self.x_offset_value = 0  # Add this line to store current x offset
         self.y_offset_value = 0  # Add this line to store current y offset
@@ -24,6 +33,11 @@ class GuiSetupMixin:
         self.penSizeSlider.valueChanged.connect(self.updatePresetWithSize)
         self.drawingBoard.setPenSize(self.penSizeSlider.value())
         self.drawingBoard.setPenType(PenType.DEFAULT)
+
+        # Optionally mirror edits to the overlay while drawing
+        self.livePreview = LivePreview(self.drawingBoard, self.overlay, self)
+        self.applyLivePreviewSetting()
+        self.keybinds.register_settings_listener(self.applyLivePreviewSetting)
         
         # Apply the style, dimensions, and layout properties to the penSizeSlider
         self.penSizeSlider.setTickPosition(QSlider.NoTicks)
@@ -32,6 +46,9 @@ class GuiSetupMixin:
         self.penSizeSlider.setStyleSheet(self.slider_stylesheet())  # Apply Stylesheet
 
 
+    def applyLivePreviewSetting(self):
+        self.livePreview.setEnabled(bool(self.keybinds.get_keybind("live_preview")))
+
     def setupControls(self):
         """Setup the control buttons and their styles."""
         # Control buttons
@@ -44,6 +61,10 @@ class GuiSetupMixin:
 
 
         self.clearButton = self.createButton("Clear", self.drawingBoard.clearDrawing)
+        self.outlineButton = self.createButton("Outline", self.drawingBoard.applyOutline)
+        self.outlineButton.setToolTip("Outline the crosshair with the width and colour from the settings")
+        self.clearButton.setFixedSize(64, 25)
+        self.outlineButton.setFixedSize(64, 25)
         self.presetButton = self.createButton("+ Preset", self.drawingBoard.applyPreset1)
         self.preset2Button = self.createButton("⬤ Preset", self.drawingBoard.applyPreset2)
         self.centerViewButton = self.createButton("Center View", self.toggleCenterView)
@@ -85,10 +106,23 @@ class GuiSetupMixin:
             self.drawingBoard.pixmap.save(filePath)
 
     def uploadDrawing(self):
-        filePath, _ = QFileDialog.getOpenFileName(self, "Upload Crosshair", "", "Image Files (*.png *.jpeg *.jpg);;All Files (*)")
-        if filePath:
-            pixmap = QPixmap(filePath)
-            self.drawingBoard.setPixmap(pixmap)
+        # Selecting several files uploads them as the frames of an animation
+        filePaths, _ = QFileDialog.getOpenFileNames(self, "Upload Crosshair", "", "Image Files (*.png *.jpeg *.jpg *.gif);;All Files (*)")
+        if not filePaths:
+            return
+
+        self.pendingAnimation = None
+        if len(filePaths) > 1:
+            atlas = FrameAtlas.fromFiles(filePaths, self.overlay._IMAGE_SIZE)
+        elif FrameAtlas.isAnimated(filePaths[0]):
+            atlas = FrameAtlas.fromFile(filePaths[0], self.overlay._IMAGE_SIZE)
+        else:
+            self.drawingBoard.setPixmap(QPixmap(filePaths[0]))
+            return
+
+        # The canvas shows the first frame, the animation is applied as long as it is left untouched
+        self.drawingBoard.setPixmap(QPixmap.fromImage(atlas.firstFrame()))
+        self.pendingAnimation = (atlas, self.drawingBoard.pixmap.cacheKey())
 
     def createButton(self, text, callback):
         """Utility function to create a button."""
@@ -106,6 +140,8 @@ class GuiSetupMixin:
         
         for button in buttons:
                 button.setStyleSheet(base_button_stylesheet + text_style)
+        # Without letter spacing and padding its label fits the half-width button
+        self.outlineButton.setStyleSheet(base_button_stylesheet + "color: white; padding: 0px;")
                 
         self.penComboBox.setStyleSheet(combobox_stylesheet)
 
@@ -190,7 +226,11 @@ class GuiSetupMixin:
         right_layout.addWidget(self.penSizeSlider)  # Add the penSizeSlider under the penComboBox
         
         # Continue with the rest of the buttons
-        right_layout.addWidget(self.clearButton)
+        clear_outline_layout = QHBoxLayout()
+        clear_outline_layout.setSpacing(2)
+        clear_outline_layout.addWidget(self.clearButton)
+        clear_outline_layout.addWidget(self.outlineButton)
+        right_layout.addLayout(clear_outline_layout)
 
         # Horizontal layout for Undo and Redo
         undo_redo_layout = QHBoxLayout()
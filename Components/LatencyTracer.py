@@ -0,0 +1,141 @@
+import json
+import time
+import threading
+from contextlib import contextmanager
+import numpy as np
+
+RING_SIZE = 4096  # Samples kept per stage, older ones are overwritten
+MAX_PENDING_S = 1.0  # Inputs that have not reached the screen by then are dropped instead of skewing the figures
+
+
+class LatencyTracer:
+    """Timestamps the stages between an input and the overlay reacting to it.
+
+    An input starts a chain ("mouse", "hotkey", ...) on whichever thread received it; every later stage records
+    the time elapsed since that input into a fixed-size ring buffer for "<chain>.<stage>". Only the latest input of
+    each chain is tracked, a new one replaces it. Recording is a lookup and an array store, and does nothing at all
+    while tracing is disabled.
+
+    The code reacting to an input runs inside handling(chain). A repaint it requests (updated()) ties the chain to
+    the next paint, which finish() then closes; repaints from anything else close nothing, and a chain whose
+    handling requested no repaint is cancelled.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if not isinstance(cls._instance, cls):
+            cls._instance = super(LatencyTracer, cls).__new__(cls)
+            cls._instance.enabled = False
+            cls._instance._lock = threading.Lock()
+            cls._instance._pending = {}  # chain -> [start time in ns, whether a repaint was requested for it]
+            cls._instance._current = None  # Chain being handled on the GUI thread, see handling()
+            cls._instance._rings = {}  # "chain.stage" -> [samples in µs, number recorded]
+        return cls._instance
+
+    def setEnabled(self, enabled: bool):
+        with self._lock:
+            self.enabled = enabled
+            self._pending.clear()
+
+    def start(self, chain: str):
+        """An input arrived, following stages are measured from now."""
+        if self.enabled:
+            now = time.perf_counter_ns()
+            with self._lock:
+                self._pending[chain] = [now, False]
+
+    def mark(self, chain: str, stage: str):
+        """The given chain's latest input reached a stage."""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        with self._lock:
+            pending = self._pending.get(chain)
+            if pending is not None:
+                self._record(chain, stage, pending[0], now)
+
+    @contextmanager
+    def handling(self, chain: str):
+        """Run the reaction to the chain's latest input; it is cancelled if the reaction requested no repaint."""
+        self._current = chain
+        try:
+            yield
+        finally:
+            self._current = None
+            with self._lock:
+                pending = self._pending.get(chain)
+                if pending is not None and not pending[1]:
+                    del self._pending[chain]
+
+    def updated(self):
+        """The overlay requested a repaint. If an input is being handled, it is measured until that paint."""
+        if not self.enabled or self._current is None:
+            return
+        now = time.perf_counter_ns()
+        with self._lock:
+            pending = self._pending.get(self._current)
+            if pending is not None and not pending[1]:
+                pending[1] = True
+                self._record(self._current, "update", pending[0], now)
+
+    def finish(self, stage: str):
+        """The overlay painted: record the final stage of the chains that requested a repaint and close them."""
+        if not self.enabled or not self._pending:
+            return
+        now = time.perf_counter_ns()
+        with self._lock:
+            for chain, (start, repainting) in list(self._pending.items()):
+                if repainting:
+                    self._record(chain, stage, start, now)
+                    self._pending.pop(chain, None)
+
+    def finishHandled(self, stage: str):
+        """The overlay reacted without a repaint (hiding, moving the window): close the chain being handled."""
+        if not self.enabled or self._current is None:
+            return
+        now = time.perf_counter_ns()
+        with self._lock:
+            pending = self._pending.get(self._current)
+            if pending is not None:
+                self._record(self._current, stage, pending[0], now)
+                self._pending.pop(self._current, None)
+
+    def cancel(self, chain: str):
+        """The input turned out to need no redraw, nothing will finish it."""
+        with self._lock:
+            self._pending.pop(chain, None)
+
+    def _record(self, chain, stage, start, now):
+        if now - start > MAX_PENDING_S * 1e9:
+            del self._pending[chain]
+            return
+        ring = self._rings.get(f"{chain}.{stage}")
+        if ring is None:
+            ring = self._rings[f"{chain}.{stage}"] = [np.zeros(RING_SIZE), 0]
+        ring[0][ring[1] % RING_SIZE] = (now - start) / 1000
+        ring[1] += 1
+
+    def summary(self) -> dict:
+        """Return count, p50, p99 and max in milliseconds for every stage recorded so far."""
+        with self._lock:
+            rings = {name: (samples[:min(count, RING_SIZE)].copy(), count) for name, (samples, count) in self._rings.items()}
+        summary = {}
+        for name, (samples, count) in sorted(rings.items()):
+            p50, p99 = np.percentile(samples, [50, 99]) / 1000
+            summary[name] = {"count": count, "p50_ms": round(p50, 3), "p99_ms": round(p99, 3), "max_ms": round(samples.max() / 1000, 3)}
+        return summary
+
+    def dump(self, file_path: str):
+        """Write the summary to a JSON file."""
+        try:
+            with open(file_path, 'w') as file:
+                json.dump(self.summary(), file, indent=2)
+            print(f"Latency figures written to {file_path}")
+        except OSError as e:
+            print(f"Error writing latency figures: {e}")
+
+    def reset(self):
+        with self._lock:
+            self._rings.clear()
+            self._pending.clear()
@@ -7,6 +7,7 @@ class MemoryManager:
     def __init__(self):
         self.buffer = None
         self.print_lock = threading.Lock()
+        self.suspended = False  # No buffer is allocated while set, e.g. in tray mode
 
         # Start a thread to monitor memory usage
         self.monitor_thread = threading.Thread(target=self._monitor_memory_usage)
@@ -36,6 +37,9 @@ class MemoryManager:
     def allocate_memory(self, size: int, data=None):
         """Allocate or resize memory to the given size and prevent buffer overflow."""
         with self.print_lock:
+            if self.suspended:
+                return
+
             if not isinstance(size, int) or size <= 0:
                 print("Invalid memory size. It must be a positive integer.")
                 return
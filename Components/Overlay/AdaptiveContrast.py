@@ -0,0 +1,180 @@
+import time
+import numpy as np
+from PyQt5.QtCore import Qt, QObject, QPoint, QRect, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QColor
+
+# Rec. 709 luma weights in the byte order of Format_RGB32 pixels on little-endian machines (B, G, R, A)
+_LUMA_WEIGHTS_BGR = np.array([0.0722, 0.7152, 0.2126]) / 255
+
+
+def image_array(image: QImage) -> np.ndarray:
+    """Return a (height, width, 4) view onto the pixels of a 32-bit QImage, without copying."""
+    bits = image.bits()
+    bits.setsize(image.byteCount())
+    return np.frombuffer(bits, np.uint8).reshape(image.height(), image.bytesPerLine() // 4, 4)[:, :image.width()]
+
+
+def crosshair_luminance(image: QImage) -> float:
+    """Mean luminance (0-1) of the visible pixels of a crosshair image."""
+    # Held in a variable, the view must not outlive the converted image
+    image = image.convertToFormat(QImage.Format_ARGB32)
+    pixels = image_array(image)
+    visible = pixels[..., 3] > 0
+    if not visible.any():
+        return 0.0
+    return float((pixels[visible][:, :3] @ _LUMA_WEIGHTS_BGR).mean())
+
+
+class AdaptiveContrast(QObject):
+    """Samples a ring of pixels behind the crosshair and picks whichever crosshair colour variant stands out more.
+
+    The ring is captured into one fixed-size image and read through a preallocated numpy view, so each sample only
+    costs the capture plus a few vectorized operations on a few hundred pixels.
+    """
+
+    HYSTERESIS = 0.15  # How much better the other variant has to contrast before switching to it
+
+    variantChanged = pyqtSignal(bool)  # True when the alternate colour variant should be shown
+
+    def __init__(self, source, rate: float = 4, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.center = QPoint(0, 0)
+        self.useAlternate = False
+        self.meanLuminance = 0.0
+        self.contrast = 0.0  # Standard deviation of the ring's luminance
+        self.sampleCost = 0.0  # Smoothed seconds spent per sample
+
+        self.crosshairLuminance = 1.0
+        self.alternateColor = QColor(Qt.black)
+        self.alternateLuminance = 0.0
+        self._footprint = None  # (height, width) mask of the pixels the crosshair covers on screen, centered on center
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.VeryCoarseTimer if rate <= 1 else Qt.CoarseTimer)
+        self.timer.timeout.connect(self.sample)
+        self.setRate(rate)
+        self.setRing(20, 24)
+
+    def setRate(self, rate: float):
+        self.timer.setInterval(int(1000 / max(0.1, rate)))
+
+    def setRing(self, inner_radius: int, outer_radius: int):
+        """Sample a ring between the two radii around the crosshair center, minus the pixels the crosshair covers."""
+        self.inner_radius, self.outer_radius = inner_radius, outer_radius
+        self._buildRing()
+
+    def _buildRing(self):
+        """Allocate the sample buffers for the ring.
+
+        The capture includes the overlay itself on some platforms, so pixels under the crosshair would measure its own
+        colour. Those are left out, and if the crosshair covers the whole ring it moves outwards until it is clear.
+        """
+        inner_radius, outer_radius = self.inner_radius, self.outer_radius
+        while True:
+            y, x = np.mgrid[-outer_radius:outer_radius + 1, -outer_radius:outer_radius + 1]
+            distance = np.hypot(x, y)
+            covered = self._covered(outer_radius)
+            ring = (distance >= inner_radius) & (distance <= outer_radius) & ~covered
+            if ring.any() or not covered.any():
+                break
+            inner_radius, outer_radius = outer_radius + 1, outer_radius + 1 + (self.outer_radius - self.inner_radius)
+
+        self.sample_radius = outer_radius
+        size = 2 * outer_radius + 1
+        self.buffer = QImage(size, size, QImage.Format_RGB32)
+        self.buffer.fill(Qt.black)
+        # 32-bit scanlines are never padded, so the buffer is one flat run of pixels
+        self._pixels = image_array(self.buffer).reshape(-1, 4)
+
+        rows, cols = np.nonzero(ring)
+        self._ringIndex = rows * size + cols
+
+        self._ring = np.empty((len(self._ringIndex), 4), np.uint8)
+        self._ringFloat = np.empty((len(self._ringIndex), 4))
+        self._luminance = np.empty(len(self._ringIndex))
+
+    def _covered(self, radius: int) -> np.ndarray:
+        """The footprint cut to a square of the given radius around the center, outside it is uncovered."""
+        size = 2 * radius + 1
+        covered = np.zeros((size, size), bool)
+        if self._footprint is None:
+            return covered
+        height, width = self._footprint.shape
+        # The center is the middle pixel of the footprint, rounded down as QRect.center() does
+        top, left = (height - 1) // 2 - radius, (width - 1) // 2 - radius
+        rows = slice(max(0, top), min(height, top + size))
+        cols = slice(max(0, left), min(width, left + size))
+        covered[rows.start - top:rows.stop - top, cols.start - left:cols.stop - left] = self._footprint[rows, cols]
+        return covered
+
+    def setCrosshair(self, image: QImage, alternate_color: QColor = None, footprint: QImage = None):
+        """Measure the applied crosshair and choose the colour of its alternate variant.
+
+        footprint is the crosshair as drawn on screen, outline included, and keeps the ring off its pixels.
+        """
+        self.crosshairLuminance = crosshair_luminance(image)
+        if footprint is not None:
+            # Held in a variable, the view must not outlive the converted image
+            footprint = footprint.convertToFormat(QImage.Format_ARGB32)
+            self._footprint = image_array(footprint)[..., 3] > 0
+        else:
+            self._footprint = None
+        self._buildRing()
+        if alternate_color is None or not alternate_color.isValid():
+            # Pick whichever of black or white is further from the crosshair's own colour
+            alternate_color = QColor(Qt.black) if self.crosshairLuminance >= 0.5 else QColor(Qt.white)
+        self.alternateColor = alternate_color
+        self.alternateLuminance = (0.2126 * alternate_color.redF() + 0.7152 * alternate_color.greenF() + 0.0722 * alternate_color.blueF())
+
+    def setCenter(self, center: QPoint):
+        """Set the global position the ring is centered on."""
+        self.center = center
+
+    def sampleRect(self) -> QRect:
+        size = 2 * self.sample_radius + 1
+        return QRect(self.center.x() - self.sample_radius, self.center.y() - self.sample_radius, size, size)
+
+    def start(self):
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def sample(self):
+        """Capture the ring, measure its luminance and switch variants if the other one clearly contrasts more."""
+        start = time.perf_counter()
+        self.source.grabInto(self.buffer, self.sampleRect())
+
+        np.take(self._pixels, self._ringIndex, axis=0, out=self._ring)
+        np.copyto(self._ringFloat, self._ring)
+        np.matmul(self._ringFloat[:, :3], _LUMA_WEIGHTS_BGR, out=self._luminance)
+        self.meanLuminance = float(self._luminance.mean())
+        self.contrast = float(self._luminance.std())
+
+        self._decide()
+        # Exponential moving average of the per-sample cost
+        self.sampleCost += (time.perf_counter() - start - self.sampleCost) * 0.1
+
+    def _decide(self):
+        original = abs(self.meanLuminance - self.crosshairLuminance)
+        alternate = abs(self.meanLuminance - self.alternateLuminance)
+        if not self.useAlternate and alternate > original + self.HYSTERESIS:
+            self.useAlternate = True
+            self.variantChanged.emit(True)
+        elif self.useAlternate and original > alternate + self.HYSTERESIS:
+            self.useAlternate = False
+            self.variantChanged.emit(False)
+
+
+def benchmark(file_path: str, iterations: int = 1000) -> float:
+    """Sample the center of a screenshot file repeatedly and return the mean cost per sample in milliseconds."""
+    from Components.Overlay.FrameSources import ImageFrameSource
+
+    source = ImageFrameSource.fromFile(file_path, QPoint(0, 0))
+    sampler = AdaptiveContrast(source)
+    sampler.setCenter(source.image.rect().center())
+    start = time.perf_counter()
+    for _ in range(iterations):
+        sampler.sample()
+    return (time.perf_counter() - start) / iterations * 1000
@@ -0,0 +1,101 @@
+"""Command line client for the overlay control API.
+
+    python -m Components.Overlay.ControlClient state
+    python -m Components.Overlay.ControlClient toggle
+    python -m Components.Overlay.ControlClient offset 10 -4
+    python -m Components.Overlay.ControlClient nudge 1 0
+    python -m Components.Overlay.ControlClient switch C:/crosshairs/dot.png
+    python -m Components.Overlay.ControlClient ping --repeat 1000
+    python -m Components.Overlay.ControlClient latency latency.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from PyQt5.QtCore import QCoreApplication
+from PyQt5.QtNetwork import QLocalSocket
+from Components.Overlay.ControlServer import SERVER_NAME
+
+
+class ControlClient:
+    """Blocking client, keeps one connection open for any number of requests."""
+
+    def __init__(self, name: str = SERVER_NAME, timeout_ms: int = 2000):
+        self.timeout_ms = timeout_ms
+        self.socket = QLocalSocket()
+        self.socket.connectToServer(name)
+        if not self.socket.waitForConnected(timeout_ms):
+            raise ConnectionError(f"CrossPixel control API is not running ({self.socket.errorString()})")
+        self._next_id = 0
+
+    def send(self, command: dict) -> dict:
+        """Send one request and wait for its response."""
+        self._next_id += 1
+        request = dict(command, id=self._next_id)
+        self.socket.write(json.dumps(request).encode() + b"\n")
+        self.socket.waitForBytesWritten(self.timeout_ms)
+        while not self.socket.canReadLine():
+            if not self.socket.waitForReadyRead(self.timeout_ms):
+                raise TimeoutError("No response from CrossPixel")
+        return json.loads(bytes(self.socket.readLine()))
+
+    def close(self):
+        self.socket.disconnectFromServer()
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="ControlClient", description="Drive the CrossPixel overlay.")
+    parser.add_argument("--repeat", type=int, default=1, help="Send the command this many times and report round-trip latency")
+    commands = parser.add_subparsers(dest="cmd", required=True)
+    for name in ("ping", "state", "toggle", "show", "hide"):
+        commands.add_parser(name)
+    offset = commands.add_parser("offset")
+    offset.add_argument("x", type=int)
+    offset.add_argument("y", type=int)
+    nudge = commands.add_parser("nudge")
+    nudge.add_argument("dx", type=int)
+    nudge.add_argument("dy", type=int)
+    switch = commands.add_parser("switch")
+    switch.add_argument("path")
+    latency = commands.add_parser("latency")
+    latency.add_argument("path", nargs="?", help="Also write the figures to this file")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "offset":
+        command = {"cmd": "set_offset", "x": args.x, "y": args.y}
+    elif args.cmd == "nudge":
+        command = {"cmd": "nudge", "dx": args.dx, "dy": args.dy}
+    elif args.cmd == "switch":
+        command = {"cmd": "switch", "path": args.path}
+    elif args.cmd == "latency":
+        command = {"cmd": "latency", "path": args.path and os.path.abspath(args.path)}
+    else:
+        command = {"cmd": args.cmd}
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    try:
+        client = ControlClient()
+    except ConnectionError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    round_trips = []
+    for _ in range(max(1, args.repeat)):
+        start = time.perf_counter()
+        response = client.send(command)
+        round_trips.append((time.perf_counter() - start) * 1000)
+    client.close()
+
+    print(json.dumps(response))
+    round_trips.sort()
+    print(f"round trip: p50 {percentile(round_trips, 0.5):.3f} ms, p99 {percentile(round_trips, 0.99):.3f} ms over {len(round_trips)}", file=sys.stderr)
+    return 0 if response.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
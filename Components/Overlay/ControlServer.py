@@ -0,0 +1,174 @@
+import json
+import time
+import threading
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+from Components.Overlay.FrameAtlas import FrameAtlas
+
+SERVER_NAME = "CrossPixel-control"
+PROBE_TIMEOUT_MS = 200  # How long start() waits to learn whether a live instance already serves the name
+
+
+class ControlServer(QObject):
+    """Local socket endpoint for scripting the overlay, one JSON object per line in each direction.
+
+    Requests are read and answered on the Qt thread through the socket's signals, so nothing blocks waiting on a
+    client. Loading a new crosshair file is the only slow command; it is decoded on a worker thread and applied
+    when ready.
+    """
+
+    _crosshairLoaded = pyqtSignal(object, object, object)  # (QImage, FrameAtlas or exception; client socket; request)
+
+    def __init__(self, overlay, parent=None):
+        super().__init__(parent)
+        self.overlay = overlay
+        self.crosshairPath = None
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._onNewConnection)
+        self._crosshairLoaded.connect(self._applyCrosshair)
+        self.commands = {
+            "ping": self._ping,
+            "state": self._state,
+            "toggle": self._toggle,
+            "show": self._show,
+            "hide": self._hide,
+            "set_offset": self._setOffset,
+            "nudge": self._nudge,
+            "switch": self._switch,
+            "latency": self._latency,
+        }
+
+    def start(self, name: str = SERVER_NAME) -> bool:
+        probe = QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(PROBE_TIMEOUT_MS):
+            probe.disconnectFromServer()
+            print(f"Control API not started, another instance is listening on {name}")
+            return False
+        if probe.error() in (QLocalSocket.ConnectionRefusedError, QLocalSocket.ServerNotFoundError):
+            # Nobody answers, a socket left behind by a crashed instance would block the name
+            QLocalServer.removeServer(name)
+        if not self.server.listen(name):
+            print(f"Control API could not listen on {name}: {self.server.errorString()}")
+            return False
+        return True
+
+    def stop(self):
+        self.server.close()
+
+    def _onNewConnection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self._onReadyRead(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _onReadyRead(self, socket):
+        while socket.canReadLine():
+            line = bytes(socket.readLine()).strip()
+            if line:
+                self._handle(socket, line)
+
+    def _handle(self, socket, line: bytes):
+        start = time.perf_counter()
+        request = {}
+        try:
+            parsed = json.loads(line)
+            if not isinstance(parsed, dict):
+                raise ValueError("a request must be a JSON object")
+            request = parsed
+            handler = self.commands.get(request.get("cmd"))
+            if handler is None:
+                response = {"ok": False, "error": f"unknown command {request.get('cmd')!r}"}
+            else:
+                response = handler(request, socket)
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+
+        if response is None:
+            return  # Answered asynchronously
+        response.setdefault("ok", True)
+        response["id"] = request.get("id")
+        response["handled_us"] = round((time.perf_counter() - start) * 1e6)
+        self._reply(socket, response)
+
+    def _reply(self, socket, response):
+        socket.write(json.dumps(response).encode() + b"\n")
+        socket.flush()
+
+    # ----- Commands -----
+    def _ping(self, request, socket):
+        return {}
+
+    def _state(self, request, socket):
+        overlay = self.overlay
+        return {
+            "visible": overlay.isVisible(),
+            "x_offset": overlay.x_offset,
+            "y_offset": overlay.y_offset,
+            "opacity": overlay.image_opacity,
+            "size": overlay.imageSize,
+            "animated": overlay.animation is not None,
+            "crosshair": self.crosshairPath,
+        }
+
+    def _toggle(self, request, socket):
+        self.overlay.toggle_visibility()
+        return {"visible": self.overlay.isVisible()}
+
+    def _show(self, request, socket):
+        self.overlay.show()
+        return {"visible": True}
+
+    def _hide(self, request, socket):
+        self.overlay.hide()
+        return {"visible": False}
+
+    def _setOffset(self, request, socket):
+        self.overlay._moveCrosshair(int(request["x"]), int(request["y"]))
+        return {"x_offset": self.overlay.x_offset, "y_offset": self.overlay.y_offset}
+
+    def _nudge(self, request, socket):
+        self.overlay.apply_offset(int(request.get("dx", 0)), int(request.get("dy", 0)))
+        return {"x_offset": self.overlay.x_offset, "y_offset": self.overlay.y_offset}
+
+    def _latency(self, request, socket):
+        """Input latency recorded so far, also written to request["path"] when given."""
+        if request.get("path"):
+            self.overlay.dump_latency(request["path"])
+        return {"tracing": self.overlay.latencyTracer.enabled, "stages": self.overlay.latencyTracer.summary()}
+
+    def _switch(self, request, socket):
+        """Decode the crosshair file off the Qt thread, the reply is sent once it is shown."""
+        path = request["path"]
+
+        def load():
+            try:
+                if FrameAtlas.isAnimated(path):
+                    crosshair = FrameAtlas.fromFile(path, self.overlay._IMAGE_SIZE)
+                else:
+                    crosshair = QImage(path)
+                    if crosshair.isNull():
+                        raise ValueError(f"could not read {path}")
+            except Exception as e:
+                crosshair = e
+            self._crosshairLoaded.emit(crosshair, socket, request)
+
+        threading.Thread(target=load, daemon=True).start()
+        return None
+
+    def _applyCrosshair(self, crosshair, socket, request):
+        if isinstance(crosshair, Exception):
+            response = {"ok": False, "error": str(crosshair)}
+        else:
+            if isinstance(crosshair, FrameAtlas):
+                self.overlay.setOverlayAnimation(crosshair)
+            else:
+                self.overlay.setOverlayImage(QPixmap.fromImage(crosshair))
+            self.crosshairPath = request["path"]
+            response = {"ok": True, "crosshair": self.crosshairPath}
+        response["id"] = request.get("id")
+        if not sip.isdeleted(socket) and socket.isValid():
+            self._reply(socket, response)
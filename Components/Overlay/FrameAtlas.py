@@ -0,0 +1,97 @@
+import math
+from PIL import Image, ImageSequence
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QImage, QPainter
+
+# Fastest frame rate played back, GIFs often declare delays of 0 or 10 ms
+MIN_FRAME_DELAY_MS = 20
+DEFAULT_FRAME_DELAY_MS = 100
+
+
+def grid_columns(frame_count: int) -> int:
+    """Columns of the square-ish grid an atlas lays its frames out in.
+
+    A single row would pass QPainter's 32767 pixel limit after a few dozen large frames, the grid keeps both sides
+    near the square root of the frame count instead.
+    """
+    return max(1, math.ceil(math.sqrt(frame_count)))
+
+
+def grid_rows(frame_count: int) -> int:
+    return max(1, -(-frame_count // grid_columns(frame_count)))
+
+
+def grid_rect(index: int, frame_count: int, size: int) -> QRect:
+    """Return the cell holding the given frame in an atlas of size x size cells."""
+    columns = grid_columns(frame_count)
+    return QRect((index % columns) * size, (index // columns) * size, size, size)
+
+
+class FrameAtlas:
+    """Animation frames decoded once and packed into a grid on a single premultiplied image."""
+
+    def __init__(self, frames, delays, size: int):
+        self.size = size
+        self.delays = [max(MIN_FRAME_DELAY_MS, int(delay or DEFAULT_FRAME_DELAY_MS)) for delay in delays]
+        self.image = self._pack(frames, size)
+
+    @property
+    def frameCount(self) -> int:
+        return len(self.delays)
+
+    def frameRect(self, index: int) -> QRect:
+        """Return the area of the atlas holding the given frame."""
+        return grid_rect(index, self.frameCount, self.size)
+
+    def firstFrame(self) -> QImage:
+        return self.image.copy(self.frameRect(0))
+
+    @staticmethod
+    def _pack(frames, size: int) -> QImage:
+        """Scale every frame into a size x size cell and lay the cells out row by row, see grid_columns."""
+        atlas = QImage(size * grid_columns(len(frames)), size * grid_rows(len(frames)), QImage.Format_ARGB32_Premultiplied)
+        atlas.fill(Qt.transparent)
+        with QPainter(atlas) as painter:
+            painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+            for index, frame in enumerate(frames):
+                scaled_rect = QRect(0, 0, size, size)
+                if frame.width() != frame.height():
+                    # Keep the aspect ratio and center the frame in its cell
+                    scaled = frame.size().scaled(size, size, Qt.KeepAspectRatio)
+                    scaled_rect = QRect((size - scaled.width()) // 2, (size - scaled.height()) // 2, scaled.width(), scaled.height())
+                painter.drawImage(scaled_rect.translated(grid_rect(index, len(frames), size).topLeft()), frame)
+        return atlas
+
+    @staticmethod
+    def _toQImage(frame) -> QImage:
+        """Convert a Pillow frame into a QImage that owns its pixels."""
+        rgba = frame.convert("RGBA")
+        return QImage(rgba.tobytes(), rgba.width, rgba.height, QImage.Format_RGBA8888).copy()
+
+    @staticmethod
+    def isAnimated(file_path: str) -> bool:
+        """Return True if the file holds more than one frame (GIF, APNG)."""
+        try:
+            with Image.open(file_path) as image:
+                return getattr(image, "n_frames", 1) > 1
+        except Exception:
+            return False
+
+    @classmethod
+    def fromFile(cls, file_path: str, size: int):
+        """Decode every frame of a GIF or APNG file."""
+        frames, delays = [], []
+        with Image.open(file_path) as image:
+            for frame in ImageSequence.Iterator(image):
+                frames.append(cls._toQImage(frame))
+                delays.append(frame.info.get("duration", DEFAULT_FRAME_DELAY_MS))
+        return cls(frames, delays, size)
+
+    @classmethod
+    def fromFiles(cls, file_paths, size: int, delay: int = DEFAULT_FRAME_DELAY_MS):
+        """Use each image file as one frame, in file name order."""
+        frames = []
+        for file_path in sorted(file_paths):
+            with Image.open(file_path) as image:
+                frames.append(cls._toQImage(image))
+        return cls(frames, [delay] * len(frames), size)
@@ -0,0 +1,129 @@
+import sys
+import ctypes
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication
+from Components.Overlay.AdaptiveContrast import image_array
+
+# Frame sources copy a region of "the screen" into a caller-owned image. The overlay features that look at what is
+# behind the crosshair take one as a constructor argument, so they can run headless against synthetic images or
+# be benchmarked offline on screenshot files.
+
+_SRCCOPY = 0x00CC0020
+_CAPTUREBLT = 0x40000000  # Include layered windows, as QScreen.grabWindow does
+_BI_RGB = 0
+_DIB_RGB_COLORS = 0
+_MAX_DIBS = 4  # Region sizes kept at once; the magnifier and the contrast sampler each use one
+
+
+class _BitmapInfoHeader(ctypes.Structure):
+    _fields_ = [("biSize", ctypes.c_uint32), ("biWidth", ctypes.c_int32), ("biHeight", ctypes.c_int32),
+                ("biPlanes", ctypes.c_uint16), ("biBitCount", ctypes.c_uint16), ("biCompression", ctypes.c_uint32),
+                ("biSizeImage", ctypes.c_uint32), ("biXPelsPerMeter", ctypes.c_int32), ("biYPelsPerMeter", ctypes.c_int32),
+                ("biClrUsed", ctypes.c_uint32), ("biClrImportant", ctypes.c_uint32)]
+
+
+if sys.platform == "win32":
+    # Own instances, so these prototypes don't change the functions other modules call through ctypes.windll. Handles
+    # are pointer sized, the ctypes defaults would truncate them to int on 64-bit Python
+    _user32, _gdi32 = ctypes.WinDLL("user32"), ctypes.WinDLL("gdi32")
+    _user32.GetDC.restype = ctypes.c_void_p
+    _user32.ReleaseDC.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+    _gdi32.CreateCompatibleDC.restype = ctypes.c_void_p
+    _gdi32.CreateDIBSection.restype = ctypes.c_void_p
+    _gdi32.CreateDIBSection.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint32]
+    _gdi32.SelectObject.restype = ctypes.c_void_p
+    _gdi32.SelectObject.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+    _gdi32.BitBlt.argtypes = [ctypes.c_void_p] + [ctypes.c_int] * 4 + [ctypes.c_void_p] + [ctypes.c_int] * 2 + [ctypes.c_uint32]
+    _gdi32.DeleteObject.argtypes = [ctypes.c_void_p]
+
+
+def _copyInto(target: QImage, source, source_rect: QRect):
+    """Overwrite target with source_rect of source (a QImage or QPixmap) without blending."""
+    with QPainter(target) as painter:
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        if isinstance(source, QImage):
+            painter.drawImage(0, 0, source, source_rect.x(), source_rect.y(), source_rect.width(), source_rect.height())
+        else:
+            painter.drawPixmap(0, 0, source, source_rect.x(), source_rect.y(), source_rect.width(), source_rect.height())
+
+
+class ScreenFrameSource:
+    """Captures regions of a screen. Rects are in global (virtual desktop) coordinates.
+
+    On Windows the region is BitBlt into a DIB section kept per region size and copied into the target, so no
+    memory is allocated per frame. Elsewhere Qt can only grab into a new pixmap, which is copied and released.
+    """
+
+    def __init__(self, screen=None):
+        self.screen = screen
+        self._dibs = {}  # (width, height) -> (bitmap handle, bits address), Windows only
+        self._memoryDc = None
+
+    def grabInto(self, target: QImage, rect: QRect):
+        if sys.platform == "win32" and target.format() == QImage.Format_RGB32 and target.size() == rect.size():
+            if self._bitBltInto(target, rect):
+                return
+        screen = self.screen or QApplication.primaryScreen()
+        local = rect.translated(-screen.geometry().topLeft())
+        pixmap = screen.grabWindow(0, local.x(), local.y(), local.width(), local.height())
+        _copyInto(target, pixmap, QRect(0, 0, rect.width(), rect.height()))
+
+    def _bitBltInto(self, target: QImage, rect: QRect) -> bool:
+        """Copy the region of the virtual desktop into target through the DIB section for its size."""
+        dib = self._dibs.get((rect.width(), rect.height())) or self._createDib(rect.width(), rect.height())
+        if dib is None:
+            return False
+        bitmap, bits = dib
+        screenDc = _user32.GetDC(None)
+        try:
+            previous = _gdi32.SelectObject(self._memoryDc, bitmap)
+            copied = _gdi32.BitBlt(self._memoryDc, 0, 0, rect.width(), rect.height(), screenDc, rect.x(), rect.y(), _SRCCOPY | _CAPTUREBLT)
+            _gdi32.SelectObject(self._memoryDc, previous)
+        finally:
+            _user32.ReleaseDC(None, screenDc)
+        if not copied:
+            return False
+        # A top-down 32 bpp DIB has the same row layout as a Format_RGB32 image of its size
+        ctypes.memmove(int(target.bits()), bits, target.byteCount())
+        # GDI leaves the unused byte at 0, Format_RGB32 expects 0xff there
+        image_array(target)[..., 3] = 255
+        return True
+
+    def _createDib(self, width: int, height: int):
+        """Create the DIB section for a region size, the memory DC too on first use. Lives as long as the source."""
+        if self._memoryDc is None:
+            self._memoryDc = _gdi32.CreateCompatibleDC(None)
+            if not self._memoryDc:
+                print("Error creating a memory DC for screen capture")
+                return None
+        if len(self._dibs) >= _MAX_DIBS:
+            # The oldest size was most likely left behind by a resize
+            _gdi32.DeleteObject(self._dibs.pop(next(iter(self._dibs)))[0])
+        header = _BitmapInfoHeader(ctypes.sizeof(_BitmapInfoHeader), width, -height, 1, 32, _BI_RGB, 0, 0, 0, 0, 0)
+        bits = ctypes.c_void_p()
+        bitmap = _gdi32.CreateDIBSection(self._memoryDc, ctypes.byref(header), _DIB_RGB_COLORS, ctypes.byref(bits), None, 0)
+        if not bitmap:
+            print(f"Error creating a {width}x{height} DIB section for screen capture")
+            return None
+        self._dibs[(width, height)] = (bitmap, bits.value)
+        return self._dibs[(width, height)]
+
+
+class ImageFrameSource:
+    """Serves regions of a fixed image as if it were the screen, for tests and offline benchmarks."""
+
+    def __init__(self, image: QImage, origin=None):
+        self.image = image.convertToFormat(QImage.Format_RGB32)
+        self.origin = origin  # Global position of the image's top left corner, defaults to the primary screen's
+
+    @classmethod
+    def fromFile(cls, file_path: str, origin=None):
+        return cls(QImage(file_path), origin)
+
+    def setImage(self, image: QImage):
+        self.image = image.convertToFormat(QImage.Format_RGB32)
+
+    def grabInto(self, target: QImage, rect: QRect):
+        origin = self.origin if self.origin is not None else QApplication.primaryScreen().geometry().topLeft()
+        _copyInto(target, self.image, rect.translated(-origin))
@@ -0,0 +1,72 @@
+from PyQt5.QtCore import Qt, QObject, QRect, QTimer
+from PyQt5.QtGui import QImage, QPainter, QGuiApplication
+
+FALLBACK_REFRESH_RATE = 60
+
+
+class LivePreview(QObject):
+    """Mirrors edits on the canvas to the overlay while enabled, at most once per display refresh.
+
+    Changed areas are collected until the next refresh and then copied into a staging image, which is handed to
+    the overlay together with their bounding rectangle. The overlay keeps painting its own cached copy until it has
+    patched that copy completely, so a stroke in progress is never shown half applied.
+    """
+
+    def __init__(self, canvas, overlay, parent=None):
+        super().__init__(parent)
+        self.canvas = canvas
+        self.overlay = overlay
+        self.enabled = False
+        self.dirtyRect = QRect()
+        self.staging = None
+        self.updatesSent = 0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.flush)
+
+    def setEnabled(self, enabled: bool):
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        if enabled:
+            self.canvas.canvasChanged.connect(self._onCanvasChanged)
+            # Nothing is sent until the canvas is edited, the overlay keeps the applied crosshair until then
+            self.staging = None
+        else:
+            self.canvas.canvasChanged.disconnect(self._onCanvasChanged)
+            self.timer.stop()
+            self.dirtyRect = QRect()
+
+    def refreshInterval(self) -> int:
+        """Milliseconds between updates, one frame of the screen showing the overlay."""
+        screen = getattr(self.overlay, "overlayScreen", None) or QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else 0
+        return max(1, int(1000 / (refresh_rate if refresh_rate > 0 else FALLBACK_REFRESH_RATE)))
+
+    def _onCanvasChanged(self, rect: QRect):
+        self.dirtyRect = self.dirtyRect.united(rect)
+        if not self.timer.isActive():
+            self.timer.start(self.refreshInterval())
+
+    def flush(self):
+        """Send everything that changed since the last update to the overlay."""
+        rect, self.dirtyRect = self.dirtyRect, QRect()
+        if rect.isEmpty():
+            return
+
+        pixmap = self.canvas.pixmap
+        first = self.staging is None
+        if first or self.staging.size() != pixmap.size():
+            # The first update carries the whole canvas, later ones only what changed
+            self.staging = QImage(pixmap.size(), QImage.Format_ARGB32_Premultiplied)
+            rect = self.staging.rect()
+        # Only the changed area is read back from the canvas
+        with QPainter(self.staging) as painter:
+            painter.setCompositionMode(QPainter.CompositionMode_Source)
+            painter.drawPixmap(rect.topLeft(), pixmap, rect)
+        self.overlay.updateOverlayRegion(self.staging, rect)
+        if first:
+            self.overlay.show()
+        self.updatesSent += 1
@@ -0,0 +1,64 @@
+import time
+from PyQt5.QtCore import Qt, QObject, QPoint, QRect, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter
+
+
+class Magnifier(QObject):
+    """Captures a small region around a point and scales it up into a reused image at a capped frame rate."""
+
+    MAX_FPS = 60
+
+    frameReady = pyqtSignal()
+
+    def __init__(self, source, region_size: int = 32, zoom: int = 3, fps: int = 30, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.center = QPoint(0, 0)
+        self.frameCost = 0.0  # Smoothed seconds spent per frame
+        self.framesCaptured = 0
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.CoarseTimer)
+        self.timer.timeout.connect(self.captureFrame)
+
+        self.configure(region_size, zoom, fps)
+
+    def configure(self, region_size: int, zoom: int, fps: int):
+        """Allocate the capture buffers once for the given region size and zoom."""
+        self.region_size = max(1, int(region_size))
+        self.zoom = max(1, int(zoom))
+        self.captureImage = QImage(self.region_size, self.region_size, QImage.Format_RGB32)
+        self.image = QImage(self.region_size * self.zoom, self.region_size * self.zoom, QImage.Format_RGB32)
+        self.captureImage.fill(Qt.black)
+        self.image.fill(Qt.black)
+        self.timer.setInterval(1000 // max(1, min(int(fps), self.MAX_FPS)))
+
+    def setCenter(self, center: QPoint):
+        """Set the global position the captured region is centered on."""
+        self.center = center
+
+    def captureRect(self) -> QRect:
+        half = self.region_size // 2
+        return QRect(self.center.x() - half, self.center.y() - half, self.region_size, self.region_size)
+
+    def start(self):
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def isActive(self) -> bool:
+        return self.timer.isActive()
+
+    def captureFrame(self):
+        """Grab the region into the capture buffer and scale it into the output buffer, both reused every frame."""
+        start = time.perf_counter()
+        self.source.grabInto(self.captureImage, self.captureRect())
+        with QPainter(self.image) as painter:
+            # No smoothing, every captured pixel becomes a zoom x zoom block
+            painter.setCompositionMode(QPainter.CompositionMode_Source)
+            painter.drawImage(self.image.rect(), self.captureImage)
+        self.framesCaptured += 1
+        # Exponential moving average of the per-frame cost
+        self.frameCost += (time.perf_counter() - start - self.frameCost) * 0.1
+        self.frameReady.emit()
@@ -0,0 +1,112 @@
+from collections import OrderedDict
+from math import isqrt
+import numpy as np
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPainter, QPixmap, QColor
+from Components.Overlay.AdaptiveContrast import image_array
+from Components.Overlay.FrameAtlas import grid_columns, grid_rows
+
+SHADOW_OFFSET = (2, 2)  # Pixels right and down the drop shadow is cast
+SHADOW_OPACITY = 0.5
+
+
+def dilate(alpha: np.ndarray, radius: int) -> np.ndarray:
+    """Grow an alpha mask of shape (..., height, width) by a disk of the given radius.
+
+    The disk is split into horizontal chords: the running maximum over each chord width is built up one column
+    at a time, then every row takes the maximum of the chords above and below it. That is 3 * radius array
+    operations, whatever the size of the image.
+    """
+    if radius <= 0:
+        return alpha.copy()
+    # chords[w][..., y, x] is the maximum of alpha[..., y, x - w:x + w + 1]
+    chords = [alpha]
+    for w in range(1, radius + 1):
+        chord = chords[-1].copy()
+        np.maximum(chord[..., w:], alpha[..., :-w], out=chord[..., w:])
+        np.maximum(chord[..., :-w], alpha[..., w:], out=chord[..., :-w])
+        chords.append(chord)
+
+    height = alpha.shape[-2]
+    dilated = chords[radius].copy()
+    for dy in range(1, radius + 1):
+        chord = chords[isqrt(radius * radius - dy * dy)]
+        np.maximum(dilated[..., :height - dy, :], chord[..., dy:, :], out=dilated[..., :height - dy, :])
+        np.maximum(dilated[..., dy:, :], chord[..., :height - dy, :], out=dilated[..., dy:, :])
+    return dilated
+
+
+def _shifted(alpha: np.ndarray, dx: int, dy: int) -> np.ndarray:
+    """Move a mask of shape (..., height, width) right and down, what moves past the edge is cut off."""
+    shifted = np.zeros_like(alpha)
+    height, width = alpha.shape[-2:]
+    shifted[..., dy:, dx:] = alpha[..., :height - dy, :width - dx]
+    return shifted
+
+
+def _colorLayer(alpha: np.ndarray, color: QColor, opacity: float = 1.0) -> QImage:
+    """A premultiplied image of the given colour, with the mask as its coverage."""
+    layer = QImage(alpha.shape[1], alpha.shape[0], QImage.Format_ARGB32_Premultiplied)
+    pixels = image_array(layer)
+    coverage = alpha.astype(np.uint32) * round(color.alpha() * opacity) // 255
+    # B, G, R, A byte order, as in AdaptiveContrast
+    for channel, value in enumerate((color.blue(), color.green(), color.red())):
+        pixels[..., channel] = coverage * value // 255
+    pixels[..., 3] = coverage
+    return layer
+
+
+def outlined(image: QImage, radius: int, color: QColor, shadow: bool = False, frame_count: int = 1) -> QImage:
+    """Return the crosshair with an outline of the given width behind it, and optionally a drop shadow.
+
+    Animation atlases are handled one frame at a time, so outlines never bleed into the neighbouring frame.
+    """
+    image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    height, width = image.height(), image.width()
+    rows, columns = grid_rows(frame_count), grid_columns(frame_count)
+    frame_size = width // columns
+    # (cells, frame size, frame size) view of the alpha channel
+    alpha = np.ascontiguousarray(image_array(image)[..., 3].reshape(rows, frame_size, columns, frame_size).transpose(0, 2, 1, 3)
+                                 .reshape(rows * columns, frame_size, frame_size))
+
+    grown = dilate(alpha, radius)
+    layers = [(grown, color, 1.0)]
+    if shadow:
+        layers.insert(0, (_shifted(grown, *SHADOW_OFFSET), QColor(Qt.black), SHADOW_OPACITY))
+
+    result = QImage(image.size(), QImage.Format_ARGB32_Premultiplied)
+    result.fill(Qt.transparent)
+    with QPainter(result) as painter:
+        for mask, layer_color, opacity in layers:
+            grid = mask.reshape(rows, columns, frame_size, frame_size).transpose(0, 2, 1, 3).reshape(height, width)
+            painter.drawImage(0, 0, _colorLayer(grid, layer_color, opacity))
+        painter.drawImage(0, 0, image)
+    return result
+
+
+class OutlineCache:
+    """Outlined versions of recent crosshairs, keyed by (crosshair, radius, colour, shadow).
+
+    The same QImage is returned for the same key, so turning the outline off and on again also finds the
+    pre-rendered images OverlayImageCache built from it.
+    """
+
+    _MAX_IMAGES = 16
+
+    def __init__(self):
+        self._images = OrderedDict()
+
+    def outlined(self, pixmap, radius: int, color: QColor, shadow: bool = False, frame_count: int = 1) -> QImage:
+        """Return the outlined crosshair for a QPixmap or QImage, rendering it only the first time."""
+        key = (pixmap.cacheKey(), radius, color.rgba(), shadow)
+        image = self._images.get(key)
+        if image is None:
+            source = pixmap.toImage() if isinstance(pixmap, QPixmap) else pixmap
+            image = self._images[key] = outlined(source, radius, color, shadow, frame_count)
+            while len(self._images) > self._MAX_IMAGES:
+                self._images.popitem(last=False)
+        self._images.move_to_end(key)
+        return image
+
+    def clear(self):
+        self._images.clear()
@@ -0,0 +1,215 @@
+import math
+import itertools
+from fractions import Fraction
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QRect, QPoint
+from PyQt5.QtGui import QImage, QPainter, QPixmap, QColor
+from Components.Overlay.FrameAtlas import grid_columns, grid_rows, grid_rect
+
+
+def transformation_mode(source_size: int, target_size: int):
+    """Nearest-neighbour for whole-number upscales so pixels stay sharp, filtered scaling for everything else."""
+    factor = target_size / source_size
+    if factor >= 1 and abs(factor - round(factor)) < 1e-6:
+        return Qt.FastTransformation
+    return Qt.SmoothTransformation
+
+
+def centered_on_canvas(image: QImage, canvas_size: int) -> QImage:
+    """Place an image in the middle of a transparent square canvas, only shrinking it if it does not fit.
+
+    Crosshairs are drawn on a square canvas centered on the screen, so a small design keeps its size this way
+    instead of being stretched to fill the crosshair area.
+    """
+    if image.width() > canvas_size or image.height() > canvas_size:
+        image = image.scaled(canvas_size, canvas_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    canvas = QImage(canvas_size, canvas_size, QImage.Format_ARGB32_Premultiplied)
+    canvas.fill(Qt.transparent)
+    with QPainter(canvas) as painter:
+        painter.drawImage((canvas_size - image.width()) // 2, (canvas_size - image.height()) // 2, image)
+    return canvas
+
+
+class OverlayImageCache:
+    """Keeps the applied crosshair pre-scaled and pre-converted to premultiplied ARGB.
+
+    Images are keyed by (crosshair, size, device pixel ratio, opacity, variant) and kept in a small LRU, so switching
+    between sizes, crosshairs or colour variants seen before is a lookup. A variant is an RGBA value the crosshair's
+    visible pixels are recoloured with, or None for the original colours. The source may be an animation atlas of
+    frameCount square frames laid out in a grid, see FrameAtlas.
+    """
+
+    _FORMAT = QImage.Format_ARGB32_Premultiplied
+    _MAX_IMAGES = 32
+    _MAX_SOURCES = 8
+
+    def __init__(self, size: int):
+        self.size = size
+        self._sourceKey = None
+        self._sources = OrderedDict()  # source key -> (image, frame count)
+        self._images = OrderedDict()
+        self._liveKeys = itertools.count()  # Keys for sources edited in place, which no pixmap's cacheKey matches
+
+    @property
+    def frameCount(self) -> int:
+        return self._sources[self._sourceKey][1] if self._sourceKey is not None else 1
+
+    def setSource(self, pixmap, frame_count: int = 1):
+        """Make the given crosshair (a QPixmap or QImage) the one cached images are built from."""
+        image = pixmap.toImage() if isinstance(pixmap, QPixmap) else pixmap
+        if image is None or image.isNull():
+            self._sourceKey = None
+            return
+
+        self._sourceKey = pixmap.cacheKey()
+        if self._sourceKey not in self._sources:
+            self._sources[self._sourceKey] = (image.convertToFormat(self._FORMAT), frame_count)
+            while len(self._sources) > self._MAX_SOURCES:
+                self._dropSource(next(iter(self._sources)))
+        self._sources.move_to_end(self._sourceKey)
+
+    def updateSource(self, image: QImage, rect: QRect) -> bool:
+        """Copy an edited area of the crosshair into the current source and every image cached from it.
+
+        Only the scaled pixels covering the area are re-rendered. Returns False when the edit cannot be applied
+        in place (no source, an animation, or a different size); the caller should set a new source instead.
+        """
+        if self._sourceKey is None or self.frameCount != 1:
+            return False
+        source = self._sources[self._sourceKey][0]
+        if image.size() != source.size():
+            return False
+        rect = rect.intersected(source.rect())
+        if rect.isEmpty():
+            return True
+        if not isinstance(self._sourceKey, tuple):
+            # The source no longer matches the pixmap it was keyed by, so a later setSource with that pixmap
+            # must convert it afresh rather than find the edited pixels
+            self._rekeySource(("live", next(self._liveKeys)))
+
+        with QPainter(source) as painter:
+            painter.setCompositionMode(QPainter.CompositionMode_Source)
+            painter.drawImage(rect.topLeft(), image, rect)
+        for key, cached in self._images.items():
+            if key[0] != self._sourceKey:
+                continue
+            if cached.height() > source.height() and transformation_mode(source.height(), cached.height()) == Qt.SmoothTransformation:
+                # Filtered upscaling does not sample a cut-out area the way it samples the whole image, and these
+                # images are small enough to re-render outright
+                self._images[key] = self._render(*key)
+            else:
+                self._patch(cached, source, rect, *key[2:])
+        return True
+
+    def setSize(self, size: int):
+        """Change the on-screen size of the crosshair, in logical pixels."""
+        self.size = size
+
+    def frameRect(self, index: int, dpr: float = 1.0) -> QRect:
+        """Return the area of a cached image holding the given frame, in device pixels."""
+        return grid_rect(index, self.frameCount, round(self.size * dpr))
+
+    def hasSource(self) -> bool:
+        return self._sourceKey is not None
+
+    def prepare(self, opacities, device_pixel_ratios, variants=(None,)):
+        """Render every combination of opacity, device pixel ratio and variant ahead of time."""
+        for dpr in device_pixel_ratios:
+            for opacity in opacities:
+                for variant in variants:
+                    self.image(opacity, dpr, variant)
+
+    def image(self, opacity: float, dpr: float = 1.0, variant=None) -> QImage:
+        """Return the crosshair with the given opacity baked in, rendering it if needed, or None if nothing would be drawn."""
+        image = self.cachedImage(opacity, dpr, variant)
+        if image is None and self._sourceKey is not None and opacity > 0.0:
+            key = self._key(opacity, dpr, variant)
+            image = self._images[key] = self._render(*key)
+            while len(self._images) > self._MAX_IMAGES:
+                self._images.popitem(last=False)
+        return image
+
+    def cachedImage(self, opacity: float, dpr: float = 1.0, variant=None) -> QImage:
+        """Return the crosshair if it was rendered for these settings already, None otherwise. Never renders."""
+        if self._sourceKey is None or opacity <= 0.0:
+            return None
+        key = self._key(opacity, dpr, variant)
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+        return image
+
+    def _key(self, opacity: float, dpr: float, variant):
+        return (self._sourceKey, self.size, round(dpr, 3), round(opacity, 3), variant)
+
+    def _rekeySource(self, source_key):
+        """Move the current source and the images cached from it to a new key."""
+        old_key, self._sourceKey = self._sourceKey, source_key
+        self._sources[source_key] = self._sources.pop(old_key)
+        self._images = OrderedDict(((source_key, *key[1:]) if key[0] == old_key else key, image)
+                                   for key, image in self._images.items())
+
+    def _dropSource(self, source_key):
+        del self._sources[source_key]
+        for key in [key for key in self._images if key[0] == source_key]:
+            del self._images[key]
+
+    def _patch(self, target: QImage, source: QImage, rect: QRect, dpr: float, opacity: float, variant):
+        """Re-render the part of a cached image covering the given source area."""
+        factor = Fraction(target.height(), source.height())
+        mode = transformation_mode(source.height(), target.height())
+        # Filtered scaling blends neighbouring pixels, so scale a slightly larger area and keep only the middle.
+        # The area is widened to whole multiples of the scale's denominator so its edges land on whole target
+        # pixels, which makes the filter sample exactly where it does when scaling the full image.
+        margin = 0 if mode == Qt.FastTransformation else 2
+        step = factor.denominator
+        left = (max(0, rect.left() - margin) // step) * step
+        top = (max(0, rect.top() - margin) // step) * step
+        right = min(source.width(), -(-(rect.right() + 1 + margin) // step) * step)
+        bottom = min(source.height(), -(-(rect.bottom() + 1 + margin) // step) * step)
+        region = QRect(left, top, right - left, bottom - top)
+        scaled = source.copy(region).scaled(int(region.width() * factor), int(region.height() * factor), Qt.IgnoreAspectRatio, mode)
+
+        inner_left, inner_top = math.floor(rect.x() * factor), math.floor(rect.y() * factor)
+        inner = QRect(inner_left, inner_top, math.ceil((rect.right() + 1) * factor) - inner_left,
+                      math.ceil((rect.bottom() + 1) * factor) - inner_top)
+        offset = QPoint(int(left * factor), int(top * factor))
+
+        # Paint in device pixels, the target is tagged with its device pixel ratio
+        target.setDevicePixelRatio(1.0)
+        with QPainter(target) as painter:
+            painter.setCompositionMode(QPainter.CompositionMode_Clear)
+            painter.fillRect(inner, Qt.transparent)
+            painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+            painter.setOpacity(opacity)
+            painter.drawImage(inner.topLeft(), scaled, inner.translated(-offset))
+            if variant is not None:
+                painter.setOpacity(1.0)
+                painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+                painter.fillRect(inner, QColor.fromRgba(variant))
+        target.setDevicePixelRatio(dpr)
+
+    def _render(self, source_key, size: int, dpr: float, opacity: float, variant) -> QImage:
+        """Scale the source to the given size in device pixels and bake the opacity and variant colour into its pixels."""
+        source, frame_count = self._sources[source_key]
+        device_size = round(size * dpr)
+        cell_size = source.height() // grid_rows(frame_count)
+        mode = transformation_mode(cell_size, device_size)
+
+        image = QImage(device_size * grid_columns(frame_count), device_size * grid_rows(frame_count), self._FORMAT)
+        image.fill(Qt.transparent)
+        with QPainter(image) as painter:
+            painter.setOpacity(opacity)
+            for index in range(frame_count):
+                # Frames are scaled one at a time, so filtering never blends in the neighbouring cells
+                frame = source if frame_count == 1 else source.copy(grid_rect(index, frame_count, cell_size))
+                scaled = frame.scaled(device_size, device_size, Qt.IgnoreAspectRatio, mode)
+                painter.drawImage(grid_rect(index, frame_count, device_size).topLeft(), scaled)
+            if variant is not None:
+                # Keep the alpha of every pixel, replace its colour
+                painter.setOpacity(1.0)
+                painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+                painter.fillRect(image.rect(), QColor.fromRgba(variant))
+        # Tag the image so it is blitted 1:1 onto a backing store with the same ratio
+        image.setDevicePixelRatio(dpr)
+        return image
@@ -0,0 +1,275 @@
+import os
+import sys
+import ctypes
+import struct
+import subprocess
+from multiprocessing import shared_memory
+from PyQt5 import sip
+from PyQt5.QtCore import Qt, QTimer, QCoreApplication
+from PyQt5.QtGui import QImage, QPixmap
+from Components.Settings.Keybinds import Keybinds
+
+# Shared memory layout: a fixed header followed by room for one premultiplied ARGB32 crosshair.
+# The header is guarded by a seqlock: its sequence is odd while the editor writes the fields and even once they
+# are complete, and readers retry when it was odd or changed while they read. The image generation works the same
+# way for the pixels, so the overlay never picks up a half-written crosshair. Control fields are published by
+# bumping the control generation along with them. Show and hide requests also bump an 8-bit counter, so one is
+# applied even when the overlay changed its visibility on its own since the last request.
+_HEADER = struct.Struct("<4sIQQQIIiidBBI")
+_SEQUENCE = struct.Struct("<Q")
+_SEQUENCE_OFFSET = 8
+_MAGIC = b"CXPX"
+_VERSION = 3
+_FLAG_VISIBLE = 1
+_FLAG_QUIT = 2
+_READ_ATTEMPTS = 100
+
+MAX_IMAGE_SIZE = 256
+POLL_INTERVAL_MS = 50
+
+# Pixels start on a 64-byte boundary, Qt's SIMD blending code expects aligned scanlines
+_PIXELS_OFFSET = 64
+_BUFFER_SIZE = _PIXELS_OFFSET + MAX_IMAGE_SIZE * MAX_IMAGE_SIZE * 4
+
+
+def initial_state():
+    """The header as the editor first publishes it, which is also what a new overlay process starts from."""
+    return {
+        "image_generation": 0, "control_generation": 0, "width": 0, "height": 0, "x_offset": 0, "y_offset": 0,
+        "opacity": OverlayProcessProxy._IMAGE_OPACITY, "visible": False, "quit": False, "settings_generation": 0,
+        "visibility_requests": 0,
+    }
+
+
+class _SharedState:
+    """Typed access to the header fields of the shared segment."""
+
+    def __init__(self, shm):
+        self.shm = shm
+        self.sequence = 0  # Only the editor writes, so it keeps the count
+
+    def read(self):
+        """Return a consistent copy of the header fields, or None if the editor kept writing them."""
+        for _ in range(_READ_ATTEMPTS):
+            sequence = _SEQUENCE.unpack_from(self.shm.buf, _SEQUENCE_OFFSET)[0]
+            if sequence % 2:
+                continue
+            fields = _HEADER.unpack_from(self.shm.buf, 0)
+            if _SEQUENCE.unpack_from(self.shm.buf, _SEQUENCE_OFFSET)[0] == sequence:
+                return self._state(*fields)
+        return None
+
+    @staticmethod
+    def _state(magic, version, sequence, image_generation, control_generation, width, height, x_offset, y_offset, opacity, flags, visibility_requests, settings_generation):
+        return {
+            "image_generation": image_generation,
+            "control_generation": control_generation,
+            "width": width,
+            "height": height,
+            "x_offset": x_offset,
+            "y_offset": y_offset,
+            "opacity": opacity,
+            "visible": bool(flags & _FLAG_VISIBLE),
+            "quit": bool(flags & _FLAG_QUIT),
+            "settings_generation": settings_generation,
+            "visibility_requests": visibility_requests,
+        }
+
+    def write(self, state):
+        flags = (_FLAG_VISIBLE if state["visible"] else 0) | (_FLAG_QUIT if state["quit"] else 0)
+        # Odd sequence first, then the fields, then the even sequence once they are complete
+        self.sequence += 1
+        _SEQUENCE.pack_into(self.shm.buf, _SEQUENCE_OFFSET, self.sequence)
+        _HEADER.pack_into(self.shm.buf, 0, _MAGIC, _VERSION, self.sequence, state["image_generation"], state["control_generation"],
+                          state["width"], state["height"], state["x_offset"], state["y_offset"], state["opacity"], flags,
+                          state["visibility_requests"] % 256, state["settings_generation"])
+        self.sequence += 1
+        _SEQUENCE.pack_into(self.shm.buf, _SEQUENCE_OFFSET, self.sequence)
+
+    def pixelAddress(self) -> int:
+        return ctypes.addressof(ctypes.c_char.from_buffer(self.shm.buf, _PIXELS_OFFSET))
+
+
+class OverlayProcessProxy:
+    """Stands in for the overlay widget in the editor, forwarding everything to a separate overlay-only process."""
+
+    _IMAGE_SIZE = 100
+    _IMAGE_OPACITY = 0.95
+
+    def __init__(self):
+        self.shm = shared_memory.SharedMemory(name=f"CrossPixel-{os.getpid()}", create=True, size=_BUFFER_SIZE)
+        self.shared = _SharedState(self.shm)
+        self.state = initial_state()
+        self.shared.write(self.state)
+        self.process = subprocess.Popen(self._command())
+        self._closed = False
+        QCoreApplication.instance().aboutToQuit.connect(self.close)
+
+        # The overlay process reads the same settings file, tell it when it changes
+        Keybinds().register_settings_listener(self.reload_settings)
+
+    def _command(self):
+        if getattr(sys, "frozen", False):
+            return [sys.executable, "--overlay-process", self.shm.name]
+        main_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "main.py")
+        return [sys.executable, main_path, "--overlay-process", self.shm.name]
+
+    def _publishControl(self):
+        self.state["control_generation"] += 1
+        self.shared.write(self.state)
+
+    def setOverlayImage(self, pixmap: QPixmap):
+        """Copy the crosshair straight into shared memory."""
+        self._writeImage(pixmap.toImage())
+
+    def updateOverlayRegion(self, image: QImage, rect):
+        """The segment holds a single crosshair, so edits republish the whole image under a new generation."""
+        self._writeImage(image)
+
+    def _writeImage(self, image: QImage):
+        if image.width() > MAX_IMAGE_SIZE or image.height() > MAX_IMAGE_SIZE:
+            image = image.scaled(MAX_IMAGE_SIZE, MAX_IMAGE_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+        # Odd generation while writing, even once the pixels are complete
+        self.state["image_generation"] += 1
+        self.shared.write(self.state)
+        # 32-bit scanlines are never padded, so the pixels are one contiguous block
+        ctypes.memmove(self.shared.pixelAddress(), int(image.constBits()), image.byteCount())
+        self.state["width"], self.state["height"] = image.width(), image.height()
+        self.state["image_generation"] += 1
+        self.shared.write(self.state)
+
+    def setOverlayAnimation(self, atlas):
+        """Animations are not streamed to the overlay process, its first frame is shown instead."""
+        self.setOverlayImage(QPixmap.fromImage(atlas.firstFrame()))
+
+    def show(self):
+        self.state["visible"] = True
+        self.state["visibility_requests"] += 1
+        self._publishControl()
+
+    def hide(self):
+        self.state["visible"] = False
+        self.state["visibility_requests"] += 1
+        self._publishControl()
+
+    def isVisible(self) -> bool:
+        return self.state["visible"]
+
+    def toggle_visibility(self):
+        self.hide() if self.state["visible"] else self.show()
+
+    def set_opacity(self, opacity_value):
+        self.state["opacity"] = opacity_value
+        self._publishControl()
+
+    def apply_offset(self, x_offset, y_offset):
+        self.state["x_offset"] += x_offset
+        self.state["y_offset"] += y_offset
+        self._publishControl()
+
+    def reload_settings(self):
+        """Ask the overlay process to re-read the saved settings."""
+        self.state["settings_generation"] += 1
+        self._publishControl()
+
+    def terminate(self):
+        """Stop the overlay process, as opposed to close() which leaves it running."""
+        self.state["quit"] = True
+        self._publishControl()
+
+    def close(self):
+        """Detach from the overlay process; it keeps showing the crosshair after the editor exits.
+
+        The segment's name is removed too, the overlay process keeps its own mapping of it.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass  # The overlay process exited first and its resource tracker removed it
+
+
+class SharedOverlayReader:
+    """Runs in the overlay process, polling the shared header and applying changes to the overlay widget."""
+
+    def __init__(self, overlay, name: str):
+        self.overlay = overlay
+        self.shm = shared_memory.SharedMemory(name=name)
+        self.shared = _SharedState(self.shm)
+        # What has been applied so far; the overlay starts out as the editor's initial state describes
+        self.state = initial_state()
+        self.state.update(control_generation=-1)
+
+        self.timer = QTimer()
+        self.timer.setTimerType(Qt.CoarseTimer)
+        self.timer.timeout.connect(self.poll)
+        self.timer.start(POLL_INTERVAL_MS)
+
+    def poll(self):
+        state = self.shared.read()
+        if state is None:
+            return  # The editor is busy writing, try again on the next poll
+        if state["image_generation"] != self.state["image_generation"] and state["image_generation"] % 2 == 0:
+            self._readImage(state)
+        if state["control_generation"] != self.state["control_generation"]:
+            self._applyControl(state)
+
+    def _readImage(self, state):
+        # The pixels are copied out of the segment, which the editor may overwrite at any time. The copy only counts
+        # if the generation is unchanged afterwards
+        size = state["width"] * state["height"] * 4
+        image = QImage(sip.voidptr(self.shared.pixelAddress(), size), state["width"], state["height"], state["width"] * 4, QImage.Format_ARGB32_Premultiplied)
+        pixmap = QPixmap.fromImage(image)
+        current = self.shared.read()
+        if current is None or current["image_generation"] != state["image_generation"]:
+            return  # The editor started writing a newer crosshair, pick that one up on the next poll
+        self.state["image_generation"] = state["image_generation"]
+        self.overlay.setOverlayImage(pixmap)
+
+    def _applyControl(self, state):
+        """Apply only what the editor changed since its last publish, the overlay's own nudges, offset toggle and
+        hidden state are left alone otherwise."""
+        if state["quit"]:
+            self.timer.stop()
+            self.overlay.close()
+            return
+        if state["settings_generation"] != self.state["settings_generation"]:
+            self.overlay.keybinds.reload()
+        # Offsets arrive as totals of the editor's moves, only the difference is applied
+        dx, dy = state["x_offset"] - self.state["x_offset"], state["y_offset"] - self.state["y_offset"]
+        if dx or dy:
+            self.overlay.apply_offset(dx, dy)
+        if state["opacity"] != self.state["opacity"]:
+            self.overlay.set_opacity(state["opacity"])
+        # Every show or hide request is applied, the overlay may have hidden itself through its own hotkey since
+        if state["visibility_requests"] != self.state["visibility_requests"]:
+            self.overlay.setVisible(state["visible"])
+        self.state.update((key, state[key]) for key in ("control_generation", "settings_generation", "x_offset", "y_offset", "opacity", "visible", "visibility_requests"))
+
+
+def run_overlay_process(name: str) -> int:
+    """Entry point of the overlay-only process: just the overlay widget, no editor."""
+    from PyQt5.QtWidgets import QApplication
+    from Components.OverlayCrosshairToScreen import OverlayCrosshairToScreen
+
+    from Components.ProcessTuning import ProcessTuning
+    from Components.Settings.Profiles import ProfileManager
+
+    app = QApplication(sys.argv)
+    app.setQuitOnLastWindowClosed(False)
+    keybinds = Keybinds()
+    process_tuning = ProcessTuning()
+    process_tuning.apply_from_settings(keybinds)
+    keybinds.register_settings_listener(lambda: process_tuning.apply_from_settings(keybinds))
+    overlay = OverlayCrosshairToScreen()
+    overlay.keybinds.register_action("self_destruct", app.quit)
+    overlay.destroyed.connect(app.quit)
+    overlay.setAttribute(Qt.WA_DeleteOnClose)
+    reader = SharedOverlayReader(overlay, name)
+    profile_manager = ProfileManager(overlay, keybinds)
+    return app.exec_()
@@ -1,21 +1,51 @@
 from PyQt5.QtWidgets import QWidget, QApplication
-from PyQt5.QtCore import Qt, QRect, QEvent
-from PyQt5.QtGui import QPainter, QBrush, QPixmap
+import os
+import time
+from PyQt5.QtCore import Qt, QRect, QRectF, QEvent, QTimer, pyqtSignal
+from PyQt5.QtGui import QPainter, QPixmap, QColor, QImage
 from Components.Settings.Keybinds import Keybinds
-from Components.Settings.Config import load_keybinds_from_file
+from Components.Settings.Config import CROSSPIXEL_DIR_PATH
+from Components.LatencyTracer import LatencyTracer
+from Components.Overlay.OverlayImageCache import OverlayImageCache, centered_on_canvas
+from Components.Overlay.FrameSources import ScreenFrameSource
+from Components.Overlay.Magnifier import Magnifier
+from Components.Overlay.AdaptiveContrast import AdaptiveContrast
+from Components.Overlay.Outline import OutlineCache
+from Components.Overlay.ControlServer import ControlServer
 from pynput import mouse
 
 class OverlayCrosshairToScreen(QWidget):
     """A custom widget that provides an overlay functionality."""
     
-    _IMAGE_SIZE = 100
+    _IMAGE_SIZE = 100  # Size of the crosshair at a scale of 1
     _IMAGE_OPACITY = 0.95
+    _ANIMATION_CPU_SHARE = 0.02  # Most of one core animation playback may use, frames are slowed down beyond that
+    _MAGNIFIER_GAP = 8  # Space between the crosshair and the magnifier below it
+    _NUDGE_INTERVAL_MS = 16  # Nudges arriving faster than this are merged into one move
+    _NUDGE_DIRECTIONS = {"nudge_up": (0, -1), "nudge_down": (0, 1), "nudge_left": (-1, 0), "nudge_right": (1, 0)}
 
-    def __init__(self):
+    # Mouse buttons that hide the crosshair while held, per "Hide Crosshair during Event" mode
+    _HIDE_BUTTONS_BY_MODE = {
+        1: frozenset([mouse.Button.right]),
+        2: frozenset([mouse.Button.left]),
+        3: frozenset([mouse.Button.left, mouse.Button.right]),
+    }
+
+    # Emitted from the mouse hook thread with (button, pressed), delivered on the Qt thread
+    hideButtonChanged = pyqtSignal(object, bool)
+
+    def __init__(self, frame_source=None):
         super().__init__()
-        self._setupUI()
-        self.start_mouse_listener()
         self.overlayImage = None
+        self.imageSize = self._IMAGE_SIZE
+        self.imageCache = OverlayImageCache(self.imageSize)
+        # Crosshairs shown instead while a hide button is held, per button; the one being painted is activeCache
+        self.pressCaches = {}
+        self._pressCrosshairPaths = {}
+        self.activeCache = self.imageCache
+        # Outline drawn behind the crosshair as (radius, colour, shadow), None when off
+        self.outline = None
+        self.outlineCache = OutlineCache()
         self.x_offset = 0  # default x offset value
         self.y_offset = 0  # default y offset value
 
@@ -25,8 +55,61 @@ class OverlayCrosshairToScreen(QWidget):
         self.keybinds = Keybinds()
         self.keybinds.register_action("hide_crosshair", self.toggle_visibility)
         self.keybinds.register_action("offset_keybind", self.handle_offset_keybind)
+        self.keybinds.register_settings_listener(self.refresh_settings)
         self.offset_applied = False
 
+        # Nudge hotkeys adjust the saved offset; repeats within one interval are merged into a single move
+        for action, (dx, dy) in self._NUDGE_DIRECTIONS.items():
+            self.keybinds.register_action(action, lambda dx=dx, dy=dy: self.nudge_offset(dx, dy))
+            self.keybinds.register_action(action + "_large", lambda dx=dx, dy=dy: self.nudge_offset(dx, dy, large=True))
+        self._pendingNudge = (0, 0)
+        self.nudgeTimer = QTimer(self)
+        self.nudgeTimer.setSingleShot(True)
+        self.nudgeTimer.setTimerType(Qt.PreciseTimer)
+        self.nudgeTimer.setInterval(self._NUDGE_INTERVAL_MS)
+        self.nudgeTimer.timeout.connect(self._applyPendingNudge)
+
+        # In compact mode the window is only as large as the crosshair and moves with the offsets
+        self.compact_window = bool(self.keybinds.get_keybind("overlay_compact_window"))
+
+        self.mouse_listener = None
+        self._hideButtons = frozenset()
+        self._heldButtons = []  # Hide buttons currently held, the most recently pressed last
+        self.latencyTracer = LatencyTracer()
+        self.hideButtonChanged.connect(self.toggle_visibility_based_on_press)
+
+        # Animated crosshair playback
+        self.animation = None
+        self.frameIndex = 0
+        self.animationFrameCost = 0.0  # Smoothed seconds spent per frame
+        self.animationTimer = QTimer(self)
+        self.animationTimer.setSingleShot(True)
+        self.animationTimer.setTimerType(Qt.PreciseTimer)
+        self.animationTimer.timeout.connect(self._advanceFrame)
+
+        # Magnified view of the area around the crosshair, the frame source can be swapped for tests
+        self.magnifier_enabled = False
+        self.magnifier = Magnifier(frame_source or ScreenFrameSource(), parent=self)
+        self.magnifier.frameReady.connect(lambda: self.update(self._magnifierRect()))
+
+        # Switches to a pre-rendered alternate colour when the background makes the crosshair hard to see
+        self.adaptive_contrast_enabled = False
+        self.imageVariant = None  # RGBA of the colour variant being shown, None for the original
+        self._alternateColorSetting = None
+        self.adaptiveContrast = AdaptiveContrast(self.magnifier.source, parent=self)
+        self.adaptiveContrast.variantChanged.connect(self._onContrastVariantChanged)
+
+        # Local scripting endpoint, only listening while enabled in the settings
+        self.controlServer = ControlServer(self, parent=self)
+
+        self.overlayScreen = None
+        self._setupUI()
+        self.refresh_settings()
+
+        # Follow monitors being plugged in or out without rebuilding the widget
+        QApplication.instance().screenAdded.connect(self._onScreenAdded)
+        QApplication.instance().screenRemoved.connect(self._onScreenRemoved)
+
     def _setupUI(self):
         """Initialize the UI settings."""
         self._setWindowAttributes()
@@ -42,38 +125,303 @@ class OverlayCrosshairToScreen(QWidget):
         self.setAttribute(Qt.WA_TransparentForMouseEvents)
         self.setStyleSheet("border: none;")
 
+    def _selectScreen(self):
+        """Pick the screen named in the settings, falling back to the primary screen."""
+        screen_name = self.keybinds.get_keybind("overlay_screen")
+        for screen in QApplication.screens():
+            if screen.name() == screen_name:
+                return screen
+        return QApplication.primaryScreen()
+
+    def setScreen(self, screen):
+        """Show the overlay on the given screen."""
+        if self.overlayScreen is not None:
+            self.overlayScreen.geometryChanged.disconnect(self._setGeometryToScreenSize)
+        self.overlayScreen = screen
+        self.overlayScreen.geometryChanged.connect(self._setGeometryToScreenSize)
+        if isinstance(self.magnifier.source, ScreenFrameSource):
+            self.magnifier.source.screen = screen  # Shared with the adaptive contrast sampler
+        self._setGeometryToScreenSize()
+        self.update()
+
+    def _onScreenAdded(self, screen):
+        """Pre-render for the new screen's pixel ratio and move onto it if it is the configured one."""
+        self._prepareImageCache()
+        if self._selectScreen() is not self.overlayScreen:
+            self.setScreen(self._selectScreen())
+
+    def _onScreenRemoved(self, screen):
+        """Fall back to another screen when the one showing the overlay goes away."""
+        if screen is self.overlayScreen:
+            self.overlayScreen = None
+            self.setScreen(self._selectScreen())
+
     def _setGeometryToScreenSize(self):
-        """Set the geometry of the widget to match the primary screen size."""
-        screen = QApplication.primaryScreen()
-        self.setGeometry(screen.geometry())
+        """Set the geometry of the widget to match the overlay screen size, or just the crosshair in compact mode."""
+        self.screenGeometry = (self.overlayScreen or QApplication.primaryScreen()).geometry()
+        self.setGeometry(self._windowScreenRect())
+        self.magnifier.setCenter(self._crosshairScreenRect().center())
+        self.adaptiveContrast.setCenter(self._crosshairScreenRect().center())
+
+    def setScale(self, scale: float):
+        """Change the on-screen size of the crosshair. Sizes seen before are served from the image cache."""
+        size = max(1, round(self._IMAGE_SIZE * scale))
+        if size == self.imageSize:
+            return
+        self.update(self._crosshairRect())
+        self.imageSize = size
+        for cache in [self.imageCache, *self.pressCaches.values()]:
+            cache.setSize(size)
+        self._prepareImageCache()
+        self._updateContrastVariant()
+        self._setGeometryToScreenSize()
+        self.update(self._crosshairRect())
+
+    def setMagnifier(self, enabled: bool, region_size: int = 32, zoom: int = 3, fps: int = 30):
+        """Show a magnified view of the area around the crosshair below it."""
+        self.update(self._magnifierRect())
+        self.magnifier_enabled = enabled
+        self.magnifier.configure(region_size, zoom, fps)
+        self._setGeometryToScreenSize()
+        if enabled and self.isVisible():
+            self.magnifier.start()
+        elif not enabled:
+            self.magnifier.stop()
+
+    def setAdaptiveContrast(self, enabled: bool, rate: float = 4, color: str = ""):
+        """Sample the background around the crosshair and swap to an alternate colour where it would blend in."""
+        self.adaptive_contrast_enabled = enabled
+        self.adaptiveContrast.setRate(rate)
+        self._alternateColorSetting = QColor(color) if color else None
+        # The ring sits just outside the middle of the crosshair, where most designs have their lines
+        radius = max(2, self.imageSize // 4)
+        self.adaptiveContrast.setRing(radius, radius + 2)
+        self._updateContrastVariant()
+        if enabled and self.isVisible():
+            self.adaptiveContrast.start()
+        elif not enabled:
+            self.adaptiveContrast.stop()
+            self._onContrastVariantChanged(False)
+
+    def _updateContrastVariant(self):
+        """Measure the applied crosshair and pre-render its alternate colour variant."""
+        if not self.adaptive_contrast_enabled or self.overlayImage is None:
+            return
+        # The crosshair as drawn, outline included, keeps the sampled ring off its own pixels
+        footprint = self.imageCache.image(self._IMAGE_OPACITY)
+        if footprint is not None:
+            footprint = footprint.copy(self.imageCache.frameRect(0))
+        self.adaptiveContrast.setCrosshair(self.overlayImage.toImage(), self._alternateColorSetting, footprint)
+        if self.imageVariant is not None:
+            # The alternate colour may have changed with the crosshair, keep showing the one being prepared
+            self.imageVariant = self.adaptiveContrast.alternateColor.rgba()
+        self._prepareImageCache()
+
+    def _onContrastVariantChanged(self, use_alternate: bool):
+        """Swap between the cached colour variants, nothing is redrawn."""
+        variant = self.adaptiveContrast.alternateColor.rgba() if use_alternate else None
+        if variant != self.imageVariant:
+            self.imageVariant = variant
+            self.update(self._crosshairRect())
+
+    def setCompactWindow(self, compact: bool):
+        """Switch between a crosshair-sized window and a full-screen transparent one."""
+        if compact != self.compact_window:
+            self.compact_window = compact
+            self._setGeometryToScreenSize()
+            self.update()
 
     def setOverlayImage(self, image: QPixmap):
         if isinstance(image, QPixmap):  # Ensure that image is a QPixmap
+            self._stopAnimation()
             self.overlayImage = image
-            self.update()  # Trigger a repaint
+            self._setCacheSource(image)
+            self._prepareImageCache()
+            self._updateContrastVariant()
+            self.update(self._crosshairRect())  # Only the crosshair area needs repainting
+
+    def updateOverlayRegion(self, image: QImage, rect: QRect):
+        """Apply an edit to part of the crosshair, only that area of the cached images is re-rendered and repainted."""
+        # An outline reaches past the edited area, so it is redone for the whole crosshair
+        if self.animation is not None or self.outline is not None or not self.imageCache.updateSource(image, rect):
+            self.setOverlayImage(QPixmap.fromImage(image))
+            return
+        # Kept current for everything that reads the applied crosshair back, e.g. toggling the outline or reopening the editor
+        self.overlayImage = QPixmap.fromImage(image)
+        self._updateContrastVariant()
+
+        # Map the edited canvas pixels onto the screen, with a pixel of margin for filtered scaling
+        factor = self.imageSize / image.width()
+        area = QRectF(rect.x() * factor, rect.y() * factor, rect.width() * factor, rect.height() * factor).toAlignedRect()
+        self.update(area.translated(self._crosshairRect().topLeft()).adjusted(-1, -1, 1, 1))
+
+    def setOverlayAnimation(self, atlas):
+        """Play an animated crosshair from a FrameAtlas decoded ahead of time."""
+        self._stopAnimation()
+        self.overlayImage = QPixmap.fromImage(atlas.firstFrame())
+        self.animation = atlas
+        self._setCacheSource(atlas.image, atlas.frameCount)
+        self._prepareImageCache()
+        self._updateContrastVariant()
+        self.update(self._crosshairRect())
+        self._scheduleNextFrame()
+
+    def _setCacheSource(self, image, frame_count: int = 1):
+        """Hand the crosshair to the image cache, with the outline added when one is set."""
+        if self.outline is not None:
+            image = self.outlineCache.outlined(image, *self.outline, frame_count=frame_count)
+        self.imageCache.setSource(image, frame_count)
+
+    def setOutline(self, enabled: bool, radius: int = 1, color: str = "#000000", shadow: bool = False):
+        """Draw an outline of the given width (and a drop shadow) behind the crosshair. Outlines seen before are cached."""
+        outline = (int(radius), QColor(color or "#000000"), bool(shadow)) if enabled and int(radius) > 0 else None
+        if outline == self.outline:
+            return
+        self.outline = outline
+        if self.animation is not None:
+            self._setCacheSource(self.animation.image, self.animation.frameCount)
+        elif self.overlayImage is not None:
+            self._setCacheSource(self.overlayImage)
+        else:
+            return
+        self._prepareImageCache()
+        self._updateContrastVariant()
+        self.update(self._crosshairRect())
+
+    def _prepareImageCache(self):
+        """Render the default and current opacity once for every connected screen, so painting is a 1:1 blit."""
+        variants = [None]
+        if self.adaptive_contrast_enabled:
+            variants.append(self.adaptiveContrast.alternateColor.rgba())
+        dprs = {screen.devicePixelRatio() for screen in QApplication.screens()}
+        for cache in [self.imageCache, *self.pressCaches.values()]:
+            if cache.hasSource():
+                cache.prepare({self._IMAGE_OPACITY, self.image_opacity}, dprs, variants)
+
+    def _stopAnimation(self):
+        self.animationTimer.stop()
+        self.animation = None
+        self.frameIndex = 0
+        self.animationFrameCost = 0.0
+
+    def _scheduleNextFrame(self):
+        """Wait for the current frame's delay, stretched if playback would exceed its CPU share."""
+        delay = self.animation.delays[self.frameIndex] / 1000
+        self.animationTimer.start(int(max(delay, self.animationFrameCost / self._ANIMATION_CPU_SHARE) * 1000))
+
+    def _advanceFrame(self):
+        """Show the next animation frame, only the crosshair area is invalidated."""
+        if self.animation is None or not self.isVisible():
+            return  # Playback resumes in showEvent
+        self.frameIndex = (self.frameIndex + 1) % self.animation.frameCount
+        self.update(self._crosshairRect())
+        self._scheduleNextFrame()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.animation is not None and not self.animationTimer.isActive():
+            self._scheduleNextFrame()
+        if self.magnifier_enabled:
+            self.magnifier.start()
+        if self.adaptive_contrast_enabled:
+            self.adaptiveContrast.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.magnifier.stop()
+        self.adaptiveContrast.stop()
+        self.latencyTracer.finishHandled("hidden")
+
+    def _crosshairScreenRect(self) -> QRect:
+        """Return the area covered by the crosshair in screen coordinates, centered on the screen considering the offsets."""
+        x = self.screenGeometry.x() + (self.screenGeometry.width() - self.imageSize) // 2 + self.x_offset
+        y = self.screenGeometry.y() + (self.screenGeometry.height() - self.imageSize) // 2 + self.y_offset
+        return QRect(x, y, self.imageSize, self.imageSize)
+
+    def _magnifierScreenRect(self) -> QRect:
+        """Return the area covered by the magnifier in screen coordinates, centered below the crosshair."""
+        crosshair = self._crosshairScreenRect()
+        size = self.magnifier.image.size()
+        return QRect(crosshair.center().x() - size.width() // 2, crosshair.bottom() + 1 + self._MAGNIFIER_GAP, size.width(), size.height())
+
+    def _windowScreenRect(self) -> QRect:
+        """Return the area the window covers: the whole screen, or just what is drawn in compact mode."""
+        if not self.compact_window:
+            return self.screenGeometry
+        if self.magnifier_enabled:
+            return self._crosshairScreenRect().united(self._magnifierScreenRect())
+        return self._crosshairScreenRect()
+
+    def _crosshairRect(self) -> QRect:
+        """Return the area covered by the crosshair in widget coordinates."""
+        return self._crosshairScreenRect().translated(-self._windowScreenRect().topLeft())
+
+    def _magnifierRect(self) -> QRect:
+        """Return the area covered by the magnifier in widget coordinates, empty while it is disabled."""
+        if not self.magnifier_enabled:
+            return QRect()
+        return self._magnifierScreenRect().translated(-self._windowScreenRect().topLeft())
+
+    def _moveCrosshair(self, x_offset, y_offset):
+        """Move the crosshair to the given offsets."""
+        if (x_offset, y_offset) == (self.x_offset, self.y_offset):
+            return
+
+        old_rects = (self._crosshairRect(), self._magnifierRect())
+        self.x_offset = x_offset
+        self.y_offset = y_offset
+        self.magnifier.setCenter(self._crosshairScreenRect().center())
+        self.adaptiveContrast.setCenter(self._crosshairScreenRect().center())
+
+        if self.compact_window:
+            # The window itself moves, its contents stay the same
+            self.move(self._windowScreenRect().topLeft())
+            self.latencyTracer.finishHandled("move")
+        else:
+            # Repaint only the old and new crosshair areas
+            for rect in old_rects + (self._crosshairRect(), self._magnifierRect()):
+                self.update(rect)
+
+    def update(self, *args):
+        """Request a repaint, the input being handled (if any) is timed until it is painted."""
+        super().update(*args)
+        self.latencyTracer.updated()
 
     def paintEvent(self, event):
         """Handle the paint event. Draw the overlay if the image is set."""
-        if self.overlayImage:
-            self._drawOverlayContent()
-
-    def _drawOverlayContent(self):
-        """Draw the overlay's content on the widget."""
+        # The translucent background is already cleared by Qt, so only the crosshair itself is drawn
         painter = QPainter(self)
-        self._drawTransparentBackground(painter)
-        self._drawCenteredOverlayImage(painter)
+        painter.setClipRect(event.rect())
+        self._drawCrosshair(painter, event.rect())
+        if self.magnifier_enabled and event.rect().intersects(self._magnifierRect()):
+            self._drawMagnifier(painter)
+        painter.end()
+        self.latencyTracer.finish("paint")
+
+    def _drawCrosshair(self, painter: QPainter, dirty_rect: QRect):
+        """Blit the cached crosshair image for the current opacity and frame."""
+        start = time.perf_counter()
+        dpr = self.devicePixelRatioF()
+        cache = self.activeCache
+        # Only a lookup, every change that needs a new image renders it before asking for a repaint
+        image = cache.cachedImage(self.image_opacity, dpr, self.imageVariant)
+        rect = self._crosshairRect()
+        if image is None or not dirty_rect.intersects(rect):
+            return
+
+        frame = self.frameIndex if cache is self.imageCache else 0
+        painter.drawImage(rect.topLeft(), image, cache.frameRect(frame, dpr))
 
-    def _drawTransparentBackground(self, painter: QPainter):
-        """Draw a transparent background on the given painter."""
-        painter.setBrush(QBrush(Qt.transparent))
-        painter.drawRect(0, 0, self.width(), self.height())
+        if self.animation is not None:
+            # Exponential moving average of the per-frame paint cost
+            self.animationFrameCost += (time.perf_counter() - start - self.animationFrameCost) * 0.1
 
-    def _drawCenteredOverlayImage(self, painter: QPainter):
-        """Draw the overlay image centered on the given painter considering the offsets."""
-        x_offset = (self.width() - self._IMAGE_SIZE) // 2 + self.x_offset
-        y_offset = (self.height() - self._IMAGE_SIZE) // 2 + self.y_offset
-        painter.setOpacity(self.image_opacity)
-        painter.drawImage(QRect(x_offset, y_offset, self._IMAGE_SIZE, self._IMAGE_SIZE), self.overlayImage.toImage())
+    def _drawMagnifier(self, painter: QPainter):
+        """Draw the latest magnified frame with a thin border."""
+        rect = self._magnifierRect()
+        painter.drawImage(rect.topLeft(), self.magnifier.image)
+        painter.setPen(QColor(150, 150, 150))
+        painter.drawRect(rect.adjusted(0, 0, -1, -1))
 
     def eventFilter(self, obj, event):
         """Override event filter to ignore mouse events."""
@@ -96,61 +444,172 @@ class OverlayCrosshairToScreen(QWidget):
         """Handle the offset keybind action."""
         if self.offset_applied:
             # If the offset is already applied, revert it to the center
-            self.x_offset = 0
-            self.y_offset = 0
+            self._moveCrosshair(0, 0)
         else:
             # If the offset is not applied, apply it
             x_offset, y_offset = self.get_offset_values_from_config()
-            self.x_offset = x_offset
-            self.y_offset = y_offset
-            
-        self.update()
+            self._moveCrosshair(x_offset, y_offset)
+
         self.offset_applied = not self.offset_applied  # Toggle the flag
 
     def apply_offset(self, x_offset, y_offset):
         """Apply the offset values to the crosshair."""
-        self.x_offset += x_offset
-        self.y_offset += y_offset
-        self.update()  # Trigger a repaint to reflect the new position
+        self._moveCrosshair(self.x_offset + x_offset, self.y_offset + y_offset)
+
+    def nudge_offset(self, dx, dy, large=False):
+        """Move the saved offset by one pixel, or by the large step. The first nudge moves at once, nudges arriving
+        while the interval is running are added up and applied together when it ends."""
+        if large:
+            step = int(self.keybinds.get_keybind("nudge_large_step"))
+            dx, dy = dx * step, dy * step
+        self._pendingNudge = (self._pendingNudge[0] + dx, self._pendingNudge[1] + dy)
+        if not self.nudgeTimer.isActive():
+            self._applyPendingNudge()
+
+    def _applyPendingNudge(self):
+        dx, dy = self._pendingNudge
+        if (dx, dy) == (0, 0):
+            return  # Nothing arrived during the interval, let the timer rest
+        self._pendingNudge = (0, 0)
+
+        # Keep the crosshair on the screen, the same range the offset sliders allow
+        x_offset, y_offset = self.get_offset_values_from_config()
+        half_width, half_height = self.screenGeometry.width() // 2, self.screenGeometry.height() // 2
+        x_offset = max(-half_width, min(half_width, x_offset + dx))
+        y_offset = max(-half_height, min(half_height, y_offset + dy))
+
+        self.keybinds.set_keybind("offset_x", x_offset)
+        self.keybinds.set_keybind("offset_y", y_offset)
+        self.offset_applied = True
+        self._moveCrosshair(x_offset, y_offset)
+        # Holding a key nudges many times a second, the file is only written once it is released
+        self.keybinds.save_later()
+        self.nudgeTimer.start()
 
     def get_offset_values_from_config(self):
-        """Fetch the offset values from the configuration file."""
-        keybinds = load_keybinds_from_file()
-        x_offset = keybinds.get("offset_x", 0)
-        y_offset = keybinds.get("offset_y", 0)
+        """Fetch the offset values from the in-memory settings."""
+        x_offset = self.keybinds.get_keybind("offset_x") or 0
+        y_offset = self.keybinds.get_keybind("offset_y") or 0
         return x_offset, y_offset
     
     def get_crosshair_mode_from_config(self):
-        """Fetch the crosshair mode from the configuration file."""
-        keybinds = load_keybinds_from_file()
-        return keybinds.get("crosshair_disable_mode", "Disabled")
-    
+        """Fetch the crosshair mode from the in-memory settings."""
+        return self.keybinds.get_keybind("crosshair_disable_mode")
+
+    def refresh_settings(self):
+        """Apply the saved settings. Called once at startup and whenever settings are saved."""
+        self.setCompactWindow(bool(self.keybinds.get_keybind("overlay_compact_window")))
+        self.setScale(float(self.keybinds.get_keybind("overlay_scale")))
+        self.setMagnifier(bool(self.keybinds.get_keybind("magnifier_enabled")), self.keybinds.get_keybind("magnifier_region"),
+                          self.keybinds.get_keybind("magnifier_zoom"), self.keybinds.get_keybind("magnifier_fps"))
+        self.setAdaptiveContrast(bool(self.keybinds.get_keybind("adaptive_contrast_enabled")), self.keybinds.get_keybind("adaptive_contrast_rate"),
+                                 self.keybinds.get_keybind("adaptive_contrast_color"))
+        self.setOutline(bool(self.keybinds.get_keybind("outline_enabled")), self.keybinds.get_keybind("outline_radius"),
+                        self.keybinds.get_keybind("outline_color"), self.keybinds.get_keybind("outline_shadow"))
+        if self._selectScreen() is not self.overlayScreen:
+            self.setScreen(self._selectScreen())
+        if self.offset_applied:
+            # Follow offset changes made in the settings
+            self._moveCrosshair(*self.get_offset_values_from_config())
+        self.setLatencyTracing(bool(self.keybinds.get_keybind("latency_tracing")))
+        if self.keybinds.get_keybind("control_api_enabled"):
+            if not self.controlServer.server.isListening():
+                self.controlServer.start()
+        else:
+            self.controlServer.stop()
+
+        self.setPressCrosshairs({mouse.Button.right: self.keybinds.get_keybind("press_crosshair_right"),
+                                 mouse.Button.left: self.keybinds.get_keybind("press_crosshair_left")})
+
+        # Compile the hide mode into the set of buttons the mouse hook reacts to
+        hide_buttons = self._HIDE_BUTTONS_BY_MODE.get(self.get_crosshair_mode_from_config(), frozenset())
+        if hide_buttons != self._hideButtons:
+            self._hideButtons = hide_buttons
+            self._heldButtons = []
+            self._applyPressState()
+        if self._hideButtons:
+            self.start_mouse_listener()
+        else:
+            self.stop_mouse_listener()
+
+    def setLatencyTracing(self, enabled: bool):
+        """Start or stop recording input latency, the figures are written out when it stops or the app quits."""
+        if enabled == self.latencyTracer.enabled:
+            return
+        if enabled:
+            self.latencyTracer.reset()
+            QApplication.instance().aboutToQuit.connect(self.dump_latency)
+        else:
+            QApplication.instance().aboutToQuit.disconnect(self.dump_latency)
+            self.dump_latency()
+        self.latencyTracer.setEnabled(enabled)
+
+    def dump_latency(self, file_path=None):
+        self.latencyTracer.dump(file_path or os.path.join(CROSSPIXEL_DIR_PATH, "latency.json"))
+
     def start_mouse_listener(self):
         """Start a global mouse listener to handle mouse button presses."""
-        self.mouse_listener = mouse.Listener(on_click=self.handle_mouse_click)
-        self.mouse_listener.start()
+        if self.mouse_listener is None:
+            self.mouse_listener = mouse.Listener(on_click=self.handle_mouse_click)
+            self.mouse_listener.start()
+
+    def stop_mouse_listener(self):
+        """Stop the global mouse listener, it is not needed while hiding is disabled."""
+        if self.mouse_listener is not None:
+            self.mouse_listener.stop()
+            self.mouse_listener = None
 
     def handle_mouse_click(self, x, y, button, pressed):
-        """Handle global mouse button presses."""
-        crosshair_mode = self.get_crosshair_mode_from_config()
-        #print(f"Mouse button {button} {'pressed' if pressed else 'released'}. Crosshair mode: {crosshair_mode}")
-
-        # Logic to determine whether to hide the crosshair based on the integer value
-        if crosshair_mode == 1 and button == mouse.Button.right:  
-            self.toggle_visibility_based_on_press(pressed)
-        elif crosshair_mode == 2 and button == mouse.Button.left:  
-            self.toggle_visibility_based_on_press(pressed)
-        elif crosshair_mode == 3 and button in [mouse.Button.left, mouse.Button.right]: 
-            self.toggle_visibility_based_on_press(pressed)
-
-    def toggle_visibility_based_on_press(self, pressed):
-        """Toggle visibility based on mouse button press."""
-        if pressed:
-            self.set_opacity(0.0)  # Make the crosshair invisible
-        else:
-            self.set_opacity(self._IMAGE_OPACITY)  # Restore the crosshair's opacity
+        """Handle global mouse button presses. Runs on the mouse hook thread, so it must stay cheap."""
+        if button in self._hideButtons:
+            self.latencyTracer.start("mouse")
+            self.hideButtonChanged.emit(button, pressed)
+
+    def toggle_visibility_based_on_press(self, button, pressed):
+        """Track the held hide buttons and show the crosshair for the most recently pressed one."""
+        self.latencyTracer.mark("mouse", "slot")
+        with self.latencyTracer.handling("mouse"):
+            if pressed and button not in self._heldButtons:
+                self._heldButtons.append(button)
+            elif not pressed and button in self._heldButtons:
+                self._heldButtons.remove(button)
+            self._applyPressState()
+
+    def _applyPressState(self):
+        """Show the press crosshair of the held button, hide the crosshair if it has none, or restore it."""
+        button = self._heldButtons[-1] if self._heldButtons else None
+        press_cache = self.pressCaches.get(button)
+        cache = press_cache or self.imageCache
+        opacity = 0.0 if button is not None and press_cache is None else self._IMAGE_OPACITY
+        if cache is self.activeCache:
+            self.set_opacity(opacity)
+            return
+        # Both crosshairs are already rendered, switching is a swap and a repaint of the crosshair area
+        self.activeCache = cache
+        self.image_opacity = opacity
+        self.update(self._crosshairRect())
+
+    def setPressCrosshairs(self, paths):
+        """Decode, center and pre-render the crosshairs shown while each hide button is held, keyed by button."""
+        paths = {button: path for button, path in paths.items() if path}
+        if paths == self._pressCrosshairPaths:
+            return
+        self._pressCrosshairPaths = paths
+        self.pressCaches = {}
+        for button, path in paths.items():
+            image = QImage(path)
+            if image.isNull():
+                continue  # Unreadable, the button hides the crosshair as if no image was set
+            cache = OverlayImageCache(self.imageSize)
+            cache.setSource(centered_on_canvas(image, self._IMAGE_SIZE))
+            self.pressCaches[button] = cache
+        self._prepareImageCache()
+        self._applyPressState()
 
     def set_opacity(self, opacity_value):
         """Set the opacity of the crosshair."""
+        if opacity_value == self.image_opacity:
+            return
         self.image_opacity = opacity_value
-        self.update()  # Trigger a repaint to reflect the new opacity
+        self._prepareImageCache()
+        self.update(self._crosshairRect())  # Repaint only the crosshair to reflect the new opacity
@@ -0,0 +1,238 @@
+import os
+import sys
+import time
+import ctypes
+import psutil
+
+# Priority names offered in the settings, with the Windows priority class and POSIX nice value for each
+PRIORITIES = {
+    "high": ("HIGH_PRIORITY_CLASS", -10),
+    "above_normal": ("ABOVE_NORMAL_PRIORITY_CLASS", -5),
+    "normal": ("NORMAL_PRIORITY_CLASS", 0),
+    "below_normal": ("BELOW_NORMAL_PRIORITY_CLASS", 5),
+    "idle": ("IDLE_PRIORITY_CLASS", 19),
+}
+
+COARSE_TIMER_SLACK_NS = 2_000_000  # Linux: wakeups within 2 ms of each other may be merged
+_PR_SET_TIMERSLACK = 29
+_PR_GET_TIMERSLACK = 30
+
+# Windows: SetProcessInformation(ProcessPowerThrottling) to stop honouring raised timer resolution
+_PROCESS_POWER_THROTTLING = 4
+_PROCESS_POWER_THROTTLING_CURRENT_VERSION = 1
+_PROCESS_POWER_THROTTLING_IGNORE_TIMER_RESOLUTION = 4
+
+
+class _PowerThrottlingState(ctypes.Structure):
+    _fields_ = [("Version", ctypes.c_ulong), ("ControlMask", ctypes.c_ulong), ("StateMask", ctypes.c_ulong)]
+
+
+def parse_cores(text) -> list:
+    """Parse a core list like "2,3" or "4-7" into sorted core numbers, an empty list meaning all cores."""
+    cores = set()
+    for part in str(text or "").replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cores.update(range(int(first), int(last) + 1))
+        else:
+            cores.add(int(part))
+    available = range(psutil.cpu_count() or 1)
+    return sorted(core for core in cores if core in available)
+
+
+class ProcessTuning:
+    """Applies the priority, CPU affinity and timer settings to this process and every thread it already runs.
+
+    On Linux priority and affinity belong to individual threads, so they are set for each existing thread as
+    well as the process; threads started later, like the mouse hook, inherit them. Everything that fails (e.g.
+    raising priority without the right privileges) is reported instead of raised.
+    """
+
+    _instance = None  # Singleton instance, so the settings dialog can report what was applied at startup
+
+    def __new__(cls):
+        if not isinstance(cls._instance, cls):
+            cls._instance = super(ProcessTuning, cls).__new__(cls)
+            cls._instance.process = psutil.Process()
+            cls._instance.errors = []
+        return cls._instance
+
+    def apply(self, priority="normal", cores="", coarse_timers=False):
+        self.errors = []
+        self._applyPriority(priority)
+        self._applyAffinity(parse_cores(cores))
+        self._applyTimerCoalescing(coarse_timers)
+        for error in self.errors:
+            print(f"Process tuning: {error}")
+
+    def apply_from_settings(self, keybinds):
+        self.apply(keybinds.get_keybind("process_priority"), keybinds.get_keybind("cpu_affinity"), bool(keybinds.get_keybind("coarse_timers")))
+
+    def _threadIds(self):
+        return [thread.id for thread in self.process.threads()]
+
+    def _applyPriority(self, priority):
+        windows_class, nice = PRIORITIES.get(priority, PRIORITIES["normal"])
+        try:
+            if sys.platform == "win32":
+                self.process.nice(getattr(psutil, windows_class))
+            else:
+                for thread_id in self._threadIds():
+                    os.setpriority(os.PRIO_PROCESS, thread_id, nice)
+        except (OSError, psutil.Error) as e:
+            self.errors.append(f"could not set priority {priority}: {e}")
+
+    def _applyAffinity(self, cores):
+        if not hasattr(self.process, "cpu_affinity"):
+            if cores:
+                self.errors.append("CPU affinity is not supported on this platform")
+            return
+        cores = cores or list(range(psutil.cpu_count() or 1))
+        try:
+            if sys.platform.startswith("linux"):
+                for thread_id in self._threadIds():
+                    os.sched_setaffinity(thread_id, cores)
+            else:
+                self.process.cpu_affinity(cores)
+        except (OSError, psutil.Error) as e:
+            self.errors.append(f"could not pin to cores {cores}: {e}")
+
+    def _applyTimerCoalescing(self, coarse):
+        if sys.platform.startswith("linux"):
+            try:
+                libc = ctypes.CDLL(None, use_errno=True)
+                # 0 restores the default slack the process inherited
+                if libc.prctl(_PR_SET_TIMERSLACK, ctypes.c_ulong(COARSE_TIMER_SLACK_NS if coarse else 0), 0, 0, 0) != 0:
+                    raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+            except (OSError, AttributeError) as e:
+                self.errors.append(f"could not set timer slack: {e}")
+        elif sys.platform == "win32":
+            state = _PowerThrottlingState(_PROCESS_POWER_THROTTLING_CURRENT_VERSION, _PROCESS_POWER_THROTTLING_IGNORE_TIMER_RESOLUTION,
+                                          _PROCESS_POWER_THROTTLING_IGNORE_TIMER_RESOLUTION if coarse else 0)
+            kernel32 = ctypes.windll.kernel32
+            if not kernel32.SetProcessInformation(kernel32.GetCurrentProcess(), _PROCESS_POWER_THROTTLING, ctypes.byref(state), ctypes.sizeof(state)):
+                self.errors.append(f"could not change timer resolution handling: error {kernel32.GetLastError()}")
+
+    def report(self) -> str:
+        """Describe the priority, affinity and timer slack currently in effect, for display in the settings."""
+        parts = []
+        try:
+            nice = self.process.nice()
+            if sys.platform == "win32":
+                names = {getattr(psutil, windows_class): name for name, (windows_class, _) in PRIORITIES.items()}
+                parts.append(f"priority {names.get(nice, nice)}")
+            else:
+                parts.append(f"nice {nice}")
+        except psutil.Error:
+            pass
+        if hasattr(self.process, "cpu_affinity"):
+            cores = self.process.cpu_affinity()
+            parts.append("all cores" if len(cores) == (psutil.cpu_count() or 1) else f"cores {','.join(map(str, cores))}")
+        if sys.platform.startswith("linux"):
+            slack = ctypes.CDLL(None).prctl(_PR_GET_TIMERSLACK, 0, 0, 0, 0)
+            parts.append(f"timer slack {slack / 1000:g} µs")
+        text = ", ".join(parts)
+        if self.errors:
+            text += f" ({len(self.errors)} setting(s) could not be applied)"
+        return text
+
+
+def _busy_worker(seconds, counter):
+    """Stand-in for a game's main thread: count loop iterations until the time is up."""
+    iterations = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        for _ in range(1000):
+            pass
+        iterations += 1000
+    with counter.get_lock():
+        counter.value += iterations
+
+
+def _benchmark_run(seconds, settings, results):
+    """One benchmark run, in a process of its own: start the workers, apply the settings, then time the workload."""
+    import multiprocessing
+    from PyQt5.QtCore import Qt, QTimer, QElapsedTimer, QEventLoop
+    from PyQt5.QtGui import QImage, QPainter
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    tuning = ProcessTuning()
+    counter = multiprocessing.Value("Q", 0)
+    workers = [multiprocessing.Process(target=_busy_worker, args=(seconds, counter)) for _ in range(psutil.cpu_count() or 1)]
+    for worker in workers:
+        worker.start()
+    # Tune after starting the workers, they must not inherit the settings
+    tuning.apply(*settings)
+
+    # A crosshair repaint every frame
+    target = QImage(100, 100, QImage.Format_ARGB32_Premultiplied)
+    crosshair = QImage(100, 100, QImage.Format_ARGB32_Premultiplied)
+    crosshair.fill(Qt.red)
+    lateness = []
+    clock = QElapsedTimer()
+    timer = QTimer()
+    timer.setTimerType(Qt.CoarseTimer if settings[2] else Qt.PreciseTimer)
+
+    def frame():
+        lateness.append(max(0, clock.restart() - 16))
+        with QPainter(target) as painter:
+            painter.drawImage(0, 0, crosshair)
+    timer.timeout.connect(frame)
+    clock.start()
+    timer.start(16)
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec_()
+    timer.stop()
+
+    for worker in workers:
+        worker.join()
+    lateness.sort()
+    results.put({
+        "worker_iterations_per_s": round(counter.value / seconds),
+        "frames": len(lateness),
+        "timer_late_p50_ms": lateness[len(lateness) // 2] if lateness else None,
+        "timer_late_p99_ms": lateness[int(len(lateness) * 0.99)] if lateness else None,
+        "settings": tuning.report(),
+    })
+
+
+def benchmark(seconds: float = 5.0, priority="idle", cores="", coarse_timers=True) -> dict:
+    """Measure how much CPU an overlay-like workload takes away from busy workers saturating every core.
+
+    The workload runs twice for the given time, with default settings and then with the given ones. Each run
+    reports the workers' combined iterations per second and how late the overlay's 16 ms timer fired. Runs happen
+    in child processes, since without privileges a lowered priority can't be raised back; the caller keeps its own.
+    """
+    import queue
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for label, settings in (("default", ("normal", "", False)), ("tuned", (priority, cores, coarse_timers))):
+        run_results = context.Queue()
+        run = context.Process(target=_benchmark_run, args=(seconds, settings, run_results))
+        run.start()
+        try:
+            results[label] = run_results.get(timeout=seconds + 60)
+        except queue.Empty:
+            results[label] = {"error": "the run did not report back"}
+        run.join()
+        if run.exitcode:
+            results[label]["exit_code"] = run.exitcode
+    return results
+
+
+if __name__ == "__main__":
+    import json
+    import argparse
+    parser = argparse.ArgumentParser(description="CPU contention benchmark for the process tuning settings.")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--priority", default="idle", choices=list(PRIORITIES))
+    parser.add_argument("--cores", default="")
+    parser.add_argument("--no-coarse-timers", dest="coarse_timers", action="store_false")
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.seconds, args.priority, args.cores, args.coarse_timers), indent=2))
@@ -1,5 +1,6 @@
 import json
 import os
+import tempfile
 
 # Define the default keybinds
 DEFAULT_KEYBINDS = {
@@ -10,9 +11,50 @@ DEFAULT_KEYBINDS = {
     "offset_keybind": "Ctrl+O",
     "offset_x": 0,
     "offset_y": 0,
-    "crosshair_disable_mode": 0  # Default value for the dropdown, 0 corresponds to "Disabled"
+    "nudge_up": "Ctrl+Alt+Up",  # Move the crosshair offset by one pixel
+    "nudge_down": "Ctrl+Alt+Down",
+    "nudge_left": "Ctrl+Alt+Left",
+    "nudge_right": "Ctrl+Alt+Right",
+    "nudge_up_large": "Ctrl+Alt+Shift+Up",  # Move the crosshair offset by nudge_large_step pixels
+    "nudge_down_large": "Ctrl+Alt+Shift+Down",
+    "nudge_left_large": "Ctrl+Alt+Shift+Left",
+    "nudge_right_large": "Ctrl+Alt+Shift+Right",
+    "nudge_large_step": 10,
+    "undo_budget_kb": 4096,  # Memory the canvas undo history may use before the oldest steps are moved to disk
+    "undo_disk_cap_mb": 64,  # Disk the moved steps may use before the oldest are dropped
+    "crosshair_disable_mode": 0,  # Default value for the dropdown, 0 corresponds to "Disabled"
+    "press_crosshair_right": "",  # Image shown instead of hiding while right click is held, empty to hide
+    "press_crosshair_left": "",  # Image shown instead of hiding while left click is held, empty to hide
+    "overlay_compact_window": True,  # Overlay window is only as large as the crosshair
+    "overlay_screen": "",  # Name of the screen showing the overlay, empty for the primary screen
+    "overlay_scale": 1.0,  # On-screen size of the crosshair relative to the 100x100 canvas
+    "magnifier_enabled": False,  # Show a magnified view of the area around the crosshair
+    "magnifier_region": 32,  # Size of the captured area in pixels
+    "magnifier_zoom": 3,
+    "magnifier_fps": 30,
+    "adaptive_contrast_enabled": False,  # Swap to an alternate crosshair colour when the background hides it
+    "adaptive_contrast_rate": 4,  # Background samples per second
+    "adaptive_contrast_color": "",  # Alternate colour, empty to pick black or white automatically
+    "outline_enabled": False,  # Draw an outline behind the crosshair on the overlay
+    "outline_radius": 1,  # Outline width in canvas pixels
+    "outline_color": "#000000",
+    "outline_shadow": False,  # Also cast a drop shadow below and to the right
+    "overlay_separate_process": False,  # Run the overlay in its own lightweight process, takes effect on restart
+    "live_preview": False,  # Mirror canvas edits to the overlay as they are drawn
+    "process_priority": "normal",  # One of the names in ProcessTuning.PRIORITIES
+    "cpu_affinity": "",  # Cores CrossPixel may run on, e.g. "2,3" or "4-7", empty for all
+    "coarse_timers": False,  # Let the OS merge CrossPixel's timer wakeups
+    "tray_mode": False,  # Close the editor to a tray icon after Apply, keeping only the overlay in memory
+    "profiles_enabled": False,  # Switch to a game's profile when it starts or takes focus, see Settings/Profiles.py
+    "latency_tracing": False,  # Record input-to-paint latency, written to latency.json on exit
+    "control_api_enabled": False  # Accept local scripting commands, see Components/Overlay/ControlClient.py
 }
 
+# Settings holding key sequences, only these are registered as global hotkeys; the rest are settings stored alongside them
+HOTKEY_SETTINGS = ("undo", "redo", "hide_crosshair", "self_destruct", "offset_keybind",
+                   "nudge_up", "nudge_down", "nudge_left", "nudge_right",
+                   "nudge_up_large", "nudge_down_large", "nudge_left_large", "nudge_right_large")
+
 # Define path to the CrossPixel directory in the AppData\Local directory
 appdata_local_path = os.path.join(os.path.expanduser("~"), "AppData", "Local")
 CROSSPIXEL_DIR_PATH = os.path.join(appdata_local_path, "CrossPixel")
@@ -31,9 +73,15 @@ def save_keybinds_to_file(keybinds):
     r"""Save keybinds to a file in the CrossPixel directory within the AppData\Local directory."""
     ensure_crosspixel_folder_exists()
     
-    # Save the keybinds to the file
-    with open(KEYBINDS_FILE_PATH, 'w') as file:
-        json.dump(keybinds, file)
+    # Write to a temporary file and swap it in, so a crash mid-write never leaves a truncated config behind
+    fd, temp_path = tempfile.mkstemp(dir=CROSSPIXEL_DIR_PATH, prefix="keybinds_config.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as file:
+            json.dump(keybinds, file)
+        os.replace(temp_path, KEYBINDS_FILE_PATH)
+    except Exception:
+        os.remove(temp_path)
+        raise
 
 def load_keybinds_from_file():
     r"""Load keybinds from the file in the CrossPixel directory within the AppData\Local directory. 
@@ -42,12 +90,12 @@ def load_keybinds_from_file():
 
     # If the file doesn't exist, return default keybinds
     if not os.path.exists(KEYBINDS_FILE_PATH):
-        return DEFAULT_KEYBINDS
+        return dict(DEFAULT_KEYBINDS)
 
-    # If the file exists, try to load and return the keybinds
+    # If the file exists, try to load and return the keybinds, filling in any settings added since it was saved
     try:
         with open(KEYBINDS_FILE_PATH, 'r') as file:
-            return json.load(file)
+            return {**DEFAULT_KEYBINDS, **json.load(file)}
     except Exception as e:
         print(f"Error reading file: {e}")
-        return DEFAULT_KEYBINDS
+        return dict(DEFAULT_KEYBINDS)
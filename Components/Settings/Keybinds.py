@@ -1,6 +1,9 @@
-from Components.Settings.Config import save_keybinds_to_file, load_keybinds_from_file
+from Components.Settings.Config import save_keybinds_to_file, load_keybinds_from_file, HOTKEY_SETTINGS
 import keyboard
-from PyQt5.QtCore import QTimer
+from Components.LatencyTracer import LatencyTracer
+from PyQt5.QtCore import QTimer, QCoreApplication
+
+SAVE_DELAY_MS = 1000  # Quiet period before changes made with save_later are written
 
 class Keybinds:
     _instance = None  # Singleton instance
@@ -13,7 +16,11 @@ class Keybinds:
             # Move the initialization code here
             cls._instance.keybinds = load_keybinds_from_file()
             cls._instance.action_map = {}
+            cls._instance.settings_listeners = []
             cls._instance._hotkeys = {}
+            cls._instance._saveTimer = None
+            cls._instance._changed = set()  # Settings changed in this process since they were last saved
+            cls._instance._overrides = {}  # Settings applied over the saved ones for a while, e.g. by a game profile
             
             # Register the keybinds as global hotkeys
             cls._instance._register_global_hotkeys()
@@ -21,12 +28,29 @@ class Keybinds:
 
     def set_keybind(self, action, key_sequence):
         """Set a keybind for a specific action."""
+        if self.keybinds.get(action) != key_sequence:
+            self._changed.add(action)
+            # A setting changed on purpose replaces any override of it
+            self._overrides.pop(action, None)
         self.keybinds[action] = key_sequence
 
     def get_keybind(self, action):
         """Get the keybind for a specific action."""
+        if action in self._overrides:
+            return self._overrides[action]
         return self.keybinds.get(action)
 
+    def set_overrides(self, overrides):
+        """Apply settings over the saved ones until replaced, an empty dict restores the saved ones.
+
+        Overrides are never saved and hold no hotkeys, listeners are told so they pick up the values in effect.
+        """
+        if overrides == self._overrides:
+            return
+        self._overrides = dict(overrides)
+        for func in self.settings_listeners:
+            func()
+
     def matches(self, action, key_sequence):
         return self.keybinds.get(action) == key_sequence
 
@@ -34,18 +58,40 @@ class Keybinds:
         """Register an action with its corresponding function."""
         self.action_map[action] = func
 
+    def register_settings_listener(self, func):
+        """Register a function to be called after the settings have been saved."""
+        self.settings_listeners.append(func)
+
+    def unregister_owner(self, owner):
+        """Forget the actions and settings listeners that are methods of the given object, e.g. before deleting it."""
+        def owned(func):
+            return getattr(func, "__self__", None) is owner
+        self.action_map = {action: func for action, func in self.action_map.items() if not owned(func)}
+        self.settings_listeners = [func for func in self.settings_listeners if not owned(func)]
+
     def execute_action(self, key_sequence):
         """Execute the function corresponding to the given key sequence."""
-        for action, bind in self.keybinds.items():
-            if bind == key_sequence:
+        for action in HOTKEY_SETTINGS:
+            if self.keybinds.get(action) == key_sequence:
                 func = self.action_map.get(action)
                 if func:
-                    QTimer.singleShot(0, func)
+                    tracer = LatencyTracer()
+                    tracer.start("hotkey")
+
+                    def dispatch():
+                        tracer.mark("hotkey", "dispatch")
+                        with tracer.handling("hotkey"):
+                            func()
+                    QTimer.singleShot(0, dispatch)
                 break
 
     def _register_global_hotkeys(self):
         """Registers the keybinds as global hotkeys."""
-        for action, key_sequence in self.keybinds.items():
+        for action in HOTKEY_SETTINGS:
+            key_sequence = self.keybinds.get(action)
+            # An empty or missing key sequence leaves the action unbound
+            if not isinstance(key_sequence, str) or not key_sequence:
+                continue
             if key_sequence not in self._hotkeys:
                 # Add the key_sequence as a global hotkey that triggers execute_action
                 self._hotkeys[key_sequence] = keyboard.add_hotkey(key_sequence, lambda ks=key_sequence: self.execute_action(ks))
@@ -56,6 +102,47 @@ class Keybinds:
             keyboard.remove_hotkey(hotkey)
         self._hotkeys.clear()
 
+    def save_later(self, delay_ms=SAVE_DELAY_MS):
+        """Save the keybinds once no further changes arrive for delay_ms, so a burst of changes costs one write."""
+        if self._saveTimer is None:
+            self._saveTimer = QTimer()
+            self._saveTimer.setSingleShot(True)
+            self._saveTimer.timeout.connect(self._save)
+            QCoreApplication.instance().aboutToQuit.connect(self.save_pending)
+        self._saveTimer.start(delay_ms)
+
+    def save_pending(self):
+        """Write a save scheduled with save_later right away."""
+        if self._saveTimer is not None and self._saveTimer.isActive():
+            self._saveTimer.stop()
+            self._save()
+
+    def _cancel_pending_save(self):
+        if self._saveTimer is not None:
+            self._saveTimer.stop()
+
+    def _save(self):
+        """Write the settings changed in this process over the saved ones.
+
+        The editor and a separate overlay process share the file, each only writes back what it changed itself, so
+        neither overwrites the other's changes with the stale copy it holds in memory.
+        """
+        saved = load_keybinds_from_file()
+        saved.update((action, self.keybinds[action]) for action in self._changed)
+        save_keybinds_to_file(saved)
+        self._changed.clear()
+
+    def reload(self):
+        """Re-read the saved settings, e.g. after another process saved them."""
+        # Changes still waiting in save_later are written first, so they survive the reload
+        self.save_pending()
+        self._unregister_global_hotkeys()
+        self.keybinds = load_keybinds_from_file()
+        self._register_global_hotkeys()
+
+        for func in self.settings_listeners:
+            func()
+
     def update_keybinds(self, new_keybinds):
         """Update keybinds using provided dictionary."""
         # Unregister old hotkeys
@@ -68,5 +155,10 @@ class Keybinds:
         # Register new hotkeys
         self._register_global_hotkeys()
         
-        # Save updated keybinds to file
-        save_keybinds_to_file(self.keybinds)
+        # Save updated keybinds to file, this includes anything still waiting in save_later
+        self._cancel_pending_save()
+        self._save()
+
+        # Let listeners pick up the new settings from memory
+        for func in self.settings_listeners:
+            func()
@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+import ctypes
+import tempfile
+import psutil
+from PyQt5.QtCore import Qt, QObject, QTimer, pyqtSignal
+from PyQt5.QtGui import QPixmap
+from Components.Settings.Config import CROSSPIXEL_DIR_PATH
+
+PROFILES_DIR_PATH = os.path.join(CROSSPIXEL_DIR_PATH, "profiles")
+PROFILES_FILE_PATH = os.path.join(PROFILES_DIR_PATH, "profiles.json")
+PROFILE_SETTINGS = ("offset_x", "offset_y", "crosshair_disable_mode")  # Settings a profile switches along with its crosshair
+POLL_INTERVAL_MS = 1000
+
+
+def profile_key(executable: str) -> str:
+    """Profiles are matched on the executable's file name, ignoring case."""
+    return os.path.basename(executable or "").strip().lower()
+
+
+def load_profiles() -> dict:
+    """Return the saved profiles as {executable name: {"crosshair": image path, setting: value, ...}}."""
+    if not os.path.exists(PROFILES_FILE_PATH):
+        return {}
+    try:
+        with open(PROFILES_FILE_PATH, 'r') as file:
+            return json.load(file)
+    except Exception as e:
+        print(f"Error reading profiles: {e}")
+        return {}
+
+
+def save_profiles(profiles: dict):
+    os.makedirs(PROFILES_DIR_PATH, exist_ok=True)
+    # Swapped in like the settings file, so a crash mid-write keeps the previous profiles
+    fd, temp_path = tempfile.mkstemp(dir=PROFILES_DIR_PATH, prefix="profiles.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as file:
+            json.dump(profiles, file, indent=2)
+        os.replace(temp_path, PROFILES_FILE_PATH)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+def save_profile(executable: str, pixmap: QPixmap, settings: dict):
+    """Store a crosshair and the given settings as the profile for an executable, replacing any previous one."""
+    name = profile_key(executable)
+    os.makedirs(PROFILES_DIR_PATH, exist_ok=True)
+    # Kept out of CROSSPIXEL_DIR_PATH itself, whose PNGs are old undo history and deleted at startup
+    crosshair_path = os.path.join(PROFILES_DIR_PATH, f"{name}.png")
+    pixmap.save(crosshair_path)
+    profiles = load_profiles()
+    profiles[name] = {"crosshair": crosshair_path, **{key: settings[key] for key in PROFILE_SETTINGS if key in settings}}
+    save_profiles(profiles)
+
+
+def delete_profile(executable: str):
+    profiles = load_profiles()
+    profile = profiles.pop(profile_key(executable), None)
+    if profile is None:
+        return
+    save_profiles(profiles)
+    try:
+        os.remove(profile["crosshair"])
+    except OSError:
+        pass
+
+
+class PsutilProcessSource:
+    """Lists running processes through psutil, and on Windows tells which one owns the foreground window."""
+
+    def pids(self) -> set:
+        # Only the process IDs, nothing is read about each process
+        return set(psutil.pids())
+
+    def name(self, pid: int) -> str:
+        try:
+            return psutil.Process(pid).name()
+        except psutil.Error:
+            return ""
+
+    def foregroundPid(self):
+        if sys.platform != "win32":
+            return None
+        user32 = ctypes.windll.user32
+        pid = ctypes.c_ulong()
+        user32.GetWindowThreadProcessId(user32.GetForegroundWindow(), ctypes.byref(pid))
+        return pid.value or None
+
+
+class FakeProcessSource:
+    """Serves a process list set by hand, for tests. Counts name lookups so the watcher's cost can be checked."""
+
+    def __init__(self, processes=None, foreground=None):
+        self.processes = dict(processes or {})  # pid -> executable name
+        self.foreground = foreground
+        self.nameLookups = 0
+
+    def pids(self) -> set:
+        return set(self.processes)
+
+    def name(self, pid: int) -> str:
+        self.nameLookups += 1
+        return self.processes.get(pid, "")
+
+    def foregroundPid(self):
+        return self.foreground
+
+
+class ProfileWatcher(QObject):
+    """Activates a profile when its executable starts or its window takes focus, and deactivates it once it exits.
+
+    Each poll compares the current process IDs with the previous poll's; only processes that appeared since are
+    looked up by name, so a poll costs one PID listing and a set difference. A focused profile takes precedence
+    over one that merely started.
+    """
+
+    profileActivated = pyqtSignal(str)  # Executable name of the profile
+    profileDeactivated = pyqtSignal(str)
+
+    def __init__(self, source=None, interval_ms: int = POLL_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.source = source or PsutilProcessSource()
+        self.profiles = frozenset()
+        self.active = None
+        self._names = {}  # pid -> profile key of every process seen running
+        self._foreground = None
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.VeryCoarseTimer)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.poll)
+
+    def setProfiles(self, names):
+        self.profiles = frozenset(profile_key(name) for name in names)
+
+    def start(self):
+        if not self.timer.isActive():
+            self.poll()
+            self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        # Processes may start and exit unseen while stopped, the next start begins from a fresh list
+        self._names.clear()
+        self._foreground = None
+        if self.active is not None:
+            active, self.active = self.active, None
+            self.profileDeactivated.emit(active)
+
+    def poll(self):
+        pids = self.source.pids()
+        started = pids - self._names.keys()
+        for pid in self._names.keys() - pids:
+            del self._names[pid]
+        for pid in started:
+            self._names[pid] = profile_key(self.source.name(pid))
+
+        running = None
+        if self.active is not None and self.active not in self._names.values():
+            active, self.active = self.active, None
+            self.profileDeactivated.emit(active)
+            # Another game with a profile may still be running
+            running = next((name for name in self._names.values() if name in self.profiles), None)
+
+        candidate = None
+        foreground = self.source.foregroundPid()
+        if foreground != self._foreground:
+            self._foreground = foreground
+            if self._names.get(foreground) in self.profiles:
+                candidate = self._names[foreground]
+        if candidate is None:
+            candidate = next((self._names[pid] for pid in started if self._names[pid] in self.profiles), running)
+
+        if candidate is not None and candidate != self.active:
+            self.active = candidate
+            self.profileActivated.emit(candidate)
+
+
+class ProfileManager(QObject):
+    """Keeps the profiles' crosshairs decoded in memory and applies a profile while the watcher has it active.
+
+    A profile's settings are applied as overrides of the saved ones and its crosshair replaces the applied one;
+    both are put back when the game exits. Nothing is saved.
+    """
+
+    def __init__(self, overlay, keybinds, source=None, parent=None):
+        super().__init__(parent)
+        self.overlay = overlay
+        self.keybinds = keybinds
+        self.profiles = {}
+        self.pixmaps = {}
+        self._loadedMtime = None
+        self._restore = None  # (crosshair, animation) shown before the first profile, and the profile pixmap over it
+        self.watcher = ProfileWatcher(source, parent=self)
+        self.watcher.profileActivated.connect(self.activate)
+        self.watcher.profileDeactivated.connect(self.deactivate)
+        self.refresh_settings()
+        keybinds.register_settings_listener(self.refresh_settings)
+
+    def refresh_settings(self):
+        self.reload()
+        if self.keybinds.get_keybind("profiles_enabled") and self.profiles:
+            self.watcher.start()
+        else:
+            self.watcher.stop()
+
+    def reload(self):
+        """Re-read the profiles if they were saved since the last read, decoding every crosshair up front."""
+        mtime = os.path.getmtime(PROFILES_FILE_PATH) if os.path.exists(PROFILES_FILE_PATH) else None
+        if mtime == self._loadedMtime:
+            return
+        self._loadedMtime = mtime
+        self.profiles = load_profiles()
+        self.pixmaps = {}
+        for name, profile in self.profiles.items():
+            pixmap = QPixmap(profile.get("crosshair", ""))
+            if pixmap.isNull():
+                print(f"Could not load the crosshair of profile {name}")
+                continue
+            self.pixmaps[name] = pixmap
+        self.watcher.setProfiles(self.profiles)
+
+    def activate(self, name: str):
+        profile = self.profiles.get(name)
+        if profile is None:
+            return
+        if name in self.pixmaps:
+            if self._restore is None:
+                self._restore = [getattr(self.overlay, "overlayImage", None), getattr(self.overlay, "animation", None), None]
+            self._restore[2] = self.pixmaps[name]
+            self.overlay.setOverlayImage(self.pixmaps[name])
+        self.keybinds.set_overrides({key: profile[key] for key in PROFILE_SETTINGS if key in profile})
+
+    def deactivate(self, name: str):
+        """Go back to the saved settings and the crosshair shown before, unless another one was applied since."""
+        self.keybinds.set_overrides({})
+        if self._restore is None:
+            return
+        (pixmap, animation, shown), self._restore = self._restore, None
+        current = getattr(self.overlay, "overlayImage", None)
+        if current is None or current.cacheKey() != shown.cacheKey():
+            return
+        if animation is not None:
+            self.overlay.setOverlayAnimation(animation)
+        elif pixmap is not None:
+            self.overlay.setOverlayImage(pixmap)
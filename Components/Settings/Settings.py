@@ -1,10 +1,12 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QSlider, QKeySequenceEdit, QHBoxLayout, QGroupBox, QWidget, QApplication, QLineEdit, QCheckBox, QComboBox, QLabel
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QSlider, QKeySequenceEdit, QHBoxLayout, QGroupBox, QWidget, QApplication, QLineEdit, QCheckBox, QComboBox, QLabel, QFileDialog, QSpinBox
 from PyQt5.QtCore import Qt, QPoint
 from PyQt5 import QtGui
 from PyQt5.QtGui import QIntValidator
 from Components.Styles import StylesSetupMixin
 from Components.Settings.Keybinds import Keybinds
 from Components.EventHandlers import EventHandlersMixin
+from Components.ProcessTuning import ProcessTuning, PRIORITIES
+from Components.Settings.Profiles import load_profiles, save_profile, delete_profile
 
 class SettingsDialog(QDialog, EventHandlersMixin):
     def __init__(self, parent):
@@ -35,6 +37,11 @@ class SettingsDialog(QDialog, EventHandlersMixin):
         self.redoKeybind = self.createSequenceEdit("Redo:", keybinds_group.layout())
         self.hideCrosshairKeybind = self.createSequenceEdit("Hide Crosshair:", keybinds_group.layout())
         self.selfDestructKeybind = self.createSequenceEdit("Self Destruct:", keybinds_group.layout())
+        self.overlayScaleDropdown = self.createScaleDropdown("Size:", keybinds_group.layout())
+        self.magnifierCheckbox = self.createCheckbox("Magnifier", keybinds_group.layout())
+        self.adaptiveContrastCheckbox = self.createCheckbox("Adaptive contrast", keybinds_group.layout())
+        self.separateProcessCheckbox = self.createCheckbox("Overlay process", keybinds_group.layout())
+        self.separateProcessCheckbox.setToolTip("Run the overlay in a separate process, takes effect the next time CrossPixel starts")
         horizontal_layout.addWidget(keybinds_group)
         
 
@@ -52,10 +59,86 @@ class SettingsDialog(QDialog, EventHandlersMixin):
         self.crosshairDisableModeDropdown = QComboBox()
         self.crosshairDisableModeDropdown.addItems(["Disabled","Hide while holding right click", "Hide while holding left click", "Hide while holding left click or right click"])
         offset_group.layout().addWidget(self.crosshairDisableModeDropdown)
+        self.compactOverlayCheckbox = self.createCheckbox("Compact overlay window", offset_group.layout())
+        self.overlayScreenDropdown = self.createScreenDropdown("Screen:", offset_group.layout())
+        self.livePreviewCheckbox = self.createCheckbox("Live preview", offset_group.layout())
+        self.livePreviewCheckbox.setToolTip("Show canvas edits on the overlay while drawing")
+        self.controlApiCheckbox = self.createCheckbox("Scripting API", offset_group.layout())
+        self.controlApiCheckbox.setToolTip("Lets local scripts control the overlay, see ControlClient.py")
         horizontal_layout.addWidget(offset_group)
 
         layout.addLayout(horizontal_layout)
 
+        performance_group = self.createGroup("Performance", 508, 95)
+        performance_row = QHBoxLayout()
+        self.priorityDropdown = self.createPriorityDropdown("Priority:", performance_row)
+        performance_row.addWidget(QLabel("Cores:"))
+        self.cpuAffinityEdit = QLineEdit()
+        self.cpuAffinityEdit.setPlaceholderText("all")
+        self.cpuAffinityEdit.setToolTip("Cores CrossPixel may run on, e.g. 2,3 or 4-7")
+        self.cpuAffinityEdit.setStyleSheet(self.styles_setup.line_edit_stylesheet())
+        performance_row.addWidget(self.cpuAffinityEdit)
+        self.coarseTimersCheckbox = QCheckBox("Coarse timers")
+        performance_row.addWidget(self.coarseTimersCheckbox)
+        performance_group.layout().addLayout(performance_row)
+        status_row = QHBoxLayout()
+        self.trayModeCheckbox = QCheckBox("Tray mode")
+        self.trayModeCheckbox.setToolTip("Close the editor to the tray after Apply, keeping only the overlay in memory")
+        status_row.addWidget(self.trayModeCheckbox)
+        self.processStatusLabel = QLabel(ProcessTuning().report())
+        self.processStatusLabel.setStyleSheet("color: gray;")
+        status_row.addWidget(self.processStatusLabel, 1)
+        performance_group.layout().addLayout(status_row)
+        layout.addWidget(performance_group)
+
+        press_group = self.createGroup("Crosshair while holding (empty hides it)", 508, 65)
+        press_row = QHBoxLayout()
+        self.pressRightEdit = self.createImagePathEdit("Right click:", press_row)
+        self.pressLeftEdit = self.createImagePathEdit("Left click:", press_row)
+        press_group.layout().addLayout(press_row)
+        layout.addWidget(press_group)
+
+        outline_group = self.createGroup("Outline", 508, 65)
+        outline_row = QHBoxLayout()
+        self.outlineCheckbox = self.createCheckbox("On overlay", outline_row)
+        outline_row.addWidget(QLabel("Width:"))
+        self.outlineRadiusSpinBox = QSpinBox()
+        self.outlineRadiusSpinBox.setRange(1, 10)
+        self.outlineRadiusSpinBox.setFixedWidth(45)
+        outline_row.addWidget(self.outlineRadiusSpinBox)
+        outline_row.addWidget(QLabel("Colour:"))
+        self.outlineColorEdit = QLineEdit()
+        self.outlineColorEdit.setPlaceholderText("#000000")
+        self.outlineColorEdit.setStyleSheet(self.styles_setup.line_edit_stylesheet())
+        self.outlineColorEdit.setFixedWidth(80)
+        outline_row.addWidget(self.outlineColorEdit)
+        self.outlineShadowCheckbox = self.createCheckbox("Shadow", outline_row)
+        outline_group.layout().addLayout(outline_row)
+        layout.addWidget(outline_group)
+
+        profiles_group = self.createGroup("Game profiles", 508, 65)
+        profiles_row = QHBoxLayout()
+        self.profilesCheckbox = self.createCheckbox("Auto switch", profiles_row)
+        self.profilesCheckbox.setToolTip("Apply a game's profile when it starts or its window takes focus")
+        self.profileDropdown = QComboBox()
+        self.profileDropdown.setEditable(True)
+        self.profileDropdown.addItems(sorted(load_profiles()))
+        self.profileDropdown.setCurrentText("")
+        self.profileDropdown.lineEdit().setPlaceholderText("game.exe")
+        profiles_row.addWidget(self.profileDropdown, 1)
+        saveProfileButton = QPushButton("Save current")
+        saveProfileButton.setToolTip("Save the canvas, offsets and hide mode as this game's profile")
+        saveProfileButton.setStyleSheet(self.styles_setup.button_stylesheet())
+        saveProfileButton.clicked.connect(self.saveProfile)
+        saveProfileButton.setEnabled(hasattr(self.parent(), "drawingBoard"))
+        profiles_row.addWidget(saveProfileButton)
+        deleteProfileButton = QPushButton("Delete")
+        deleteProfileButton.setStyleSheet(self.styles_setup.button_stylesheet())
+        deleteProfileButton.clicked.connect(self.deleteProfile)
+        profiles_row.addWidget(deleteProfileButton)
+        profiles_group.layout().addLayout(profiles_row)
+        layout.addWidget(profiles_group)
+
         button_layout = QHBoxLayout()
         closeButton = QPushButton("Save and Close")
         closeButton.setStyleSheet(self.styles_setup.button_stylesheet())
@@ -147,6 +230,59 @@ class SettingsDialog(QDialog, EventHandlersMixin):
         
         return key_sequence_edit
     
+    def createScaleDropdown(self, label_text, layout):
+        dropdown = QComboBox()
+        for scale in (0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0):
+            dropdown.addItem(f"{round(100 * scale)}px", scale)
+        label = QLabel(label_text)
+
+        h_layout = QHBoxLayout()
+        h_layout.addWidget(label)
+        h_layout.addWidget(dropdown, 1)
+        layout.addLayout(h_layout)
+
+        return dropdown
+
+    def createImagePathEdit(self, label_text, layout):
+        path_edit = QLineEdit()
+        path_edit.setStyleSheet(self.styles_setup.line_edit_stylesheet())
+        browse_button = QPushButton("...")
+        browse_button.setFixedWidth(25)
+        browse_button.setStyleSheet(self.styles_setup.button_stylesheet())
+
+        def browse():
+            file_path, _ = QFileDialog.getOpenFileName(self, label_text, path_edit.text(), "Image Files (*.png *.jpeg *.jpg *.gif);;All Files (*)")
+            if file_path:
+                path_edit.setText(file_path)
+        browse_button.clicked.connect(browse)
+
+        layout.addWidget(QLabel(label_text))
+        layout.addWidget(path_edit)
+        layout.addWidget(browse_button)
+        return path_edit
+
+    def createPriorityDropdown(self, label_text, layout):
+        dropdown = QComboBox()
+        for name in PRIORITIES:
+            dropdown.addItem(name.replace("_", " ").capitalize(), name)
+        layout.addWidget(QLabel(label_text))
+        layout.addWidget(dropdown)
+        return dropdown
+
+    def createScreenDropdown(self, label_text, layout):
+        dropdown = QComboBox()
+        dropdown.addItem("Primary", "")
+        for screen in QApplication.screens():
+            dropdown.addItem(f"{screen.name()} ({screen.size().width()}x{screen.size().height()} @ {screen.devicePixelRatio():g}x)", screen.name())
+        label = QLabel(label_text)
+
+        h_layout = QHBoxLayout()
+        h_layout.addWidget(label)
+        h_layout.addWidget(dropdown, 1)
+        layout.addLayout(h_layout)
+
+        return dropdown
+
     def createCheckbox(self, label_text, layout):
         checkbox = QCheckBox(label_text)
         #checkbox.setStyleSheet(self.styles_setup.checkbox_stylesheet())
@@ -162,9 +298,44 @@ class SettingsDialog(QDialog, EventHandlersMixin):
             "offset_keybind": self.offsetKeybind.keySequence().toString(),
             "offset_x": self.offsetXSlider.value(),
             "offset_y": self.offsetYSlider.value(),
-            "crosshair_disable_mode": self.crosshairDisableModeDropdown.currentIndex()
+            "crosshair_disable_mode": self.crosshairDisableModeDropdown.currentIndex(),
+            "overlay_compact_window": self.compactOverlayCheckbox.isChecked(),
+            "overlay_screen": self.overlayScreenDropdown.currentData(),
+            "overlay_scale": self.overlayScaleDropdown.currentData(),
+            "magnifier_enabled": self.magnifierCheckbox.isChecked(),
+            "adaptive_contrast_enabled": self.adaptiveContrastCheckbox.isChecked(),
+            "overlay_separate_process": self.separateProcessCheckbox.isChecked(),
+            "live_preview": self.livePreviewCheckbox.isChecked(),
+            "process_priority": self.priorityDropdown.currentData(),
+            "cpu_affinity": self.cpuAffinityEdit.text().strip(),
+            "coarse_timers": self.coarseTimersCheckbox.isChecked(),
+            "tray_mode": self.trayModeCheckbox.isChecked(),
+            "press_crosshair_right": self.pressRightEdit.text().strip(),
+            "press_crosshair_left": self.pressLeftEdit.text().strip(),
+            "outline_enabled": self.outlineCheckbox.isChecked(),
+            "outline_radius": self.outlineRadiusSpinBox.value(),
+            "outline_color": self.outlineColorEdit.text().strip() or "#000000",
+            "outline_shadow": self.outlineShadowCheckbox.isChecked(),
+            "profiles_enabled": self.profilesCheckbox.isChecked(),
+            "control_api_enabled": self.controlApiCheckbox.isChecked()
         }
 
+    def saveProfile(self):
+        executable = self.profileDropdown.currentText().strip()
+        if not executable:
+            return
+        save_profile(executable, self.parent().drawingBoard.pixmap, self.get_keybinds())
+        self._refreshProfileDropdown(executable)
+
+    def deleteProfile(self):
+        delete_profile(self.profileDropdown.currentText())
+        self._refreshProfileDropdown("")
+
+    def _refreshProfileDropdown(self, current):
+        self.profileDropdown.clear()
+        self.profileDropdown.addItems(sorted(load_profiles()))
+        self.profileDropdown.setCurrentText(current)
+
     def saveAndExit(self):
         keybinds = Keybinds()
         keybinds.update_keybinds(self.get_keybinds())
@@ -184,6 +355,25 @@ class SettingsDialog(QDialog, EventHandlersMixin):
             
         self.offsetXSlider.setValue(keybinds.get("offset_x", 0))
         self.offsetYSlider.setValue(keybinds.get("offset_y", 0))
+        self.compactOverlayCheckbox.setChecked(bool(keybinds.get("overlay_compact_window", True)))
+        self.overlayScreenDropdown.setCurrentIndex(max(0, self.overlayScreenDropdown.findData(keybinds.get("overlay_screen", ""))))
+        self.overlayScaleDropdown.setCurrentIndex(max(0, self.overlayScaleDropdown.findData(float(keybinds.get("overlay_scale", 1.0)))))
+        self.magnifierCheckbox.setChecked(bool(keybinds.get("magnifier_enabled", False)))
+        self.adaptiveContrastCheckbox.setChecked(bool(keybinds.get("adaptive_contrast_enabled", False)))
+        self.separateProcessCheckbox.setChecked(bool(keybinds.get("overlay_separate_process", False)))
+        self.livePreviewCheckbox.setChecked(bool(keybinds.get("live_preview", False)))
+        self.priorityDropdown.setCurrentIndex(max(0, self.priorityDropdown.findData(keybinds.get("process_priority", "normal"))))
+        self.cpuAffinityEdit.setText(keybinds.get("cpu_affinity", ""))
+        self.coarseTimersCheckbox.setChecked(bool(keybinds.get("coarse_timers", False)))
+        self.trayModeCheckbox.setChecked(bool(keybinds.get("tray_mode", False)))
+        self.pressRightEdit.setText(keybinds.get("press_crosshair_right", ""))
+        self.pressLeftEdit.setText(keybinds.get("press_crosshair_left", ""))
+        self.outlineCheckbox.setChecked(bool(keybinds.get("outline_enabled", False)))
+        self.outlineRadiusSpinBox.setValue(int(keybinds.get("outline_radius", 1)))
+        self.outlineColorEdit.setText(keybinds.get("outline_color", "#000000"))
+        self.outlineShadowCheckbox.setChecked(bool(keybinds.get("outline_shadow", False)))
+        self.profilesCheckbox.setChecked(bool(keybinds.get("profiles_enabled", False)))
+        self.controlApiCheckbox.setChecked(bool(keybinds.get("control_api_enabled", False)))
 
     @staticmethod
     def open_and_process(parent):
@@ -0,0 +1,133 @@
+import gc
+import sys
+import ctypes
+import psutil
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtGui import QIcon, QPixmapCache
+from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction
+
+TRAY_PIXMAP_CACHE_KB = 256  # QPixmapCache limit while only the overlay is running
+
+
+def resident_mb() -> float:
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def private_mb() -> float:
+    """Memory only this process uses, RSS also counts the shared Qt and Python library pages."""
+    try:
+        return psutil.Process().memory_full_info().uss / (1024 * 1024)
+    except psutil.Error:
+        return float("nan")
+
+
+def trim_heap():
+    """Hand freed memory back to the OS instead of keeping it mapped for reuse."""
+    gc.collect()
+    try:
+        if sys.platform.startswith("linux"):
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        elif sys.platform == "win32":
+            # Trims the working set; pages that are still needed are faulted back in on use
+            ctypes.windll.psapi.EmptyWorkingSet(ctypes.windll.kernel32.GetCurrentProcess())
+    except (OSError, AttributeError) as e:
+        print(f"Could not trim the heap: {e}")
+
+
+class TrayMode(QObject):
+    """Keeps only the overlay and a tray icon alive while the editor is not needed.
+
+    When tray mode is enabled, applying a crosshair destroys the editor window with its canvas, colour picker,
+    undo history and stylesheets, then caps the pixmap cache and trims the heap. Clicking the tray icon builds a
+    fresh editor with the applied crosshair on its canvas.
+    """
+
+    def __init__(self, create_editor, overlay, keybinds, memory_manager, parent=None):
+        super().__init__(parent)
+        self.create_editor = create_editor
+        self.overlay = overlay
+        self.keybinds = keybinds
+        self.memory_manager = memory_manager
+        self.editor = None
+        self.lastReport = None
+        self._defaultPixmapCacheLimit = QPixmapCache.cacheLimit()
+
+        self.trayIcon = QSystemTrayIcon(QIcon("logo2.ico"), self)
+        self.trayIcon.setToolTip("CrossPixel")
+        self.trayIcon.activated.connect(self._onActivated)
+        menu = QMenu()
+        menu.addAction(QAction("Open editor", menu, triggered=self.openEditor))
+        menu.addAction(QAction("Show/hide crosshair", menu, triggered=self.overlay.toggle_visibility))
+        menu.addSeparator()
+        menu.addAction(QAction("Quit", menu, triggered=self.quit))
+        self.trayIcon.setContextMenu(menu)
+        self.menu = menu
+
+    def enabled(self) -> bool:
+        return bool(self.keybinds.get_keybind("tray_mode")) and QSystemTrayIcon.isSystemTrayAvailable()
+
+    def setEditor(self, editor):
+        self.editor = editor
+        editor.crosshairApplied.connect(self._onCrosshairApplied)
+
+    def openEditor(self):
+        """Show the editor, building it first if it was torn down."""
+        if self.editor is None:
+            QPixmapCache.setCacheLimit(self._defaultPixmapCacheLimit)
+            self.memory_manager.suspended = False
+            self.setEditor(self.create_editor(self.overlay))
+            # Continue from the crosshair that is showing
+            if getattr(self.overlay, "overlayImage", None) is not None:
+                self.editor.drawingBoard.setPixmap(self.overlay.overlayImage)
+        self.editor.show()
+        self.editor.raise_()
+        self.editor.activateWindow()
+
+    def _onActivated(self, reason):
+        if reason == QSystemTrayIcon.Trigger:
+            self.openEditor()
+
+    def _onCrosshairApplied(self):
+        if self.enabled():
+            # Leave the apply handler before its window is deleted
+            QTimer.singleShot(0, self.teardownEditor)
+
+    def teardownEditor(self):
+        """Destroy the editor and release everything it held, keeping the overlay running."""
+        if self.editor is None:
+            return
+        before = resident_mb()
+        editor, self.editor = self.editor, None
+        QApplication.instance().setQuitOnLastWindowClosed(False)
+        self.trayIcon.show()
+
+        editor.livePreview.setEnabled(False)
+        for owner in (editor, editor.drawingBoard, editor.drawingArea):
+            self.keybinds.unregister_owner(owner)
+        self.keybinds.register_action("self_destruct", self.quit)
+        editor.drawingBoard.history.clear()
+        self.memory_manager.suspended = True
+        self.memory_manager.release_memory()
+
+        editor.hide()
+        editor.destroyed.connect(lambda: QTimer.singleShot(0, lambda: self._releaseMemory(before)))
+        editor.drawingArea.deleteLater()
+        editor.deleteLater()
+
+    def _releaseMemory(self, before):
+        QPixmapCache.clear()
+        QPixmapCache.setCacheLimit(TRAY_PIXMAP_CACHE_KB)
+        trim_heap()
+        after = resident_mb()
+        self.lastReport = (before, after)
+        print(f"Tray mode: resident memory {before:.1f} MB -> {after:.1f} MB ({private_mb():.1f} MB private)")
+        self.trayIcon.setToolTip(f"CrossPixel ({after:.1f} MB)")
+
+    def quit(self):
+        self.keybinds._unregister_global_hotkeys()
+        self.keybinds.save_pending()
+        self.trayIcon.hide()
+        self.overlay.close()
+        if self.editor is not None:
+            self.editor.drawingBoard.history.clear()
+        QApplication.instance().quit()
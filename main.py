@@ -1,7 +1,14 @@
 import sys
+
+# The overlay-only process skips importing the editor entirely
+if __name__ == '__main__' and "--overlay-process" in sys.argv:
+    from Components.Overlay.SharedOverlay import run_overlay_process
+    sys.exit(run_overlay_process(sys.argv[sys.argv.index("--overlay-process") + 1]))
+
 import logging
 from PyQt5.QtWidgets import QApplication, QMainWindow, QSystemTrayIcon, QAction, QMenu
 from PyQt5.QtGui import QColor, QPalette, QIcon
+from PyQt5.QtCore import pyqtSignal
 from Components.OverlayCrosshairToScreen import OverlayCrosshairToScreen
 from Components.Canvas.DrawingAreaMain import DrawArea, PenType
 from Components.GuiSetup import GuiSetupMixin
@@ -11,17 +18,24 @@ from Components.Canvas.DrawingOverlays import DrawOverlaysMixin
 from Components.MemoryManager import MemoryManager
 from Components.Settings.Settings import SettingsDialog
 from Components.Settings.Keybinds import Keybinds
+from Components.ProcessTuning import ProcessTuning
+from Components.TrayMode import TrayMode
+from Components.Settings.Profiles import ProfileManager
+from Components.Overlay.SharedOverlay import OverlayProcessProxy
 
 logging.basicConfig(level=logging.INFO)
 
 
 class CrosshairDesigner(GuiSetupMixin, EventHandlersMixin, StylesSetupMixin, DrawOverlaysMixin, QMainWindow):
-    def __init__(self, memory_manager: MemoryManager, keybinds: Keybinds, drawing_area: DrawArea):
+    crosshairApplied = pyqtSignal()
+
+    def __init__(self, memory_manager: MemoryManager, keybinds: Keybinds, drawing_area: DrawArea, overlay=None):
         super().__init__()
         
         self.memory_manager = memory_manager
         self.keybinds = keybinds
         self.drawingArea = drawing_area
+        self.overlay = overlay  # Only given when the editor is rebuilt around a running overlay
         
         self._initialize_components()
         self._initialize_UI()
@@ -63,7 +77,7 @@ class CrosshairDesigner(GuiSetupMixin, EventHandlersMixin, StylesSetupMixin, Dra
         try:
             self.keybinds._unregister_global_hotkeys()
             self.memory_manager.release_memory()
-            self.drawingArea.clear_saved_pixmaps()
+            self.drawingBoard.history.clear()
         except Exception as e:
             logging.error(f"Error in closeEvent: {e}")
 
@@ -79,15 +93,32 @@ def main():
 
     memory_manager = MemoryManager()
     keybinds = Keybinds()
-    drawing_area = DrawArea(1.0)
-
-    window = CrosshairDesigner(memory_manager, keybinds, drawing_area)
-
-    close_button_stylesheet = window.setupCloseButtonStylesheet()
-    window.getCloseButton().setStyleSheet(close_button_stylesheet)
 
-    window.show()
-    window.setWindowIcon(QIcon("logo2.ico"))
+    # Priority, affinity and timer settings, applied before the overlay starts its hook threads
+    process_tuning = ProcessTuning()
+    process_tuning.apply_from_settings(keybinds)
+    keybinds.register_settings_listener(lambda: process_tuning.apply_from_settings(keybinds))
+
+    def create_editor(overlay=None):
+        window = CrosshairDesigner(memory_manager, keybinds, DrawArea(1.0), overlay)
+        close_button_stylesheet = window.setupCloseButtonStylesheet()
+        window.getCloseButton().setStyleSheet(close_button_stylesheet)
+        window.setWindowIcon(QIcon("logo2.ico"))
+        return window
+
+    # In tray mode the editor is torn down after Apply and rebuilt from the tray icon, so only the tray mode
+    # holds on to it
+    editor = create_editor()
+    tray_mode = TrayMode(create_editor, editor.overlay, keybinds, memory_manager)
+    tray_mode.setEditor(editor)
+    del editor
+
+    # Outlives the editor in tray mode, so it drives the overlay directly. A separate overlay process runs its own,
+    # profile settings are not saved and so could not reach it from here
+    if not isinstance(tray_mode.overlay, OverlayProcessProxy):
+        profile_manager = ProfileManager(tray_mode.overlay, keybinds)
+
+    tray_mode.openEditor()
     sys.exit(app.exec_())
 
 
@@ -0,0 +1,43 @@
+from PyQt5.QtCore import Qt, QPoint
+from PyQt5.QtGui import QImage, QColor, QPainter
+from Components.Overlay.AdaptiveContrast import AdaptiveContrast
+from Components.Overlay.FrameSources import ImageFrameSource
+
+
+def captured_with_overlay(crosshair: QImage, center: QPoint) -> ImageFrameSource:
+    """A black screen with the crosshair itself in the capture, as grabWindow returns it on Windows."""
+    screen = QImage(400, 400, QImage.Format_RGB32)
+    screen.fill(Qt.black)
+    with QPainter(screen) as painter:
+        painter.drawImage(center.x() - (crosshair.width() - 1) // 2, center.y() - (crosshair.height() - 1) // 2, crosshair)
+    return ImageFrameSource(screen, QPoint(0, 0))
+
+
+def sampled_luminance(crosshair: QImage) -> float:
+    center = QPoint(200, 200)
+    sampler = AdaptiveContrast(captured_with_overlay(crosshair, center))
+    sampler.setCenter(center)
+    sampler.setRing(25, 27)
+    sampler.setCrosshair(crosshair, None, crosshair)
+    sampler.sample()
+    return sampler.meanLuminance
+
+
+def test_ring_skips_the_crosshairs_own_pixels(qapp):
+    plus = QImage(100, 100, QImage.Format_ARGB32_Premultiplied)
+    plus.fill(Qt.transparent)
+    with QPainter(plus) as painter:
+        painter.fillRect(47, 0, 6, 100, QColor(Qt.white))
+        painter.fillRect(0, 47, 100, 6, QColor(Qt.white))
+    assert sampled_luminance(plus) == 0.0
+
+
+def test_ring_moves_outside_a_crosshair_covering_it(qapp):
+    disc = QImage(100, 100, QImage.Format_ARGB32_Premultiplied)
+    disc.fill(Qt.transparent)
+    with QPainter(disc) as painter:
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(Qt.white))
+        painter.drawEllipse(QPoint(49, 49), 35, 35)
+    assert sampled_luminance(disc) == 0.0
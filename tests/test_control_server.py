@@ -0,0 +1,62 @@
+import json
+import os
+import socket
+import pytest
+from PyQt5.QtCore import QDir, QElapsedTimer
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+from Components.Overlay.ControlServer import ControlServer
+
+
+@pytest.fixture
+def name():
+    name = f"CrossPixel-control-test-{os.getpid()}"
+    yield name
+    QLocalServer.removeServer(name)
+
+
+def wait_for(qapp, condition, timeout_ms=2000):
+    clock = QElapsedTimer()
+    clock.start()
+    while not condition() and clock.elapsed() < timeout_ms:
+        qapp.processEvents()
+    return condition()
+
+
+def request(qapp, name, line: bytes) -> dict:
+    client = QLocalSocket()
+    client.connectToServer(name)
+    assert wait_for(qapp, lambda: client.state() == QLocalSocket.ConnectedState)
+    client.write(line + b"\n")
+    client.flush()
+    assert wait_for(qapp, client.canReadLine)
+    return json.loads(bytes(client.readLine()))
+
+
+def test_failed_command_keeps_the_request_id(qapp, name):
+    server = ControlServer(overlay=None)
+    assert server.start(name)
+    response = request(qapp, name, b'{"cmd": "set_offset", "id": 7}')
+    assert response["ok"] is False and response["id"] == 7
+    assert request(qapp, name, b'[1]')["ok"] is False
+    server.stop()
+
+
+def test_second_instance_leaves_a_live_server_alone(qapp, name):
+    first = ControlServer(overlay=None)
+    assert first.start(name)
+    second = ControlServer(overlay=None)
+    assert not second.start(name)
+    assert request(qapp, name, b'{"cmd": "ping", "id": 1}')["ok"] is True
+    first.stop()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+def test_stale_socket_is_replaced(qapp, name):
+    # What a crashed instance leaves behind: the socket file with nobody listening on it
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(os.path.join(QDir.tempPath(), name))
+    stale.close()
+    server = ControlServer(overlay=None)
+    assert server.start(name)
+    assert request(qapp, name, b'{"cmd": "ping"}')["ok"] is True
+    server.stop()
@@ -0,0 +1,47 @@
+import pytest
+from PyQt5.QtGui import QImage, QColor
+from Components.Overlay.FrameAtlas import FrameAtlas, grid_columns, grid_rows
+from Components.Overlay.OverlayImageCache import OverlayImageCache
+
+QT_MAX_SIDE = 32767  # Largest image side QPainter's raster engine draws into
+
+
+def solid_frames(count: int, size: int = 8):
+    """Frames of one colour each, distinct enough to tell apart after filtered scaling."""
+    frames = []
+    for index in range(count):
+        frame = QImage(size, size, QImage.Format_ARGB32)
+        frame.fill(QColor(index % 256, (index * 7) % 256, 255 - index % 256))
+        frames.append(frame)
+    return frames
+
+
+def assert_frames_drawn(image: QImage, frames, rect_of):
+    for index, frame in enumerate(frames):
+        center = rect_of(index).center()
+        assert image.pixelColor(center) == frame.pixelColor(0, 0), f"frame {index}"
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 10, 60, 400])
+def test_grid_holds_every_frame(count):
+    assert grid_columns(count) * grid_rows(count) >= count
+    assert grid_columns(count) * (grid_rows(count) - 1) < count
+
+
+@pytest.mark.parametrize("count, size", [(400, 100), (60, 400)])
+def test_atlas_stays_within_raster_limit(qapp, count, size):
+    frames = solid_frames(count)
+    atlas = FrameAtlas(frames, [100] * count, size)
+    assert max(atlas.image.width(), atlas.image.height()) <= QT_MAX_SIDE
+    assert_frames_drawn(atlas.image, frames, atlas.frameRect)
+
+
+@pytest.mark.parametrize("count, size, dpr", [(60, 400, 1.5), (400, 100, 1.0)])
+def test_cached_frames_are_all_drawn(qapp, count, size, dpr):
+    frames = solid_frames(count)
+    atlas = FrameAtlas(frames, [100] * count, 100)
+    cache = OverlayImageCache(size)
+    cache.setSource(atlas.image, atlas.frameCount)
+    image = cache.image(1.0, dpr)
+    assert max(image.width(), image.height()) <= QT_MAX_SIDE
+    assert_frames_drawn(image, frames, lambda index: cache.frameRect(index, dpr))
@@ -0,0 +1,64 @@
+import random
+import pytest
+from PyQt5.QtCore import QPoint
+from PyQt5.QtGui import QImage, QPainter, QColor
+from Components.Canvas.DrawingBrushes import PenType
+from Components.Canvas.DrawingUtilities import interpolatedCoordinates, interpolatedPoints, drawStroke, drawWithPen
+
+try:
+    from hypothesis import given, strategies as st
+except ImportError:
+    given = None
+
+RANDOM_SEGMENTS = 5000
+
+
+def reference(start, end):
+    return [[point.x(), point.y()] for point in interpolatedPoints(QPoint(*start), QPoint(*end))]
+
+
+def assert_matches(start, end):
+    coordinates = interpolatedCoordinates(QPoint(*start), QPoint(*end))
+    assert coordinates.tolist() == reference(start, end), (start, end)
+
+
+def test_every_direction_and_slope():
+    # Every segment within 20 pixels of its start, which covers each octant, the axes and the diagonals
+    for delta_x in range(-20, 21):
+        for delta_y in range(-20, 21):
+            assert_matches((7, -3), (7 + delta_x, -3 + delta_y))
+
+
+if given is not None:
+    coordinate = st.integers(-5000, 5000)
+
+    @given(coordinate, coordinate, coordinate, coordinate)
+    def test_matches_reference(x_start, y_start, x_end, y_end):
+        assert_matches((x_start, y_start), (x_end, y_end))
+else:
+    def test_matches_reference():
+        rng = random.Random(24)
+        for _ in range(RANDOM_SEGMENTS):
+            start = (rng.randint(-5000, 5000), rng.randint(-5000, 5000))
+            span = rng.choice([3, 50, 2000])
+            end = (start[0] + rng.randint(-span, span), start[1] + rng.randint(-span, span))
+            assert_matches(start, end)
+
+
+@pytest.mark.parametrize("pen_type", [PenType.DEFAULT, PenType.SQUARE, PenType.ROUNDED, PenType.ERASER])
+@pytest.mark.parametrize("size", [1, 4, 9])
+def test_stroke_matches_point_by_point(qapp, pen_type, size):
+    start, end = QPoint(5, 60), QPoint(90, 23)
+    images = []
+    for stroke in (True, False):
+        image = QImage(100, 100, QImage.Format_ARGB32_Premultiplied)
+        image.fill(QColor(40, 80, 120))
+        painter = QPainter(image)
+        if stroke:
+            drawStroke(painter, pen_type, QColor(200, 30, 30), size, interpolatedCoordinates(start, end))
+        else:
+            for point in interpolatedPoints(start, end):
+                drawWithPen(painter, pen_type, QColor(200, 30, 30), size, point=point)
+        painter.end()
+        images.append(image)
+    assert images[0] == images[1]
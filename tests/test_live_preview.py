@@ -0,0 +1,45 @@
+from PyQt5.QtCore import Qt, QObject, QRect, pyqtSignal
+from PyQt5.QtGui import QPixmap
+from Components.Overlay.LivePreview import LivePreview
+
+
+class FakeCanvas(QObject):
+    canvasChanged = pyqtSignal(QRect)
+
+    def __init__(self):
+        super().__init__()
+        self.pixmap = QPixmap(20, 20)
+        self.pixmap.fill(Qt.red)
+
+
+class FakeOverlay:
+    def __init__(self):
+        self.updates = []
+        self.shown = 0
+
+    def updateOverlayRegion(self, image, rect):
+        self.updates.append((image.copy(), QRect(rect)))
+
+    def show(self):
+        self.shown += 1
+
+
+def test_enabling_leaves_the_applied_crosshair_alone(qapp):
+    canvas, overlay = FakeCanvas(), FakeOverlay()
+    preview = LivePreview(canvas, overlay)
+    preview.setEnabled(True)
+    preview.flush()
+    assert overlay.updates == [] and overlay.shown == 0
+
+
+def test_first_edit_sends_the_whole_canvas_then_only_changes(qapp):
+    canvas, overlay = FakeCanvas(), FakeOverlay()
+    preview = LivePreview(canvas, overlay)
+    preview.setEnabled(True)
+    canvas.canvasChanged.emit(QRect(2, 2, 3, 3))
+    preview.flush()
+    canvas.canvasChanged.emit(QRect(5, 6, 2, 2))
+    preview.flush()
+    assert [rect for _, rect in overlay.updates] == [QRect(0, 0, 20, 20), QRect(5, 6, 2, 2)]
+    assert overlay.updates[0][0].pixelColor(10, 10) == Qt.red
+    assert overlay.shown == 1
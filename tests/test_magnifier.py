@@ -0,0 +1,49 @@
+from PyQt5.QtCore import QElapsedTimer, QPoint, QRect
+from PyQt5.QtGui import QImage, QColor
+from Components.Overlay.Magnifier import Magnifier
+
+
+class FakeFrameSource:
+    """Fills the target with one colour per grab and records what it was asked for."""
+
+    def __init__(self):
+        self.grabs = []  # (address of the target's pixels, rect)
+
+    def grabInto(self, target: QImage, rect: QRect):
+        self.grabs.append((int(target.constBits()), QRect(rect)))
+        target.fill(QColor(len(self.grabs) * 40 % 256, 0, 0))
+        target.setPixelColor(0, 0, QColor(0, 255, 0))
+
+
+def test_frames_reuse_the_same_buffers(qapp):
+    source = FakeFrameSource()
+    magnifier = Magnifier(source, region_size=8, zoom=3)
+    magnifier.setCenter(QPoint(100, 50))
+    output = int(magnifier.image.constBits())
+    for _ in range(3):
+        magnifier.captureFrame()
+
+    assert {address for address, _ in source.grabs} == {int(magnifier.captureImage.constBits())}
+    assert all(rect == QRect(96, 46, 8, 8) for _, rect in source.grabs)
+    assert int(magnifier.image.constBits()) == output
+    assert magnifier.framesCaptured == 3
+    # Every captured pixel becomes a zoom x zoom block of the latest frame
+    image = magnifier.image
+    assert image.size() == magnifier.captureImage.size() * 3
+    assert all(image.pixelColor(x, y) == QColor(0, 255, 0) for x in range(3) for y in range(3))
+    assert image.pixelColor(3, 0) == QColor(120, 0, 0)
+
+
+def test_frame_rate_is_capped(qapp):
+    magnifier = Magnifier(FakeFrameSource(), fps=1000)
+    assert magnifier.timer.interval() == 1000 // Magnifier.MAX_FPS
+    magnifier.configure(32, 3, 20)
+    assert magnifier.timer.interval() == 50
+
+    magnifier.start()
+    clock = QElapsedTimer()
+    clock.start()
+    while clock.elapsed() < 300:
+        qapp.processEvents()
+    magnifier.stop()
+    assert 1 <= magnifier.framesCaptured <= 300 // 50 + 1
@@ -0,0 +1,34 @@
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QImage, QPixmap, QColor, QPainter
+from Components.Overlay.OverlayImageCache import OverlayImageCache
+
+
+def test_edits_do_not_leak_into_the_original_source(qapp):
+    image = QImage(100, 100, QImage.Format_ARGB32_Premultiplied)
+    image.fill(QColor(255, 0, 0))
+    pixmap = QPixmap.fromImage(image)
+    cache = OverlayImageCache(100)
+    cache.setSource(pixmap)
+    cache.image(1.0)
+
+    edit = image.copy()
+    with QPainter(edit) as painter:
+        painter.fillRect(10, 10, 20, 20, QColor(0, 0, 255))
+    assert cache.updateSource(edit, QRect(10, 10, 20, 20))
+    assert cache.image(1.0).pixelColor(15, 15) == QColor(0, 0, 255)
+
+    # Setting the unedited pixmap again shows its own pixels
+    cache.setSource(pixmap)
+    assert cache.image(1.0).pixelColor(15, 15) == QColor(255, 0, 0)
+
+
+def test_cached_image_only_returns_prepared_images(qapp):
+    image = QImage(100, 100, QImage.Format_ARGB32_Premultiplied)
+    image.fill(QColor(255, 0, 0))
+    cache = OverlayImageCache(100)
+    cache.setSource(QPixmap.fromImage(image))
+    assert cache.cachedImage(0.5) is None
+    assert cache.cachedImage(0.5) is None
+    cache.prepare([0.5], [1.0, 2.0])
+    assert cache.cachedImage(0.5, 2.0).width() == 200
+    assert cache.cachedImage(0.5, 1.5) is None
@@ -0,0 +1,42 @@
+import random
+import pytest
+from PyQt5.QtCore import QPoint
+from PyQt5.QtGui import QImage, QPainter, QColor
+from Components.Canvas.DrawingBrushes import PolylineStroke
+
+CANVAS_SIZE = 120
+
+
+def reference_draw(stroke, painter):
+    """The whole layer with the tail added, composited in one go."""
+    layer = stroke.layer.copy()
+    with QPainter(layer) as layerPainter:
+        stroke._stroke(layerPainter, stroke.simplifier.tailPath())
+    painter.setOpacity(stroke.color.alphaF())
+    painter.drawImage(0, 0, layer)
+    painter.setOpacity(1.0)
+
+
+def canvas():
+    image = QImage(CANVAS_SIZE, CANVAS_SIZE, QImage.Format_ARGB32_Premultiplied)
+    image.fill(QColor(30, 90, 60))
+    return image
+
+
+@pytest.mark.parametrize("alpha", [255, 128])
+@pytest.mark.parametrize("pen_size", [1, 6, 15])
+def test_draw_matches_compositing_the_whole_layer(qapp, alpha, pen_size):
+    rng = random.Random(pen_size * 1000 + alpha)
+    stroke = PolylineStroke(canvas().size(), QColor(220, 40, 20, alpha), pen_size)
+    point = QPoint(CANVAS_SIZE // 2, CANVAS_SIZE // 2)
+    for _ in range(150):
+        # A wandering path that crosses itself and runs off the canvas edges
+        point = QPoint(min(max(point.x() + rng.randint(-9, 9), -10), CANVAS_SIZE + 10),
+                       min(max(point.y() + rng.randint(-9, 9), -10), CANVAS_SIZE + 10))
+        stroke.add(point)
+        drawn, expected = canvas(), canvas()
+        with QPainter(drawn) as painter:
+            stroke.draw(painter)
+        with QPainter(expected) as painter:
+            reference_draw(stroke, painter)
+        assert drawn == expected
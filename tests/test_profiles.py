@@ -0,0 +1,61 @@
+from Components.Settings.Profiles import FakeProcessSource, ProfileWatcher
+
+
+def watcher_for(source, profiles=("game.exe", "other.exe")):
+    watcher = ProfileWatcher(source)
+    watcher.setProfiles(profiles)
+    events = []
+    watcher.profileActivated.connect(lambda name: events.append(("activated", name)))
+    watcher.profileDeactivated.connect(lambda name: events.append(("deactivated", name)))
+    return watcher, events
+
+
+def test_starting_a_profiled_process_activates_it(qapp):
+    source = FakeProcessSource({1: "explorer.exe"})
+    watcher, events = watcher_for(source)
+    watcher.poll()
+    assert events == []
+    source.processes[2] = "Game.exe"
+    watcher.poll()
+    assert events == [("activated", "game.exe")] and watcher.active == "game.exe"
+
+
+def test_focus_takes_precedence_over_a_started_process(qapp):
+    source = FakeProcessSource({1: "game.exe"})
+    watcher, events = watcher_for(source)
+    watcher.poll()
+    source.processes[2] = "other.exe"
+    source.foreground = 1
+    watcher.poll()
+    assert events == [("activated", "game.exe")]
+    source.foreground = 2
+    watcher.poll()
+    assert events[-1] == ("activated", "other.exe")
+
+
+def test_exit_falls_back_to_another_running_profile(qapp):
+    source = FakeProcessSource({1: "game.exe"})
+    watcher, events = watcher_for(source)
+    watcher.poll()
+    source.processes[2] = "other.exe"
+    watcher.poll()
+    assert watcher.active == "other.exe"
+    del source.processes[2]
+    watcher.poll()
+    assert events[-2:] == [("deactivated", "other.exe"), ("activated", "game.exe")]
+    del source.processes[1]
+    watcher.poll()
+    assert events[-1] == ("deactivated", "game.exe") and watcher.active is None
+
+
+def test_only_new_processes_are_looked_up_by_name(qapp):
+    source = FakeProcessSource({pid: f"process{pid}.exe" for pid in range(100)})
+    watcher, _ = watcher_for(source)
+    watcher.poll()
+    assert source.nameLookups == 100
+    watcher.poll()
+    assert source.nameLookups == 100
+    source.processes[500] = "new.exe"
+    del source.processes[3]
+    watcher.poll()
+    assert source.nameLookups == 101
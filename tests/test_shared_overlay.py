@@ -0,0 +1,63 @@
+import os
+from multiprocessing import shared_memory
+import pytest
+from Components.Overlay.SharedOverlay import _BUFFER_SIZE, _SharedState, SharedOverlayReader, initial_state
+
+
+class FakeOverlay:
+    def __init__(self):
+        self.visible = False
+        self.opacity = None
+
+    def set_opacity(self, opacity):
+        self.opacity = opacity
+
+    def setVisible(self, visible):
+        self.visible = visible
+
+
+@pytest.fixture
+def segment():
+    shm = shared_memory.SharedMemory(name=f"CrossPixel-test-{os.getpid()}", create=True, size=_BUFFER_SIZE)
+    yield shm
+    shm.close()
+    shm.unlink()
+
+
+def publish(writer, state, **changes):
+    state.update(changes)
+    state["control_generation"] += 1
+    writer.write(state)
+
+
+def test_show_applies_after_the_overlay_hid_itself(qapp, segment):
+    writer, state = _SharedState(segment), initial_state()
+    writer.write(state)
+    overlay = FakeOverlay()
+    reader = SharedOverlayReader(overlay, segment.name)
+    reader.timer.stop()
+
+    publish(writer, state, visible=True, visibility_requests=1)
+    reader.poll()
+    assert overlay.visible
+    overlay.visible = False  # Hidden through the overlay's own hotkey, the editor doesn't know
+    publish(writer, state, visible=True, visibility_requests=2)
+    reader.poll()
+    assert overlay.visible
+    reader.shm.close()
+
+
+def test_other_controls_leave_the_overlay_visibility_alone(qapp, segment):
+    writer, state = _SharedState(segment), initial_state()
+    writer.write(state)
+    overlay = FakeOverlay()
+    reader = SharedOverlayReader(overlay, segment.name)
+    reader.timer.stop()
+
+    publish(writer, state, visible=True, visibility_requests=1)
+    reader.poll()
+    overlay.visible = False
+    publish(writer, state, opacity=0.5)
+    reader.poll()
+    assert overlay.opacity == 0.5 and not overlay.visible
+    reader.shm.close()